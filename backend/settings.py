@@ -95,6 +95,13 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Take the write lock when a transaction starts, so concurrent
+            # judging transactions wait for each other instead of failing
+            # with "database is locked"
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
     }
 }
 
@@ -135,6 +142,13 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Test data
+# Files that test cases can reference as input or expected output, and the
+# cache that referenced and generated inputs are expanded into
+
+TEST_DATA_DIR = Path(os.getenv("TEST_DATA_DIR", BASE_DIR / 'test_data'))
+TEST_DATA_CACHE_DIR = Path(os.getenv("TEST_DATA_CACHE_DIR", BASE_DIR / 'test_data_cache'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -1,3 +1,9 @@
 from django.contrib import admin
+from .models import JudgeJob
 
-# Register your models here.
+@admin.register(JudgeJob)
+class JudgeJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'problem', 'status', 'created_at', 'started_at', 'finished_at')
+    list_filter = ('status', 'problem')
+    search_fields = ('user__username', 'problem__name')
+    ordering = ('-created_at',)
@@ -0,0 +1,252 @@
+"""
+Admission control for the code execution endpoints.
+
+This module provides functionality to:
+- Limit how many executions each user can have in flight at once
+- Rate-limit each user with a token bucket that allows short bursts
+- Cap the total number of executions in flight and of queued judge jobs
+- Reject requests over a limit with HTTP 429 and a Retry-After header
+
+Limits are tracked in memory, so each server process enforces them
+separately. Queued submissions are counted in the database instead, since
+they outlive the request that created them.
+"""
+
+import math
+import time
+import threading
+from functools import wraps
+from django.http import JsonResponse, StreamingHttpResponse
+from .models import JudgeJob
+from .sandbox import SANDBOX_POOL_SIZE
+
+# Constants
+USER_MAX_IN_FLIGHT = 2  # concurrent executions per user
+USER_RATE = 2.0  # executions per second each user earns
+USER_BURST = 10  # executions a user can make back to back
+GLOBAL_MAX_IN_FLIGHT = SANDBOX_POOL_SIZE * 4  # concurrent executions per server process
+USER_MAX_QUEUED_JOBS = 5  # queued or running judge jobs per user
+MAX_QUEUED_JOBS = 500  # queued judge jobs across all users
+IDLE_BUCKET_EXPIRY = 600  # seconds before an idle user's state is dropped
+
+class TokenBucket:
+    """
+    Token bucket rate limiter.
+
+    Tokens accumulate at `rate` per second up to `capacity`; each request
+    spends one.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        # now may be read just before the bucket was created
+        elapsed = max(0.0, now - self.updated)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = max(self.updated, now)
+
+    def take(self, now=None):
+        """
+        Spend a token if one is available.
+
+        Args:
+            now (float): Current time.monotonic(), if already known.
+
+        Returns:
+            float: 0 if a token was spent, otherwise seconds until one is available.
+        """
+        self._refill(time.monotonic() if now is None else now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+class AdmissionRejected(Exception):
+    """Raised when a request is over one of the admission limits."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class AdmissionController:
+    """
+    Tracks executions in flight and rate limits for every user.
+
+    Attributes:
+        enabled (bool): Whether limits are enforced; benchmarks turn this off.
+    """
+
+    def __init__(self, user_max_in_flight=USER_MAX_IN_FLIGHT, user_rate=USER_RATE,
+                 user_burst=USER_BURST, global_max_in_flight=GLOBAL_MAX_IN_FLIGHT):
+        self.user_max_in_flight = user_max_in_flight
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.global_max_in_flight = global_max_in_flight
+        self.in_flight = {}
+        self.total_in_flight = 0
+        self.buckets = {}
+        self.enabled = True
+        self.lock = threading.Lock()
+        self.last_pruned = time.monotonic()
+
+    def _prune(self, now):
+        """Drops the buckets of users that have been idle long enough to be full again."""
+        if now - self.last_pruned < IDLE_BUCKET_EXPIRY:
+            return
+        self.last_pruned = now
+        for key in [key for key, bucket in self.buckets.items()
+                    if now - bucket.updated > IDLE_BUCKET_EXPIRY and key not in self.in_flight]:
+            del self.buckets[key]
+
+    def acquire(self, key):
+        """
+        Admit an execution for a user.
+
+        Args:
+            key (str): Identifies the user, see client_key.
+
+        Raises:
+            AdmissionRejected: If the user or the server is over a limit.
+        """
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        with self.lock:
+            self._prune(now)
+            if self.total_in_flight >= self.global_max_in_flight:
+                raise AdmissionRejected("Server is busy, please try again shortly", 1)
+            if self.in_flight.get(key, 0) >= self.user_max_in_flight:
+                raise AdmissionRejected(
+                    "Too many executions in progress; wait for one to finish", 1
+                )
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = self.buckets[key] = TokenBucket(self.user_rate, self.user_burst)
+            wait = bucket.take(now)
+            if wait:
+                raise AdmissionRejected("Too many executions, please slow down", wait)
+            self.in_flight[key] = self.in_flight.get(key, 0) + 1
+            self.total_in_flight += 1
+
+    def release(self, key):
+        """
+        Mark an execution admitted by acquire as finished.
+
+        Args:
+            key (str): The key the execution was admitted with.
+        """
+        with self.lock:
+            count = self.in_flight.get(key, 0)
+            if not count:
+                return
+            if count == 1:
+                del self.in_flight[key]
+            else:
+                self.in_flight[key] = count - 1
+            self.total_in_flight -= 1
+
+admission_controller = AdmissionController()
+
+def client_key(request):
+    """
+    Identify who a request is from for admission purposes.
+
+    Args:
+        request: HTTP request object.
+
+    Returns:
+        str: The user ID for logged-in users, otherwise the client address.
+    """
+    if request.user.is_authenticated:
+        return f"user:{request.user.id}"
+    return f"addr:{request.META.get('REMOTE_ADDR', '')}"
+
+def check_queue_admission(user):
+    """
+    Check that a user may queue another judge job.
+
+    Args:
+        user: User object queueing the job.
+
+    Raises:
+        AdmissionRejected: If the user or the whole queue has too many jobs.
+    """
+    if not admission_controller.enabled:
+        return
+    if JudgeJob.objects.filter(status='queued').count() >= MAX_QUEUED_JOBS:
+        raise AdmissionRejected("The judge queue is full, please try again shortly", 5)
+    active = JudgeJob.objects.filter(user=user, status__in=('queued', 'running')).count()
+    if active >= USER_MAX_QUEUED_JOBS:
+        raise AdmissionRejected("Too many submissions waiting to be judged", 2)
+
+def rejected_response(rejection):
+    """
+    Build the response sent for a rejected request.
+
+    Args:
+        rejection (AdmissionRejected): The limit that was hit.
+
+    Returns:
+        JsonResponse: HTTP 429 with a Retry-After header in whole seconds.
+    """
+    retry_after = max(1, math.ceil(rejection.retry_after))
+    response = JsonResponse({"error": str(rejection), "retry_after": retry_after}, status=429)
+    response["Retry-After"] = str(retry_after)
+    return response
+
+class _ReleasingStream:
+    """
+    Wraps a streaming response's content to release its admission when done.
+
+    Django closes the content when the response is closed, so the admission
+    is released even if the client disconnects before the stream starts.
+    """
+
+    def __init__(self, content, key):
+        self.content = content
+        self.key = key
+        self.released = False
+
+    def __iter__(self):
+        try:
+            yield from self.content
+        finally:
+            self.close()
+
+    def close(self):
+        if not self.released:
+            self.released = True
+            admission_controller.release(self.key)
+
+def admission_controlled(view):
+    """
+    Decorator that applies admission control to POST requests of a view.
+
+    The execution counts as in flight until the view returns or, for
+    streaming responses, until the stream is finished or abandoned.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method != "POST":
+            return view(request, *args, **kwargs)
+        key = client_key(request)
+        try:
+            admission_controller.acquire(key)
+        except AdmissionRejected as rejection:
+            return rejected_response(rejection)
+
+        try:
+            response = view(request, *args, **kwargs)
+        except BaseException:
+            admission_controller.release(key)
+            raise
+        if isinstance(response, StreamingHttpResponse):
+            response.streaming_content = _ReleasingStream(response.streaming_content, key)
+        else:
+            admission_controller.release(key)
+        return response
+    return wrapper
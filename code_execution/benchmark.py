@@ -0,0 +1,399 @@
+"""
+Load-test harness for the code execution endpoint.
+
+This module provides functionality to:
+- Seed a benchmark problem modelled on the mock database's problems
+- Fire a configurable, concurrent mix of solutions at execute_code, either
+  in-process through the Django test client or at a running server
+- Check that each solution received the verdict it was written to get
+- Report throughput and latency percentiles as a JSON-serialisable dict
+- Remove the benchmark problem, user and everything recorded for them
+  afterwards, so learners never see them
+"""
+
+import json
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Max
+from django.test import Client
+from accounts.models import Profile
+from problems.models import Problem
+from .admission import admission_controller
+from .sandbox import STATUS_OUTPUT_LIMIT, STATUS_RUNTIME_ERROR, STATUS_TIME_LIMIT
+
+# Constants
+BENCHMARK_USERNAME = "judge-benchmark"
+BENCHMARK_PROBLEM_NAME = "Benchmark: Sum of Two Numbers"
+BENCHMARK_TIME_LIMIT = 1.0  # CPU seconds per test on the seeded problem
+EXECUTE_PATH = "/code_execution/execute/"
+DEFAULT_MIX = "accepted=6,wrong_answer=2,timeout=1,output_flood=1,exception=1"
+PERCENTILES = (50, 95, 99)
+
+# Test cases in the style of the mock database's "Sum of Two Numbers"
+BENCHMARK_TEST_CASES = {
+    f"test{i}": {"input": f"{a},{b}", "output": str(a + b)}
+    for i, (a, b) in enumerate([(5, 3), (-2, 7), (0, 0), (1000, -1000), (123, 456)], start=1)
+}
+
+BENCHMARK_BOILERPLATE = "a = int(input())\nb = int(input())\n# Write your code here"
+
+# Solutions fired at the endpoint, with the verdict each should get
+BENCHMARK_SOLUTIONS = {
+    "accepted": (
+        "a = int(input())\nb = int(input())\nprint(a + b)",
+        "accepted",
+    ),
+    "wrong_answer": (
+        "a = int(input())\nb = int(input())\nprint(a - b)",
+        "wrong answer",
+    ),
+    "timeout": (
+        "while True:\n    pass",
+        STATUS_TIME_LIMIT,
+    ),
+    "output_flood": (
+        "while True:\n    print('x' * 1000)",
+        STATUS_OUTPUT_LIMIT,
+    ),
+    "exception": (
+        "raise ValueError('benchmark')",
+        STATUS_RUNTIME_ERROR,
+    ),
+}
+
+def parse_mix(mix):
+    """
+    Parse a solution mix such as "accepted=6,timeout=1".
+
+    Args:
+        mix (str): Comma-separated kind=weight pairs.
+
+    Returns:
+        dict: Weight for each solution kind.
+
+    Raises:
+        ValueError: If a kind is unknown or a weight is not a positive integer.
+    """
+    weights = {}
+    for part in mix.split(','):
+        kind, _, weight = part.strip().partition('=')
+        if kind not in BENCHMARK_SOLUTIONS:
+            raise ValueError(
+                f"Unknown solution kind '{kind}'; choose from {', '.join(BENCHMARK_SOLUTIONS)}"
+            )
+        weights[kind] = int(weight or 1)
+        if weights[kind] < 1:
+            raise ValueError(f"Weight for '{kind}' must be a positive integer")
+    return weights
+
+def percentile(sorted_values, p):
+    """
+    Nearest-rank percentile of already sorted values.
+
+    Args:
+        sorted_values (list): Values in ascending order.
+        p (float): Percentile between 0 and 100.
+
+    Returns:
+        float: The percentile, or None for no values.
+    """
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(p / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+def latency_summary(latencies):
+    """
+    Summarise request latencies.
+
+    Args:
+        latencies (list): Latencies in seconds.
+
+    Returns:
+        dict: count, mean, max and p50/p95/p99 in milliseconds.
+    """
+    ordered = sorted(latencies)
+    summary = {"count": len(ordered)}
+    if not ordered:
+        return summary
+    summary["mean_ms"] = round(sum(ordered) / len(ordered) * 1000, 2)
+    summary["max_ms"] = round(ordered[-1] * 1000, 2)
+    for p in PERCENTILES:
+        summary[f"p{p}_ms"] = round(percentile(ordered, p) * 1000, 2)
+    return summary
+
+def seed_benchmark_problem(time_limit=BENCHMARK_TIME_LIMIT):
+    """
+    Create or refresh the problem submissions are judged against.
+
+    Args:
+        time_limit (float): CPU seconds allowed per test.
+
+    Returns:
+        Problem: The benchmark problem.
+    """
+    problem = Problem.objects.filter(name=BENCHMARK_PROBLEM_NAME).first()
+    if problem is None:
+        last_order = Problem.objects.aggregate(Max('order'))['order__max'] or 0
+        problem = Problem(name=BENCHMARK_PROBLEM_NAME, order=last_order + 1)
+    problem.language = "python"
+    problem.difficulty = "easy"
+    problem.problem_type = "benchmark"
+    problem.description = (
+        "# Sum of Two Numbers\n\nRead two integers and print their sum. "
+        "Used by the judge benchmark."
+    )
+    problem.boilerplate_code = BENCHMARK_BOILERPLATE
+    problem.test_cases = BENCHMARK_TEST_CASES
+    problem.time_limit = time_limit
+    problem.fail_fast = False
+    problem.save()
+    return problem
+
+def seed_benchmark_user():
+    """
+    Create the user benchmark submissions are recorded against.
+
+    Returns:
+        User: The benchmark user.
+    """
+    user, _ = User.objects.get_or_create(
+        username=BENCHMARK_USERNAME,
+        defaults={"email": f"{BENCHMARK_USERNAME}@example.com"}
+    )
+    Profile.objects.get_or_create(user=user)
+    return user
+
+def remove_benchmark_data():
+    """
+    Delete the benchmark problem and user.
+
+    Their submissions, progress, runtime stats, leaderboard entry and
+    profile are deleted with them.
+    """
+    Problem.objects.filter(name=BENCHMARK_PROBLEM_NAME).delete()
+    User.objects.filter(username=BENCHMARK_USERNAME).delete()
+
+def build_schedule(weights, total, seed=0):
+    """
+    Build a shuffled list of solution kinds following the mix weights.
+
+    Args:
+        weights (dict): Weight for each solution kind.
+        total (int): Number of requests to send.
+        seed (int): Seed for the shuffle, so runs are repeatable.
+
+    Returns:
+        list: Solution kind for each request.
+    """
+    kinds = [kind for kind, weight in weights.items() for _ in range(weight)]
+    schedule = [kinds[i % len(kinds)] for i in range(total)]
+    random.Random(seed).shuffle(schedule)
+    return schedule
+
+def solution_payload(problem, kind, nonce, parallel=False):
+    """
+    Build the request body for one benchmark submission.
+
+    Each submission gets a distinct assignment prepended so the verdict cache
+    cannot answer it without judging.
+
+    Args:
+        problem: Problem object being judged.
+        kind (str): Solution kind from BENCHMARK_SOLUTIONS.
+        nonce (int): Number that makes the code unique, or None to allow reuse.
+        parallel (bool): Whether to ask for parallel test execution.
+
+    Returns:
+        dict: JSON body for execute_code.
+    """
+    code, _ = BENCHMARK_SOLUTIONS[kind]
+    if nonce is not None:
+        code = f"_benchmark_nonce = {nonce}\n{code}"
+    return {
+        "code": code,
+        "problem_id": problem.id,
+        "run_tests": True,
+        "parallel": parallel,
+    }
+
+def received_verdict(status_code, body):
+    """
+    Reduce an execute_code response to a single verdict.
+
+    Args:
+        status_code (int): HTTP status of the response.
+        body (dict): Decoded JSON response, or None.
+
+    Returns:
+        str: "accepted", the first failing test's verdict, or "http <status>".
+    """
+    if status_code != 200 or not isinstance(body, dict) or "test_results" not in body:
+        return f"http {status_code}"
+    if body.get("all_tests_passed"):
+        return "accepted"
+    for result in body["test_results"]:
+        if not result.get("passed"):
+            return result.get("verdict", "unknown")
+    return "unknown"
+
+class InProcessSender:
+    """Sends requests through the Django test client, one client per thread."""
+
+    def __init__(self, user):
+        self.user = user
+        self.local = threading.local()
+
+    def __call__(self, payload):
+        client = getattr(self.local, "client", None)
+        if client is None:
+            client = self.local.client = Client(HTTP_HOST="localhost")
+            client.force_login(self.user)
+        response = client.post(EXECUTE_PATH, json.dumps(payload), content_type="application/json")
+        try:
+            return response.status_code, response.json()
+        except ValueError:
+            return response.status_code, None
+
+class HttpSender:
+    """Sends requests to a running server, logged in as the benchmark user."""
+
+    def __init__(self, user, base_url, timeout):
+        import requests
+
+        client = Client()
+        client.force_login(user)
+        self.session_cookie = client.cookies[settings.SESSION_COOKIE_NAME].value
+        self.url = base_url.rstrip('/') + EXECUTE_PATH
+        self.timeout = timeout
+        self.requests = requests
+        self.local = threading.local()
+
+    def __call__(self, payload):
+        session = getattr(self.local, "session", None)
+        if session is None:
+            session = self.local.session = self.requests.Session()
+            session.cookies.set(settings.SESSION_COOKIE_NAME, self.session_cookie)
+        try:
+            response = session.post(self.url, json=payload, timeout=self.timeout)
+        except self.requests.RequestException:
+            return 0, None
+        try:
+            return response.status_code, response.json()
+        except ValueError:
+            return response.status_code, None
+
+def run_benchmark(total=100, concurrency=4, mix=DEFAULT_MIX, warmup=5, base_url=None,
+                  time_limit=BENCHMARK_TIME_LIMIT, parallel=False, unique=True, seed=0,
+                  timeout=60, admission=False, keep_data=False):
+    """
+    Fire a mix of solutions at execute_code and measure throughput and latency.
+
+    Args:
+        total (int): Number of measured requests.
+        concurrency (int): Number of requests in flight at once.
+        mix (str): Solution mix, see parse_mix.
+        warmup (int): Accepted requests sent first and left out of the results.
+        base_url (str): Server to benchmark, or None to call the view in-process.
+        time_limit (float): CPU seconds per test on the seeded problem.
+        parallel (bool): Whether submissions ask for parallel test execution.
+        unique (bool): Whether every submission is made unique so the verdict
+            cache cannot answer it.
+        seed (int): Seed for the order of the solution mix.
+        timeout (float): Seconds before an HTTP request is abandoned.
+        admission (bool): Whether in-process requests go through admission
+            control; a single benchmark user would otherwise be throttled.
+            Servers benchmarked with base_url always apply it.
+        keep_data (bool): Whether to keep the benchmark problem, user and
+            their submissions afterwards instead of removing them.
+
+    Returns:
+        dict: A JSON-serialisable report containing:
+            - config (dict): The options the benchmark ran with
+            - duration_s (float): Wall-clock time of the measured requests
+            - throughput_rps (float): Measured requests completed per second
+            - latency (dict): Latency summary over every request
+            - by_kind (dict): Latency summary, verdict counts and the number
+              of unexpected verdicts for each solution kind
+            - errors (int): Requests that failed or got an unexpected verdict
+    """
+    weights = parse_mix(mix)
+    problem = seed_benchmark_problem(time_limit)
+    user = seed_benchmark_user()
+
+    nonce_base = time.time_ns()
+
+    def fire(index, kind):
+        nonce = nonce_base + index if unique else None
+        payload = solution_payload(problem, kind, nonce, parallel)
+        started = time.perf_counter()
+        try:
+            status_code, body = send(payload)
+            latency = time.perf_counter() - started
+        finally:
+            if not base_url:
+                connection.close()
+        return kind, latency, received_verdict(status_code, body)
+
+    schedule = build_schedule(weights, total, seed)
+    admission_was_enabled = admission_controller.enabled
+    admission_controller.enabled = admission
+    try:
+        if base_url:
+            send = HttpSender(user, base_url, timeout)
+        else:
+            send = InProcessSender(user)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(fire, range(-warmup, 0), ["accepted"] * warmup))
+
+            started = time.perf_counter()
+            outcomes = list(executor.map(fire, range(total), schedule))
+            duration = time.perf_counter() - started
+    finally:
+        admission_controller.enabled = admission_was_enabled
+        if not keep_data:
+            remove_benchmark_data()
+
+    by_kind = {}
+    errors = 0
+    for kind in weights:
+        results = [(latency, verdict) for k, latency, verdict in outcomes if k == kind]
+        verdicts = {}
+        for _, verdict in results:
+            verdicts[verdict] = verdicts.get(verdict, 0) + 1
+        expected = BENCHMARK_SOLUTIONS[kind][1]
+        unexpected = len(results) - verdicts.get(expected, 0)
+        errors += unexpected
+        by_kind[kind] = {
+            "latency": latency_summary([latency for latency, _ in results]),
+            "expected_verdict": expected,
+            "verdicts": verdicts,
+            "unexpected": unexpected,
+        }
+
+    return {
+        "config": {
+            "total": total,
+            "concurrency": concurrency,
+            "mix": weights,
+            "warmup": warmup,
+            "target": base_url or "in-process",
+            "time_limit": time_limit,
+            "parallel": parallel,
+            "unique": unique,
+            "seed": seed,
+            "admission": admission or bool(base_url),
+        },
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(total / duration, 2) if duration else None,
+        "latency": latency_summary([latency for _, latency, _ in outcomes]),
+        "by_kind": by_kind,
+        "errors": errors,
+    }
@@ -0,0 +1,205 @@
+"""
+Empirical complexity analysis of accepted solutions.
+
+This module provides functionality to:
+- Generate a series of growing inputs from a problem's input generator
+- Measure the runtime and operation count of a solution on each input
+- Keep growing inputs until CPU time is measurable, for solutions whose
+  work happens in built-in calls that line counts cannot see
+- Fit the measurements to standard complexity classes
+"""
+
+import math
+import random
+from .sandbox import FunctionCall
+
+# Constants
+ANALYSIS_SIZES = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096)  # sizes always measured
+ANALYSIS_MAX_N = 1 << 20  # largest input grown to while CPU time is still too short to fit
+ANALYSIS_MAX_RUN_TIME = 1.0  # stop growing inputs once a run takes this long (seconds)
+ANALYSIS_MIN_POINTS = 4  # measurements needed before fitting
+ANALYSIS_MIN_CPU_TIME = 0.001  # shorter runs are too noisy to fit CPU time (seconds)
+ANALYSIS_SEED = 0
+
+# Standard complexity classes, simplest first
+COMPLEXITY_CLASSES = (
+    ("O(1)", lambda n: 1.0),
+    ("O(log n)", lambda n: math.log2(n)),
+    ("O(n)", lambda n: float(n)),
+    ("O(n log n)", lambda n: n * math.log2(n)),
+    ("O(n^2)", lambda n: float(n) ** 2),
+    ("O(n^3)", lambda n: float(n) ** 3),
+    ("O(2^n)", lambda n: 2.0 ** n),
+)
+
+class InputGeneratorError(Exception):
+    """Raised when a problem's input generator is missing or broken."""
+
+def load_input_generator(source):
+    """
+    Load the generate(n, rng) function defined by a problem's input generator.
+
+    Input generators are written by problem authors in the admin, so they run
+    with normal builtins rather than in the sandbox.
+
+    Args:
+        source (str): Python source defining generate(n, rng), which returns the
+            test input for size n as a comma-separated string, or the list of
+            arguments for function-call problems.
+
+    Returns:
+        function: The generate function.
+
+    Raises:
+        InputGeneratorError: If the source does not define generate.
+    """
+    namespace = {}
+    try:
+        exec(source, namespace)
+    except Exception as e:
+        raise InputGeneratorError(f"Input generator failed to load: {e}") from e
+    generate = namespace.get("generate")
+    if not callable(generate):
+        raise InputGeneratorError("Input generator must define generate(n, rng)")
+    return generate
+
+def fit_complexity(sizes, values):
+    """
+    Fit measurements to each complexity class and rank the classes.
+
+    Each class f is fitted as value ~ c * f(n) by least squares on relative
+    errors, so small and large inputs carry equal weight.
+
+    Args:
+        sizes (list): Input sizes.
+        values (list): Measurement for each size, such as an operation count.
+
+    Returns:
+        list: (name, residual) pairs sorted from best to worst fit.
+    """
+    fits = []
+    for name, f in COMPLEXITY_CLASSES:
+        try:
+            ratios = [f(n) / value for n, value in zip(sizes, values)]
+        except (OverflowError, ZeroDivisionError):
+            continue
+        if any(math.isinf(ratio) for ratio in ratios):
+            continue
+        scale = sum(ratios) / sum(ratio * ratio for ratio in ratios)
+        residual = sum((1 - scale * ratio) ** 2 for ratio in ratios) / len(ratios)
+        fits.append((name, residual))
+    # Prefer the simpler class when two fit about equally well
+    best = min(residual for _, residual in fits)
+    return sorted(fits, key=lambda fit: (0, 0) if fit[1] <= best + 1e-3 else (1, fit[1]))
+
+def _timed_points(measurements):
+    """Number of measurements long enough to fit CPU time to."""
+    return sum(1 for m in measurements if m["cpu_time"] >= ANALYSIS_MIN_CPU_TIME)
+
+def analysis_sizes():
+    """
+    Input sizes to analyse, in order.
+
+    Yields ANALYSIS_SIZES, then keeps doubling up to ANALYSIS_MAX_N.
+    """
+    yield from ANALYSIS_SIZES
+    n = ANALYSIS_SIZES[-1] * 2
+    while n <= ANALYSIS_MAX_N:
+        yield n
+        n *= 2
+
+def analyze_complexity(compiled, generator_source, run_code, entry_function=""):
+    """
+    Estimate the complexity class of an accepted solution.
+
+    The solution is run on inputs of growing size until a run exceeds
+    ANALYSIS_MAX_RUN_TIME or fails. Each of ANALYSIS_SIZES is run twice: once
+    plainly to measure CPU time and once with line tracing to count
+    operations. Line tracing only sees the solution's own lines, so a call
+    like sorted(a) counts as one operation; if CPU time is still too short
+    to fit, inputs keep growing up to ANALYSIS_MAX_N with timed runs only.
+
+    When the operation count stays flat, the estimate is the class fitted to
+    CPU time instead, or None if CPU time could not be fitted either and the
+    inputs did not reach ANALYSIS_MAX_N.
+
+    Args:
+        compiled (bytes): User code compiled by compile_user_code.
+        generator_source (str): The problem's input generator source.
+        run_code (callable): Function with the signature of run_code_with_test.
+        entry_function (str): Function to call with the generated arguments,
+            for function-call problems.
+
+    Returns:
+        dict: A JSON response fragment containing:
+            - estimate (str): Best estimate of the class, or None
+            - time_estimate (str): Best fitting class for CPU time, or None
+            - measurements (list): n, cpu_time and operations (None where
+              not counted) for each size
+            - fits (dict): Residual of each class for operation counts
+            - error (str): Present if the analysis could not be completed
+    """
+    try:
+        generate = load_input_generator(generator_source)
+    except InputGeneratorError as e:
+        return {"estimate": None, "time_estimate": None, "measurements": [], "fits": {}, "error": str(e)}
+
+    rng = random.Random(ANALYSIS_SEED)
+    measurements = []
+    error = None
+
+    for n in analysis_sizes():
+        count = n <= ANALYSIS_SIZES[-1]
+        if not count and _timed_points(measurements) >= ANALYSIS_MIN_POINTS:
+            break
+        try:
+            generated = generate(n, rng)
+            if entry_function:
+                test_input = FunctionCall(entry_function, tuple(generated))
+            else:
+                test_input = str(generated)
+        except Exception as e:
+            error = f"Input generator failed for n={n}: {e}"
+            break
+
+        timed = run_code(compiled, test_input)
+        counted = run_code(compiled, test_input, {"count_operations": True}) if count else timed
+        if not (timed["success"] and counted["success"]):
+            error = f"Solution failed for n={n}"
+            break
+
+        measurements.append({
+            "n": n,
+            "cpu_time": timed["cpu_time"],
+            "operations": counted["operations"] if count else None,
+        })
+        # Line tracing makes the counted run the slower of the two
+        if max(timed["cpu_time"], counted["cpu_time"]) >= ANALYSIS_MAX_RUN_TIME:
+            break
+
+    result = {"estimate": None, "time_estimate": None, "measurements": measurements, "fits": {}}
+    if len(measurements) < ANALYSIS_MIN_POINTS:
+        result["error"] = error or "Not enough measurements to estimate complexity"
+        return result
+
+    counted = [m for m in measurements if m["operations"] is not None]
+    operation_fits = fit_complexity(
+        [m["n"] for m in counted], [max(m["operations"], 1) for m in counted]
+    )
+    result["estimate"] = operation_fits[0][0]
+    result["fits"] = {name: round(residual, 6) for name, residual in operation_fits}
+
+    # CPU time is too coarse to fit on inputs that finish almost instantly
+    timed = [m for m in measurements if m["cpu_time"] >= ANALYSIS_MIN_CPU_TIME]
+    if len(timed) >= ANALYSIS_MIN_POINTS:
+        result["time_estimate"] = fit_complexity(
+            [m["n"] for m in timed], [m["cpu_time"] for m in timed]
+        )[0][0]
+
+    # A flat operation count means the work, if any, happens in built-in calls
+    if result["estimate"] == COMPLEXITY_CLASSES[0][0]:
+        if result["time_estimate"] is not None:
+            result["estimate"] = result["time_estimate"]
+        elif measurements[-1]["n"] < ANALYSIS_MAX_N:
+            result["estimate"] = None
+    return result
@@ -0,0 +1,154 @@
+"""
+Database-backed queue of judge jobs.
+
+This module provides functionality to:
+- Claim queued submissions atomically so several workers can share the queue
+- Share workers fairly between users when picking the next job
+- Judge a claimed submission, saving partial test results as tests finish
+- Requeue jobs left running by a worker that died
+- Run the polling loop used by the judge_worker management command
+"""
+
+import time
+from datetime import timedelta
+from django.db import close_old_connections
+from django.db.models import Count
+from django.utils import timezone
+from .models import JudgeJob
+from .views import benchmark_runs, judge_submission, profile_options
+
+# Constants
+JOB_POLL_INTERVAL = 0.5  # seconds between queue polls when idle
+JOB_STALE_AFTER = timedelta(minutes=10)  # running jobs older than this are requeued
+CLAIM_CANDIDATES = 50  # oldest queued jobs considered when picking the next one
+
+def pending_test_results(problem):
+    """
+    Build the placeholder results stored before any test of a job has run.
+    
+    Args:
+        problem: Problem object being judged.
+    
+    Returns:
+        list: One pending result per test case, in test case order.
+    """
+    return [{
+        "test_name": test_name,
+        "passed": False,
+        "pending": True
+    } for test_name in problem.test_cases]
+
+def claim_next_job():
+    """
+    Claim the next queued job, sharing workers fairly between users.
+    
+    Among the oldest queued jobs, those of users with the fewest jobs
+    already running go first, so one user queueing many submissions
+    cannot monopolise the workers. The claim is a conditional UPDATE, so
+    two workers can never claim the same job.
+    
+    Returns:
+        JudgeJob: The claimed job, or None if the queue is empty.
+    """
+    candidates = list(
+        JudgeJob.objects.filter(status='queued')
+        .order_by('created_at')
+        .values_list('id', 'user_id')[:CLAIM_CANDIDATES]
+    )
+    running = dict(
+        JudgeJob.objects.filter(status='running', user_id__in={user_id for _, user_id in candidates})
+        .values('user_id')
+        .annotate(count=Count('id'))
+        .values_list('user_id', 'count')
+    )
+    # sorted() is stable, so jobs stay oldest first within each level of load
+    candidates.sort(key=lambda candidate: running.get(candidate[1], 0))
+    for job_id, _ in candidates:
+        claimed = JudgeJob.objects.filter(id=job_id, status='queued').update(
+            status='running',
+            started_at=timezone.now()
+        )
+        if claimed:
+            return JudgeJob.objects.select_related('user', 'problem').get(id=job_id)
+    return None
+
+def process_job(job):
+    """
+    Judge a claimed job and store its final result.
+    
+    Args:
+        job (JudgeJob): Job claimed by claim_next_job.
+    """
+    test_results = pending_test_results(job.problem)
+    JudgeJob.objects.filter(id=job.id).update(test_results=test_results)
+
+    def on_result(index, result):
+        test_results[index] = result
+        JudgeJob.objects.filter(id=job.id).update(test_results=test_results)
+
+    try:
+        result = judge_submission(
+            job.user,
+            job.problem,
+            job.code,
+            job.options.get("time_spent", 0),
+            job.options.get("parallel", False),
+            job.options.get("fail_fast"),
+            on_result=on_result,
+            analyze=job.options.get("analyze_complexity", False),
+            profile=profile_options(job.options),
+            stress=job.options.get("stress", False),
+            benchmark=benchmark_runs(job.options)
+        )
+    except Exception as e:
+        JudgeJob.objects.filter(id=job.id).update(
+            status='failed',
+            result={"error": str(e)},
+            finished_at=timezone.now()
+        )
+        return
+
+    JudgeJob.objects.filter(id=job.id).update(
+        status='finished',
+        test_results=result["test_results"],
+        result=result,
+        finished_at=timezone.now()
+    )
+
+def requeue_stale_jobs():
+    """
+    Put jobs back on the queue if they have been running for too long.
+    
+    Returns:
+        int: Number of jobs requeued.
+    """
+    return JudgeJob.objects.filter(
+        status='running',
+        started_at__lt=timezone.now() - JOB_STALE_AFTER
+    ).update(status='queued', started_at=None)
+
+def run_worker(poll_interval=JOB_POLL_INTERVAL, once=False, stop_event=None):
+    """
+    Process jobs from the queue until stopped.
+    
+    Args:
+        poll_interval (float): Seconds to sleep when the queue is empty.
+        once (bool): Whether to return as soon as the queue is empty.
+        stop_event (threading.Event): Optional event that stops the loop when set.
+    
+    Returns:
+        int: Number of jobs processed.
+    """
+    processed = 0
+    while stop_event is None or not stop_event.is_set():
+        close_old_connections()
+        job = claim_next_job()
+        if job is None:
+            if once:
+                break
+            time.sleep(poll_interval)
+            continue
+        process_job(job)
+        processed += 1
+    close_old_connections()
+    return processed
@@ -0,0 +1,65 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from code_execution.benchmark import BENCHMARK_TIME_LIMIT, DEFAULT_MIX, run_benchmark
+
+class Command(BaseCommand):
+    help = 'Load-test the code execution endpoint and report throughput and latency as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100,
+                            help='Number of measured requests')
+        parser.add_argument('--concurrency', type=int, default=4,
+                            help='Number of requests in flight at once')
+        parser.add_argument('--mix', default=DEFAULT_MIX,
+                            help='Solution mix as kind=weight pairs (accepted, wrong_answer, '
+                                 'timeout, output_flood, exception)')
+        parser.add_argument('--warmup', type=int, default=5,
+                            help='Accepted requests sent before measuring')
+        parser.add_argument('--url',
+                            help='Base URL of a running server; defaults to calling the view in-process')
+        parser.add_argument('--time-limit', type=float, default=BENCHMARK_TIME_LIMIT,
+                            help='CPU seconds per test on the benchmark problem')
+        parser.add_argument('--parallel', action='store_true',
+                            help='Ask for parallel test execution')
+        parser.add_argument('--allow-cache', action='store_true',
+                            help='Send identical code so repeats can hit the verdict cache')
+        parser.add_argument('--admission', action='store_true',
+                            help='Apply admission control to in-process requests')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Seed for the order of the solution mix')
+        parser.add_argument('--output',
+                            help='Write the JSON report to this file instead of stdout')
+        parser.add_argument('--keep-data', action='store_true',
+                            help='Keep the benchmark problem, user and submissions afterwards')
+
+    def handle(self, *args, **options):
+        try:
+            report = run_benchmark(
+                total=options['requests'],
+                concurrency=options['concurrency'],
+                mix=options['mix'],
+                warmup=options['warmup'],
+                base_url=options['url'],
+                time_limit=options['time_limit'],
+                parallel=options['parallel'],
+                unique=not options['allow_cache'],
+                seed=options['seed'],
+                admission=options['admission'],
+                keep_data=options['keep_data'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        encoded = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(encoded + '\n')
+            self.stdout.write(self.style.SUCCESS(
+                f"{report['throughput_rps']} req/s, p95 {report['latency'].get('p95_ms')} ms; "
+                f"report written to {options['output']}"
+            ))
+        else:
+            self.stdout.write(encoded)
+
+        if report['errors']:
+            self.stderr.write(f"{report['errors']} request(s) failed or got an unexpected verdict")
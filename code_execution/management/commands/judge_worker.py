@@ -0,0 +1,42 @@
+import threading
+from django.core.management.base import BaseCommand
+from code_execution.judge_queue import JOB_POLL_INTERVAL, requeue_stale_jobs, run_worker
+
+class Command(BaseCommand):
+    help = 'Process queued judge jobs in the background'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=1,
+                            help='Number of jobs to judge concurrently')
+        parser.add_argument('--poll-interval', type=float, default=JOB_POLL_INTERVAL,
+                            help='Seconds to wait between polls when the queue is empty')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once the queue is empty')
+
+    def handle(self, *args, **options):
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale job(s)")
+
+        stop_event = threading.Event()
+        counts = []
+
+        def work():
+            counts.append(run_worker(options['poll_interval'], options['once'], stop_event))
+
+        threads = [threading.Thread(target=work, daemon=True) for _ in range(options['threads'])]
+        for thread in threads:
+            thread.start()
+        self.stdout.write(f"Judge worker started with {len(threads)} thread(s)")
+
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=1)
+        except KeyboardInterrupt:
+            stop_event.set()
+            self.stdout.write("Stopping after the current jobs finish...")
+            for thread in threads:
+                thread.join()
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {sum(counts)} job(s)"))
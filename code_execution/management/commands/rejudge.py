@@ -0,0 +1,78 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from code_execution.rejudge import (
+    REJUDGE_BATCH_SIZE, REJUDGE_CHECKPOINT, REJUDGE_WORKERS,
+    build_filters, load_checkpoint, run_rejudge
+)
+
+class Command(BaseCommand):
+    help = 'Judge stored submissions again and reconcile progress and leaderboard counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--problem', type=int, action='append', dest='problems',
+                            help='Only rejudge submissions to this problem ID (repeatable)')
+        parser.add_argument('--user', action='append', dest='users',
+                            help='Only rejudge submissions by this username (repeatable)')
+        parser.add_argument('--since', type=date.fromisoformat,
+                            help='Only rejudge submissions made on or after this day (YYYY-MM-DD)')
+        parser.add_argument('--until', type=date.fromisoformat,
+                            help='Only rejudge submissions made on or before this day (YYYY-MM-DD)')
+        parser.add_argument('--workers', type=int, default=REJUDGE_WORKERS,
+                            help='Number of submissions to judge concurrently')
+        parser.add_argument('--batch-size', type=int, default=REJUDGE_BATCH_SIZE,
+                            help='Number of submissions judged and written per batch')
+        parser.add_argument('--checkpoint', default=REJUDGE_CHECKPOINT,
+                            help='File used to save progress between batches')
+        parser.add_argument('--resume', action='store_true',
+                            help='Continue an interrupted run from its checkpoint')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report verdict changes without writing them')
+        parser.add_argument('--stress', action='store_true',
+                            help='Also stress test passing submissions against reference solutions')
+
+    def handle(self, *args, **options):
+        filters = build_filters(options['problems'], options['users'], options['since'], options['until'])
+        checkpoint = load_checkpoint(options['checkpoint'])
+        if options['resume']:
+            if checkpoint is None:
+                raise CommandError(f"No checkpoint found at {options['checkpoint']}")
+            if any(filters.values()) and filters != checkpoint['filters']:
+                raise CommandError("Filters differ from the interrupted run; omit them to resume")
+            self.stdout.write(f"Resuming after submission {checkpoint['last_id']}")
+        elif checkpoint is not None and not options['dry_run']:
+            raise CommandError(
+                f"An interrupted run left {options['checkpoint']}; use --resume or delete it"
+            )
+        else:
+            checkpoint = None
+
+        def report(progress):
+            self.stdout.write(
+                f"Rejudged {progress['judged']}/{progress['total']} submission(s), "
+                f"{progress['changed']} changed ({progress['rate']:.1f}/s)"
+            )
+
+        try:
+            summary = run_rejudge(
+                filters,
+                workers=options['workers'],
+                batch_size=options['batch_size'],
+                checkpoint_path=options['checkpoint'],
+                checkpoint=checkpoint,
+                dry_run=options['dry_run'],
+                on_progress=report,
+                stress=options['stress']
+            )
+        except KeyboardInterrupt:
+            raise CommandError("Interrupted; run again with --resume to continue")
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(
+                f"Dry run: {summary['changed']} of {summary['judged']} verdict(s) would change"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Rejudged {summary['judged']} submission(s) in {summary['elapsed']:.1f}s: "
+                f"{summary['changed']} verdict(s) changed, reconciled {summary['users']} user(s) "
+                f"across {summary['problems']} problem(s)"
+            ))
@@ -1,3 +1,29 @@
 from django.db import models
+from django.contrib.auth.models import User
+from problems.models import Problem
 
-# Create your models here.
+class JudgeJob(models.Model):
+    STATUSES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('finished', 'Finished'),
+        ('failed', 'Failed'),
+    ]
+
+    id = models.AutoField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    problem = models.ForeignKey(Problem, on_delete=models.CASCADE)
+    code = models.TextField()
+    options = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUSES, default='queued')
+    test_results = models.JSONField(default=list)
+    result = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Job {self.id} - {self.user.username} - {self.problem.name} - {self.status}"
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'created_at'])]
@@ -0,0 +1,339 @@
+"""
+Bulk rejudging of stored submissions.
+
+This module provides functionality to:
+- Stream submissions filtered by problem, user and date range in ID order
+- Judge them through a pool of worker threads sharing the sandbox pool
+- Write changed verdicts back in bulk, one batch at a time
+- Checkpoint progress after every batch so an interrupted run can resume
+- Reconcile progress, leaderboard, streaks and runtime stats afterwards
+"""
+
+import os
+import json
+import time
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+from django.db import transaction
+from django.db.models import Max
+from accounts.models import Profile
+from gamification.models import LeaderboardEntry
+from problems.models import ProblemStats, Submission, UserProgress
+from .sandbox import SANDBOX_POOL_SIZE, host_dependent
+from .test_suites import get_test_suite
+from .views import build_telemetry, judge_code, total_cpu_ms
+
+# Constants
+REJUDGE_BATCH_SIZE = 100  # submissions judged and written per batch
+REJUDGE_WORKERS = SANDBOX_POOL_SIZE  # submissions judged concurrently
+REJUDGE_CHECKPOINT = "rejudge-checkpoint.json"  # default checkpoint file
+
+def build_filters(problem_ids=None, usernames=None, since=None, until=None):
+    """
+    Build the serialisable submission filters stored in a checkpoint.
+
+    Args:
+        problem_ids (list): Only rejudge submissions to these problems.
+        usernames (list): Only rejudge submissions by these users.
+        since (date): Only rejudge submissions made on or after this day.
+        until (date): Only rejudge submissions made on or before this day.
+
+    Returns:
+        dict: The filters, with days as ISO strings.
+    """
+    return {
+        "problem_ids": sorted(problem_ids) if problem_ids else None,
+        "usernames": sorted(usernames) if usernames else None,
+        "since": since.isoformat() if since else None,
+        "until": until.isoformat() if until else None,
+    }
+
+def filtered_submissions(filters):
+    """
+    Get the submissions selected by a set of filters.
+
+    Args:
+        filters (dict): Filters from build_filters.
+
+    Returns:
+        QuerySet: Matching submissions.
+    """
+    submissions = Submission.objects.all()
+    if filters["problem_ids"]:
+        submissions = submissions.filter(problem_id__in=filters["problem_ids"])
+    if filters["usernames"]:
+        submissions = submissions.filter(user__username__in=filters["usernames"])
+    if filters["since"]:
+        submissions = submissions.filter(created_at__date__gte=date.fromisoformat(filters["since"]))
+    if filters["until"]:
+        submissions = submissions.filter(created_at__date__lte=date.fromisoformat(filters["until"]))
+    return submissions
+
+def iter_submission_batches(submissions, after_id=0, batch_size=REJUDGE_BATCH_SIZE):
+    """
+    Stream submissions in ID order, one batch at a time.
+
+    Each batch is a separate query starting after the last ID seen, so the
+    whole selection is never loaded at once and a stopped run can restart
+    from any batch boundary.
+
+    Args:
+        submissions (QuerySet): Submissions to stream.
+        after_id (int): Only stream submissions with a greater ID.
+        batch_size (int): Maximum number of submissions per batch.
+
+    Yields:
+        list: Submissions, ordered by ID.
+    """
+    submissions = submissions.only(
+        'id', 'user_id', 'problem_id', 'code_submitted', 'status', 'telemetry'
+    ).order_by('id')
+    while True:
+        batch = list(submissions.filter(id__gt=after_id)[:batch_size])
+        if not batch:
+            return
+        yield batch
+        after_id = batch[-1].id
+
+def rejudge_submission(suite, submission, stress=False):
+    """
+    Judge a stored submission again against its problem's current tests.
+
+    A previously accepted submission that now fails only by timing out or
+    crashing is judged once more before being failed, so a busy host alone
+    does not take away a solve.
+
+    Args:
+        suite (TestSuite): The problem's current test suite.
+        submission (Submission): Submission to rejudge.
+        stress (bool): Whether to also stress test submissions that pass
+            every test, on problems with a reference solution.
+
+    Returns:
+        tuple: (status, telemetry) for the new verdict.
+    """
+    for _ in range(2):
+        test_results, all_tests_passed, _, _ = judge_code(
+            suite, submission.code_submitted, fail_fast=True, stress=stress and suite.stress_ready
+        )
+        if all_tests_passed or submission.status != 'completed' or not any(host_dependent(result) for result in test_results):
+            break
+    status = 'completed' if all_tests_passed else 'attempted'
+    return status, build_telemetry(test_results)
+
+def load_checkpoint(path):
+    """
+    Load a rejudge checkpoint.
+
+    Args:
+        path (str): Checkpoint file path.
+
+    Returns:
+        dict: The checkpoint, or None if there is none.
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def save_checkpoint(path, checkpoint):
+    """
+    Write a rejudge checkpoint atomically.
+
+    Args:
+        path (str): Checkpoint file path.
+        checkpoint (dict): Progress of the run.
+    """
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(temp_path, path)
+
+def reconcile_progress(pairs):
+    """
+    Make each user's progress match their current submission verdicts.
+
+    Args:
+        pairs (set): (user_id, problem_id) pairs whose verdicts changed.
+    """
+    for user_id, problem_id in pairs:
+        last_completed = Submission.objects.filter(
+            user_id=user_id, problem_id=problem_id, status='completed'
+        ).aggregate(last=Max('created_at'))["last"]
+        progress = UserProgress.objects.filter(user_id=user_id, problem_id=problem_id)
+        if last_completed is None:
+            progress.update(is_completed=False)
+        else:
+            progress.update(is_completed=True, last_submitted=last_completed)
+
+def reconcile_leaderboard(user_ids):
+    """
+    Recount the problems each user has solved.
+
+    Args:
+        user_ids (set): IDs of the users to recount.
+    """
+    for user_id in user_ids:
+        solved = UserProgress.objects.filter(user_id=user_id, is_completed=True).count()
+        updated = LeaderboardEntry.objects.filter(user_id=user_id).update(total_solved=solved)
+        if not updated and solved:
+            LeaderboardEntry.objects.create(user_id=user_id, total_solved=solved)
+
+def solve_streaks(solve_dates):
+    """
+    Work out streaks from the days a user solved problems on.
+
+    Args:
+        solve_dates (list): Distinct days with an accepted submission, in order.
+
+    Returns:
+        tuple: (streak, high_score_streak) where streak is the run of
+            consecutive days ending on the last solve.
+    """
+    streak = best = 0
+    previous = None
+    for day in solve_dates:
+        streak = streak + 1 if previous is not None and (day - previous).days == 1 else 1
+        best = max(best, streak)
+        previous = day
+    return streak, best
+
+def reconcile_streaks(user_ids):
+    """
+    Recompute each user's streaks from their accepted submissions.
+
+    Args:
+        user_ids (set): IDs of the users to recompute.
+    """
+    for user_id in user_ids:
+        solve_dates = sorted({
+            created_at.date() for created_at in Submission.objects.filter(
+                user_id=user_id, status='completed'
+            ).values_list('created_at', flat=True)
+        })
+        streak, high_score_streak = solve_streaks(solve_dates)
+        Profile.objects.filter(user_id=user_id).update(
+            streak=streak,
+            high_score_streak=high_score_streak,
+            last_solved_date=solve_dates[-1] if solve_dates else None
+        )
+
+def rebuild_runtime_stats(problem_ids):
+    """
+    Rebuild each problem's runtime histogram from its accepted submissions.
+
+    Args:
+        problem_ids (set): IDs of the problems to rebuild.
+    """
+    for problem_id in problem_ids:
+        telemetries = Submission.objects.filter(
+            problem_id=problem_id, status='completed', telemetry__isnull=False
+        ).values_list('telemetry', flat=True)
+        with transaction.atomic():
+            stats, _ = ProblemStats.objects.select_for_update().get_or_create(problem_id=problem_id)
+            stats.runtime_histogram = {}
+            stats.accepted_count = 0
+            for telemetry in telemetries:
+                stats.add_runtime(total_cpu_ms(telemetry))
+            stats.save(update_fields=['runtime_histogram', 'accepted_count'])
+
+def reconcile(pairs):
+    """
+    Bring everything derived from verdicts in line after a rejudge.
+
+    Each step recomputes from the submissions rather than adjusting
+    counts, so it is safe to run again after an interruption.
+
+    Args:
+        pairs (set): (user_id, problem_id) pairs whose verdicts changed.
+    """
+    user_ids = {user_id for user_id, _ in pairs}
+    reconcile_progress(pairs)
+    reconcile_leaderboard(user_ids)
+    reconcile_streaks(user_ids)
+    rebuild_runtime_stats({problem_id for _, problem_id in pairs})
+
+def run_rejudge(filters, workers=REJUDGE_WORKERS, batch_size=REJUDGE_BATCH_SIZE,
+                checkpoint_path=REJUDGE_CHECKPOINT, checkpoint=None, dry_run=False,
+                on_progress=None, stress=False):
+    """
+    Rejudge the selected submissions and reconcile the results.
+
+    Verdicts are written in one bulk update per batch, after which the
+    checkpoint is saved; a batch that was written but not checkpointed is
+    simply judged again on resume. Only submissions whose verdict changed
+    are written. The checkpoint is removed once reconciliation finishes.
+
+    Args:
+        filters (dict): Filters from build_filters.
+        workers (int): Number of submissions judged concurrently.
+        batch_size (int): Number of submissions per batch.
+        checkpoint_path (str): Where to save progress.
+        checkpoint (dict): Progress loaded by load_checkpoint to resume from.
+        dry_run (bool): Whether to only report changes without writing them.
+        on_progress (callable): Optional callback called after every batch
+            with the progress so far, including the judging rate per second.
+        stress (bool): Whether to stress test submissions, see rejudge_submission.
+
+    Returns:
+        dict: filters, last_id, judged, changed, total, elapsed and the
+            number of users and problems reconciled.
+    """
+    if checkpoint is None:
+        checkpoint = {"filters": filters, "stress": stress, "last_id": 0, "judged": 0, "changed": 0, "pairs": []}
+    # A resumed run keeps the stress setting it started with
+    stress = checkpoint.get("stress", stress)
+    pairs = {tuple(pair) for pair in checkpoint["pairs"]}
+    submissions = filtered_submissions(checkpoint["filters"])
+    progress = dict(checkpoint, total=checkpoint["judged"] + submissions.filter(
+        id__gt=checkpoint["last_id"]
+    ).count())
+    started = time.monotonic()
+    resumed_from = checkpoint["judged"]
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for batch in iter_submission_batches(submissions, checkpoint["last_id"], batch_size):
+            # Load the suites here so the worker threads never touch the database
+            suites = {problem_id: get_test_suite(problem_id)
+                      for problem_id in {submission.problem_id for submission in batch}}
+            verdicts = executor.map(
+                lambda submission: rejudge_submission(suites[submission.problem_id], submission, stress),
+                batch
+            )
+
+            changed = []
+            for submission, (status, telemetry) in zip(batch, verdicts):
+                if status != submission.status:
+                    submission.status = status
+                    submission.telemetry = telemetry
+                    changed.append(submission)
+                    pairs.add((submission.user_id, submission.problem_id))
+            if changed and not dry_run:
+                Submission.objects.bulk_update(changed, ['status', 'telemetry'])
+
+            checkpoint["last_id"] = batch[-1].id
+            checkpoint["judged"] += len(batch)
+            checkpoint["changed"] += len(changed)
+            checkpoint["pairs"] = sorted(pairs)
+            if not dry_run:
+                save_checkpoint(checkpoint_path, checkpoint)
+            if on_progress:
+                elapsed = time.monotonic() - started
+                progress.update(checkpoint, elapsed=elapsed,
+                                rate=(checkpoint["judged"] - resumed_from) / elapsed)
+                on_progress(progress)
+
+    if not dry_run:
+        reconcile(pairs)
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+    progress.update(
+        checkpoint,
+        elapsed=time.monotonic() - started,
+        users=len({user_id for user_id, _ in pairs}),
+        problems=len({problem_id for _, problem_id in pairs})
+    )
+    del progress["pairs"]
+    return progress
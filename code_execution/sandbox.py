@@ -0,0 +1,1144 @@
+"""
+Sandboxed execution of user code in pre-forked worker processes.
+
+This module provides functionality to:
+- Build the restricted execution environment used for user code
+- Compile user code once so it can be shipped to workers as a code object
+- Keep a pool of long-lived worker processes that run (code, input) jobs
+- Run a batch of inputs in one job to cut per-job overhead
+- Call the entry function of function-call problems with structured
+  arguments and return its result as plain values
+- Read large test inputs from memory-mapped cache files rather than
+  receiving them with each job
+- Alternatively fork every job from a pre-warmed zygote process
+- Hard-kill and replace workers whose job exceeds its timeout
+- Enforce CPU-time and address-space limits and measure resource usage
+- Count the lines of user code executed, for complexity analysis
+- Profile hit counts and time for each line of user code
+- Profile the memory held by each line of user code with tracemalloc
+- Cap the output of each execution
+- Tell sandbox failures that depend on host load from failures of the code
+
+The module deliberately avoids importing Django so that worker processes
+can be started with any multiprocessing start method.
+"""
+
+import gc
+import os
+import sys
+import math
+import mmap
+import time
+import queue
+import atexit
+import signal
+import marshal
+import threading
+import traceback
+import tracemalloc
+import multiprocessing
+import multiprocessing.connection
+from collections import namedtuple
+from multiprocessing import reduction
+
+try:
+    import resource
+except ImportError:  # resource limits are only available on Unix
+    resource = None
+
+# Constants
+SANDBOX_POOL_SIZE = max(2, os.cpu_count() or 2)
+SANDBOX_MAX_JOBS_PER_WORKER = 200  # recycle workers after this many jobs
+USER_CODE_FILENAME = "<solution>"  # shown in tracebacks of user code
+MAX_OUTPUT_CHARS = 1_000_000  # output cap when no tighter limit is given
+MEMORY_PROFILE_TOP_LINES = 5  # allocation sites reported by profile_memory
+SANDBOX_BACKEND = os.environ.get("SANDBOX_BACKEND", "pool")  # "pool" or "zygote"
+
+# Execution statuses reported by workers
+STATUS_OK = "ok"
+STATUS_RUNTIME_ERROR = "runtime error"
+STATUS_TIME_LIMIT = "time limit exceeded"
+STATUS_MEMORY_LIMIT = "memory limit exceeded"
+STATUS_OUTPUT_LIMIT = "output limit exceeded"
+# Result flags of sandbox failures that depend on host load, not on the code
+HOST_DEPENDENT_FLAGS = ("timed_out", "crashed")
+
+# Dictionary of allowed built-in functions for code execution
+SAFE_FUNCTIONS = {
+    "print": print,
+    "len": len,
+    "range": range,
+    "int": int,
+    "float": float,
+    "str": str,
+    "bool": bool,
+    "list": list,
+    "dict": dict,
+    "tuple": tuple,
+    "set": set,
+    "enumerate": enumerate,
+    "sum": sum,
+    "min": min,
+    "max": max,
+    "sorted": sorted,
+    "abs": abs,
+    "all": all,
+    "any": any,
+    "round": round,
+    "__builtins__": None,  # Restrict access to other builtins
+}
+
+# A call of a function-call problem's entry function, sent in place of input values
+FunctionCall = namedtuple("FunctionCall", ["function", "args"])
+
+# Test input in a cache file that workers memory-map instead of receiving it
+# with the job: comma-separated text, or marshalled arguments when it is the
+# args of a FunctionCall
+MappedInput = namedtuple("MappedInput", ["path"])
+
+# Several inputs run one after another in a single job, each under the job's
+# limits; with stop_on_failure the job ends after the first input that fails
+InputBatch = namedtuple("InputBatch", ["inputs", "stop_on_failure"], defaults=[False])
+
+class OutputLimitExceeded(BaseException):
+    """Raised inside user code when it prints more than its output limit."""
+
+class BoundedOutput:
+    """
+    Write-only text buffer that stops user code once it exceeds a size limit.
+    """
+
+    def __init__(self, limit=MAX_OUTPUT_CHARS):
+        self.limit = limit
+        self.size = 0
+        self.parts = []
+
+    def write(self, text):
+        self.size += len(text)
+        if self.size > self.limit:
+            raise OutputLimitExceeded()
+        self.parts.append(text)
+        return len(text)
+
+    def getvalue(self):
+        return "".join(self.parts)
+
+def create_print_function(output_buffer):
+    """
+    Creates a print replacement that writes to a per-execution buffer.
+
+    Capturing output this way, rather than swapping sys.stdout, keeps
+    concurrent executions in the same process from mixing their output.
+
+    Args:
+        output_buffer (BoundedOutput): Buffer that receives the printed text.
+
+    Returns:
+        function: print-compatible function bound to the buffer.
+    """
+    def safe_print(*args, sep=" ", end="\n", file=None, flush=False):
+        print(*args, sep=sep, end=end, file=output_buffer)
+
+    return safe_print
+
+def split_input(test_input):
+    """
+    Split a test input into the values returned by successive input() calls.
+
+    Args:
+        test_input (str): Comma-separated input values.
+
+    Returns:
+        tuple: The stripped values, or an empty tuple for empty input.
+    """
+    if not test_input:
+        return ()
+    return tuple(x.strip() for x in test_input.split(','))
+
+def create_execution_environment(test_input="", output_buffer=None):
+    """
+    Creates a safe execution environment with allowed functions and input handling.
+
+    Args:
+        test_input (str, tuple or iterator): Comma-separated input values for
+            testing, or values already split by split_input or read by
+            iter_mapped_values.
+        output_buffer (BoundedOutput): Buffer that captures print output, if any.
+
+    Returns:
+        dict: Environment dictionary with safe functions and input handling.
+    """
+    env = SAFE_FUNCTIONS.copy()
+
+    if output_buffer is not None:
+        env["print"] = create_print_function(output_buffer)
+
+    if isinstance(test_input, str):
+        test_input = split_input(test_input)
+
+    if test_input:
+        input_queue = iter(test_input)
+
+        def custom_input(prompt=""):
+            try:
+                return next(input_queue)
+            except StopIteration:
+                return ""
+
+        env["input"] = custom_input
+
+    return env
+
+class EntryFunctionError(Exception):
+    """Raised when a solution lacks its entry function or returns an unsupported value."""
+
+def plain_value(value):
+    """
+    Convert a return value into the JSON values test cases are written in.
+
+    Tuples become lists, sets become sorted lists and dictionary keys become
+    strings, so results compare equal to expected values however they were
+    built.
+
+    Args:
+        value: Value returned by user code.
+
+    Returns:
+        The value made of None, bools, numbers, strings, lists and dicts.
+
+    Raises:
+        EntryFunctionError: If the value contains anything else.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [plain_value(item) for item in value]
+    if isinstance(value, (set, frozenset)):
+        items = [plain_value(item) for item in value]
+        try:
+            return sorted(items)
+        except TypeError:
+            raise EntryFunctionError("Returned a set whose items cannot be ordered") from None
+    if isinstance(value, dict):
+        return {str(key): plain_value(item) for key, item in value.items()}
+    raise EntryFunctionError(f"Returned a value of unsupported type {type(value).__name__}")
+
+def call_entry_function(globals_dict, call):
+    """
+    Call the entry function defined by user code.
+
+    Args:
+        globals_dict (dict): Globals the user code was executed in.
+        call (FunctionCall): Name of the function and the arguments to pass.
+
+    Returns:
+        The function's return value, converted by plain_value.
+
+    Raises:
+        EntryFunctionError: If the function is not defined or returns an
+            unsupported value.
+    """
+    function = globals_dict.get(call.function)
+    if not callable(function):
+        raise EntryFunctionError(f"Function {call.function}() is not defined")
+    return plain_value(function(*call.args))
+
+def iter_mapped_values(data):
+    """
+    Yield the comma-separated values of a mapped input file one at a time.
+
+    Only the value being returned is copied out of the mapping.
+
+    Args:
+        data (mmap.mmap | bytes): Contents of the input file.
+
+    Yields:
+        str: Each stripped value, like split_input.
+    """
+    start, end = 0, len(data)
+    if not end:
+        return
+    while True:
+        comma = data.find(b",", start)
+        stop = end if comma == -1 else comma
+        yield data[start:stop].decode().strip()
+        if comma == -1:
+            return
+        start = comma + 1
+
+def _map_file(path):
+    """Memory-map a file read-only; empty files, which cannot be mapped, give b""."""
+    with open(path, "rb") as f:
+        if not os.fstat(f.fileno()).st_size:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def resolve_mapped_input(test_input):
+    """
+    Replace a MappedInput, on its own or as a FunctionCall's args, with its data.
+
+    Args:
+        test_input: Test input of a job.
+
+    Returns:
+        tuple: (test_input, mapping) where mapping is the memory map to
+            close once the job has finished, or None.
+    """
+    if isinstance(test_input, FunctionCall) and isinstance(test_input.args, MappedInput):
+        mapping = _map_file(test_input.args.path)
+        return test_input._replace(args=marshal.loads(mapping)), mapping
+    if isinstance(test_input, MappedInput):
+        mapping = _map_file(test_input.path)
+        return iter_mapped_values(mapping), mapping
+    return test_input, None
+
+def compile_user_code(code):
+    """
+    Compiles user code into a code object that workers can run repeatedly.
+
+    Code objects cannot be pickled, so the compiled code is marshalled to
+    bytes before it is sent to a worker.
+
+    Args:
+        code (str): Python source submitted by the user.
+
+    Returns:
+        tuple: (compiled, error) where compiled is the marshalled code object,
+            or None together with the formatted compilation error.
+    """
+    try:
+        return marshal.dumps(compile(code, USER_CODE_FILENAME, "exec")), None
+    except Exception:
+        return None, traceback.format_exc(limit=0)
+
+class CPUTimeLimitExceeded(BaseException):
+    """Raised inside a worker when a job uses up its CPU-time limit."""
+
+_limits_active = False
+
+def _handle_cpu_limit(signum, frame):
+    """SIGPROF/SIGXCPU handler; both signals repeat while the job runs past its limit."""
+    if _limits_active:
+        raise CPUTimeLimitExceeded()
+
+def _address_space_bytes():
+    """Returns the current virtual memory size of this process, if known."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * resource.getpagesize()
+    except (OSError, ValueError, IndexError):
+        return None
+
+def _reset_peak_rss():
+    """Resets the kernel's peak RSS counter so it can be measured per job."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+def _peak_rss_kb():
+    """Returns the peak resident set size in kilobytes, if it can be measured."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is not None:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return None
+
+def _apply_limits(limits):
+    """
+    Applies CPU-time and address-space limits to the current process.
+
+    The CPU-time limit is enforced precisely with a profiling timer, which
+    also works for sub-second limits, and backed up by RLIMIT_CPU. Soft
+    limits are set relative to what the process has already used, so
+    long-lived workers can apply fresh limits for every job.
+
+    Args:
+        limits (dict): Optional cpu_time (seconds) and memory_mb entries.
+
+    Returns:
+        dict: Previous limits, to be passed to _restore_limits.
+    """
+    previous = {}
+
+    if limits.get("cpu_time") and hasattr(signal, "setitimer"):
+        # Repeat every 100ms in case user code swallows the first exception
+        signal.setitimer(signal.ITIMER_PROF, limits["cpu_time"], 0.1)
+        previous["cpu_timer"] = True
+
+    if resource is None:
+        return previous
+
+    if limits.get("cpu_time"):
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        used = int(usage.ru_utime + usage.ru_stime) + 1
+        soft, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        new_soft = used + math.ceil(limits["cpu_time"]) + 1
+        if hard == resource.RLIM_INFINITY or new_soft <= hard:
+            previous[resource.RLIMIT_CPU] = (soft, hard)
+            resource.setrlimit(resource.RLIMIT_CPU, (new_soft, hard))
+
+    address_space = _address_space_bytes()
+    if limits.get("memory_mb") and address_space is not None:
+        soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+        new_soft = address_space + int(limits["memory_mb"]) * 1024 * 1024
+        if hard == resource.RLIM_INFINITY or new_soft <= hard:
+            previous[resource.RLIMIT_AS] = (soft, hard)
+            resource.setrlimit(resource.RLIMIT_AS, (new_soft, hard))
+
+    return previous
+
+def _restore_limits(previous):
+    """Restores limits saved by _apply_limits."""
+    for limit, values in previous.items():
+        if limit == "cpu_timer":
+            signal.setitimer(signal.ITIMER_PROF, 0)
+        else:
+            resource.setrlimit(limit, values)
+
+class LineTracer:
+    """
+    sys.settrace hook that counts the lines of user code executed.
+
+    Only frames whose code comes from USER_CODE_FILENAME are traced, so
+    time spent inside built-in functions is not counted.
+    """
+
+    def __init__(self):
+        self.operations = 0
+
+    def trace_calls(self, frame, event, arg):
+        if frame.f_code.co_filename != USER_CODE_FILENAME:
+            return None
+        return self.trace_lines
+
+    def trace_lines(self, frame, event, arg):
+        if event == "line":
+            self.operations += 1
+        return self.trace_lines
+
+    def start(self):
+        sys.settrace(self.trace_calls)
+
+    def stop(self):
+        sys.settrace(None)
+
+class LineProfiler(LineTracer):
+    """
+    sys.settrace hook that records hit counts and time for each line of user code.
+
+    The total time of a line runs from its line event to the next event in
+    the same frame, so a line that calls a user function includes the time
+    spent in that call; its self time leaves the call out.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.hits = {}
+        self.times = {}
+        self.call_times = {}
+        self.current = {}  # frame -> (line number, time the line started)
+        self.entered = {}  # frame -> time the frame was entered
+
+    def _charge(self, frame, now):
+        current = self.current.get(frame)
+        if current is not None:
+            line, started = current
+            self.times[line] = self.times.get(line, 0.0) + now - started
+
+    def trace_calls(self, frame, event, arg):
+        if frame.f_code.co_filename != USER_CODE_FILENAME:
+            return None
+        self.entered[frame] = time.perf_counter()
+        return self.trace_lines
+
+    def trace_lines(self, frame, event, arg):
+        now = time.perf_counter()
+        self._charge(frame, now)
+        if event == "line":
+            line = frame.f_lineno
+            self.operations += 1
+            self.hits[line] = self.hits.get(line, 0) + 1
+            self.current[frame] = (line, now)
+        elif event == "return":
+            self.current.pop(frame, None)
+            entered = self.entered.pop(frame, None)
+            caller = self.current.get(frame.f_back)
+            if entered is not None and caller is not None:
+                self.call_times[caller[0]] = self.call_times.get(caller[0], 0.0) + now - entered
+        elif frame in self.current:
+            self.current[frame] = (self.current[frame][0], now)
+        return self.trace_lines
+
+    def stop(self):
+        super().stop()
+        # Frames interrupted by a limit never see their return event
+        now = time.perf_counter()
+        for frame in list(self.current):
+            self._charge(frame, now)
+        self.current.clear()
+        self.entered.clear()
+
+    def heatmap(self):
+        """
+        Summarise the recorded lines.
+
+        Returns:
+            dict: lines as [line number, hits, total_ms, self_ms] in line
+                order, and the hottest line number by self time.
+        """
+        lines = []
+        for line in sorted(self.hits):
+            total = self.times.get(line, 0.0)
+            own = max(total - self.call_times.get(line, 0.0), 0.0)
+            lines.append([line, self.hits[line], round(total * 1000, 3), round(own * 1000, 3)])
+        hottest = max(lines, key=lambda entry: entry[3])[0] if lines else None
+        return {"lines": lines, "hottest": hottest}
+
+class MemoryProfiler:
+    """
+    Traces allocations with tracemalloc while user code runs.
+
+    Reports the peak traced memory and the lines of user code holding the
+    most memory when the code finished.
+    """
+
+    def __init__(self, top=MEMORY_PROFILE_TOP_LINES):
+        self.top = top
+        self.snapshot = None
+        self.peak = 0
+
+    def start(self):
+        tracemalloc.start()
+
+    def stop(self):
+        """Stops tracing; call while the user code's objects are still alive."""
+        try:
+            _, self.peak = tracemalloc.get_traced_memory()
+            self.snapshot = tracemalloc.take_snapshot()
+        except MemoryError:
+            self.snapshot = None
+        finally:
+            tracemalloc.stop()
+
+    def summary(self):
+        """
+        Summarise the traced allocations.
+
+        Returns:
+            dict: peak_kb traced during the run, and top as [line number,
+                size_kb, allocation count] for the lines of user code holding
+                the most memory, largest first.
+        """
+        top = []
+        if self.snapshot is not None:
+            user_traces = self.snapshot.filter_traces([tracemalloc.Filter(True, USER_CODE_FILENAME)])
+            for stat in user_traces.statistics("lineno")[:self.top]:
+                top.append([stat.traceback[0].lineno, round(stat.size / 1024, 1), stat.count])
+        return {"peak_kb": round(self.peak / 1024, 1), "top": top}
+
+def execute_job(code, test_input="", limits=None, options=None):
+    """
+    Executes user code once inside the current process.
+
+    This is what a sandbox worker runs for every job it receives. Output is
+    captured per execution, so it is safe to call from several threads as
+    long as no limits are given; limits apply to the whole process and are
+    meant for sandbox workers only.
+
+    Args:
+        code (str | bytes): Python source, or code compiled by compile_user_code.
+        test_input (str, tuple, MappedInput or FunctionCall): Comma-separated,
+            pre-split or memory-mapped input values, or the entry function
+            call of a function-call problem.
+        limits (dict): Optional cpu_time (seconds), memory_mb and output_chars limits.
+        options (dict): Optional execution modes; count_operations adds the
+            number of user code lines executed to the result,
+            profile_lines adds a line_profile heatmap (see LineProfiler) and
+            profile_memory adds a memory_profile (see MemoryProfiler).
+
+    Returns:
+        dict: Execution result containing success status, output/error, the
+            execution status and the measured cpu_time, wall_time and
+            peak_memory_kb, plus the entry function's return_value for a
+            FunctionCall.
+    """
+    global _limits_active
+    limits = limits or {}
+    options = options or {}
+    try:
+        test_input, mapping = resolve_mapped_input(test_input)
+    except (OSError, ValueError, EOFError) as e:
+        return {"success": False, "error": f"Test input is unavailable: {e}", "status": STATUS_RUNTIME_ERROR}
+    if options.get("profile_lines"):
+        tracer = LineProfiler()
+    elif options.get("count_operations"):
+        tracer = LineTracer()
+    else:
+        tracer = None
+    memory_profiler = MemoryProfiler() if options.get("profile_memory") else None
+    output_buffer = BoundedOutput(limits.get("output_chars") or MAX_OUTPUT_CHARS)
+    call = test_input if isinstance(test_input, FunctionCall) else None
+    return_value = None
+    status = STATUS_OK
+    error = None
+
+    if limits:
+        _reset_peak_rss()
+    previous_limits = _apply_limits(limits)
+    start_wall = time.perf_counter()
+    # Process CPU clocks turn tick-granular while ITIMER_PROF is armed, but
+    # user code runs on this thread and the thread clock stays precise
+    start_cpu = time.thread_time()
+    try:
+        # Create safe execution environment with its own output capture
+        globals_dict = create_execution_environment(() if call else test_input, output_buffer)
+        if isinstance(code, bytes):
+            code = marshal.loads(code)
+
+        # Execute the code
+        _limits_active = bool(limits)
+        if memory_profiler is not None:
+            memory_profiler.start()
+        if tracer is not None:
+            tracer.start()
+        exec(code, globals_dict)
+        if call is not None:
+            return_value = call_entry_function(globals_dict, call)
+    except CPUTimeLimitExceeded:
+        status = STATUS_TIME_LIMIT
+        error = f"CPU time limit of {limits.get('cpu_time')} seconds exceeded"
+    except MemoryError:
+        status = STATUS_MEMORY_LIMIT
+        error = f"Memory limit of {limits.get('memory_mb')} MB exceeded"
+    except OutputLimitExceeded:
+        status = STATUS_OUTPUT_LIMIT
+        error = f"Output limit of {output_buffer.limit} characters exceeded"
+    except EntryFunctionError as e:
+        status = STATUS_RUNTIME_ERROR
+        error = str(e)
+    except Exception:
+        status = STATUS_RUNTIME_ERROR
+        error = traceback.format_exc()
+    finally:
+        if tracer is not None:
+            tracer.stop()
+        _limits_active = False
+        cpu_time = time.thread_time() - start_cpu
+        wall_time = time.perf_counter() - start_wall
+        _restore_limits(previous_limits)
+        if memory_profiler is not None:
+            memory_profiler.stop()
+        globals_dict = None
+        if isinstance(mapping, mmap.mmap):
+            mapping.close()
+
+    metrics = {
+        "status": status,
+        "cpu_time": round(cpu_time, 6),
+        "wall_time": round(wall_time, 6),
+        "peak_memory_kb": _peak_rss_kb() if limits else None,
+    }
+    if tracer is not None:
+        metrics["operations"] = tracer.operations
+    if isinstance(tracer, LineProfiler):
+        metrics["line_profile"] = tracer.heatmap()
+    if memory_profiler is not None:
+        metrics["memory_profile"] = memory_profiler.summary()
+    if call is not None and status == STATUS_OK:
+        metrics["return_value"] = return_value
+    if status == STATUS_OK:
+        return {"success": True, "output": output_buffer.getvalue().strip(), **metrics}
+    return {"success": False, "error": error, **metrics}
+
+def _install_cpu_limit_handlers():
+    """Turns SIGPROF and SIGXCPU into CPUTimeLimitExceeded in this process."""
+    for name in ("SIGPROF", "SIGXCPU"):
+        if hasattr(signal, name):
+            signal.signal(getattr(signal, name), _handle_cpu_limit)
+
+def _run_single(code, test_input, limits, options):
+    """Runs user code on one input, see execute_job."""
+    try:
+        return execute_job(code, test_input, limits, options)
+    except CPUTimeLimitExceeded:
+        # The limit fired after the user code had already finished
+        return {"success": False, "error": "CPU time limit exceeded", "status": STATUS_TIME_LIMIT}
+
+def _run_job(job):
+    """
+    Runs a (code, input, limits, options) job.
+
+    Returns its result, or a list with the result for each input of an
+    InputBatch, which ends at the first failed input if the batch stops on
+    failure.
+    """
+    code, test_input, limits, options = job
+    if isinstance(test_input, InputBatch):
+        if isinstance(code, bytes):
+            code = marshal.loads(code)
+        results = []
+        for item in test_input.inputs:
+            result = _run_single(code, item, limits, options)
+            results.append(result)
+            if test_input.stop_on_failure and not result["success"]:
+                break
+        return results
+    return _run_single(code, test_input, limits, options)
+
+def _worker_main(conn):
+    """
+    Main loop of a sandbox worker process.
+
+    Receives (code, input, limits, options) jobs over the pipe until it is
+    closed or sent None.
+    """
+    _install_cpu_limit_handlers()
+
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            break
+        if job is None:
+            break
+        conn.send(_run_job(job))
+
+def _reap_children(children):
+    """Reaps the zygote's children that have exited and forgets their pids."""
+    for pid in list(children):
+        try:
+            reaped, _ = os.waitpid(pid, os.WNOHANG)
+        except ChildProcessError:
+            reaped = pid
+        if reaped:
+            children.discard(pid)
+
+def _zygote_main(conn):
+    """
+    Main loop of a zygote process.
+
+    The zygote warms itself up once, then forks a fresh child for every job.
+    Each job arrives as ("run", job) with the (code, input, limits, options)
+    job, followed by a file descriptor for the child's result pipe; the
+    zygote replies with the child's pid. ("kill", pid) kills a child that
+    timed out. The zygote reaps its children itself, and only kills children
+    it has not reaped yet, whose pids cannot have been reused. Stops when
+    the pipe is closed.
+    """
+    _install_cpu_limit_handlers()
+
+    # Run a job once so lazily initialised state is shared with every child
+    compiled, _ = compile_user_code("pass")
+    _run_job((compiled, "", None, None))
+    gc.collect()
+    if hasattr(gc, "freeze"):
+        # Keep the garbage collector from touching, and so copying, warm pages
+        gc.freeze()
+
+    children = set()
+    while True:
+        try:
+            command, argument = conn.recv()
+            if command == "run":
+                result_fd = reduction.recv_handle(conn)
+        except (EOFError, OSError):
+            break
+        _reap_children(children)
+
+        if command == "kill":
+            if argument in children:
+                os.kill(argument, signal.SIGKILL)
+                os.waitpid(argument, 0)
+                children.discard(argument)
+            continue
+
+        try:
+            pid = os.fork()
+        except OSError:
+            os.close(result_fd)
+            conn.send(None)
+            continue
+
+        if pid == 0:
+            exit_code = 1
+            try:
+                conn.close()
+                result_conn = multiprocessing.connection.Connection(result_fd)
+                result_conn.send(_run_job(argument))
+                exit_code = 0
+            finally:
+                os._exit(exit_code)
+
+        children.add(pid)
+        os.close(result_fd)
+        conn.send(pid)
+
+def _get_context():
+    """
+    Returns the multiprocessing context used to start sandbox workers.
+
+    Uses a fork server where available so workers are forked from a clean,
+    single-threaded process rather than from a busy web worker.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context("spawn")
+
+class SandboxTimeout(Exception):
+    """Raised when a job does not finish within its timeout."""
+
+class SandboxWorkerDied(Exception):
+    """Raised when a worker process exits while running a job."""
+
+class SandboxWorker:
+    """
+    A single long-lived worker process and the pipe used to talk to it.
+    """
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.jobs_run = 0
+
+    def run(self, job, timeout):
+        """
+        Sends a job to the worker and waits for its result.
+
+        Args:
+            job (tuple): (code, test_input, limits, options) to execute.
+            timeout (float): Seconds to wait for the result.
+
+        Returns:
+            dict: Execution result produced by the worker.
+
+        Raises:
+            SandboxTimeout: If no result arrives within the timeout.
+            SandboxWorkerDied: If the worker exits before replying.
+        """
+        self.jobs_run += 1
+        try:
+            self.conn.send(job)
+            if not self.conn.poll(timeout):
+                raise SandboxTimeout()
+            return self.conn.recv()
+        except (EOFError, OSError) as e:
+            raise SandboxWorkerDied() from e
+
+    def is_alive(self):
+        return self.process.is_alive()
+
+    def kill(self):
+        """Hard-kills the worker process and releases its pipe."""
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self):
+        """Asks the worker to exit, killing it if it does not."""
+        try:
+            self.conn.send(None)
+        except (EOFError, OSError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+def _timeout_result(timeout):
+    """Result reported for a job that was killed at its wall-clock timeout."""
+    return {
+        "success": False,
+        "error": f"Code execution timed out after {timeout} seconds",
+        "status": STATUS_TIME_LIMIT,
+        "wall_time": timeout,
+        "timed_out": True
+    }
+
+def _crashed_result(exitcode=None):
+    """Result reported for a job whose process died before replying."""
+    if exitcode is not None and exitcode == -getattr(signal, "SIGXCPU", 0):
+        return {
+            "success": False,
+            "error": "CPU time limit exceeded",
+            "status": STATUS_TIME_LIMIT,
+            "crashed": True
+        }
+    return {
+        "success": False,
+        "error": "Code execution was terminated unexpectedly",
+        "status": STATUS_RUNTIME_ERROR,
+        "crashed": True
+    }
+
+def host_dependent_flags(result):
+    """The timed_out and crashed flags set on a result, to copy onto a test result."""
+    return {flag: True for flag in HOST_DEPENDENT_FLAGS if result.get(flag)}
+
+def host_dependent(result):
+    """Whether a result timed out or crashed, which depends on host load rather than on the code."""
+    return bool(host_dependent_flags(result))
+
+class SandboxPool:
+    """
+    A fixed-size pool of sandbox workers shared by all requests in a process.
+
+    Workers are started lazily, reused across jobs and replaced whenever one
+    times out, dies or reaches SANDBOX_MAX_JOBS_PER_WORKER jobs.
+    """
+
+    def __init__(self, size=SANDBOX_POOL_SIZE):
+        self.size = size
+        self.context = _get_context()
+        self.idle = queue.LifoQueue()
+        self.started = 0
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def _acquire(self):
+        """Returns an idle worker, starting a new one if the pool is not full."""
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            if self.started < self.size:
+                self.started += 1
+                try:
+                    return SandboxWorker(self.context)
+                except Exception:
+                    self.started -= 1
+                    raise
+        return self.idle.get()
+
+    def _release(self, worker):
+        """Returns a worker to the pool, recycling it if it is worn out."""
+        if self.closed:
+            worker.stop()
+        elif worker.jobs_run >= SANDBOX_MAX_JOBS_PER_WORKER or not worker.is_alive():
+            worker.stop()
+            self._spawn_replacement()
+        else:
+            self.idle.put(worker)
+
+    def _replace(self, worker):
+        """Kills a misbehaving worker and puts a fresh one in its place."""
+        worker.kill()
+        self._spawn_replacement()
+
+    def _spawn_replacement(self):
+        """Starts a worker to take the slot of one that was stopped."""
+        if not self.closed:
+            try:
+                self.idle.put(SandboxWorker(self.context))
+                return
+            except Exception:
+                pass
+        with self.lock:
+            self.started -= 1
+
+    def run(self, code, test_input, timeout, limits=None, options=None):
+        """
+        Runs user code in a pooled worker with timeout protection.
+
+        Args:
+            code (str | bytes): Python source, or code from compile_user_code.
+            test_input: Input values as accepted by execute_job, or an
+                InputBatch of them.
+            timeout (float): Wall-clock seconds before the worker is killed.
+            limits (dict): Optional cpu_time (seconds), memory_mb and
+                output_chars limits.
+            options (dict): Optional execution modes passed to execute_job.
+
+        Returns:
+            dict: Execution result containing success status, output/error,
+                the execution status and measured resource usage. For an
+                InputBatch, a list of results; a batch that times out or
+                crashes gives a single result instead.
+        """
+        worker = self._acquire()
+        try:
+            result = worker.run((code, test_input, limits, options), timeout)
+        except SandboxTimeout:
+            self._replace(worker)
+            return _timeout_result(timeout)
+        except SandboxWorkerDied:
+            self._replace(worker)
+            return _crashed_result(worker.process.exitcode)
+        self._release(worker)
+        return result
+
+    def close(self):
+        """Stops all idle workers; busy workers are stopped when released."""
+        self.closed = True
+        while True:
+            try:
+                self.idle.get_nowait().stop()
+            except queue.Empty:
+                break
+
+class SandboxZygote:
+    """
+    A pre-warmed zygote process that forks a fresh child for every job.
+
+    Every job runs in a brand new process, so nothing leaks between jobs,
+    yet forking the warm zygote costs far less than starting a worker. On
+    timeout only that job's child is killed. The zygote is restarted if it
+    dies. Like the pool, at most size children run at once; further jobs
+    wait for a slot.
+    """
+
+    def __init__(self, size=SANDBOX_POOL_SIZE):
+        self.context = _get_context()
+        self.lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(size)
+        self.conn = None
+        self.process = None
+
+    def _start(self):
+        """Starts the zygote process."""
+        self.conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(target=_zygote_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def _discard(self):
+        """Kills the zygote after it stopped responding; it restarts on the next job."""
+        if self.process is not None:
+            self.process.kill()
+            self.process.join()
+            self.conn.close()
+        self.conn = None
+        self.process = None
+
+    def _fork(self, job):
+        """
+        Asks the zygote to fork a child for a job.
+
+        Args:
+            job (tuple): (code, test_input, limits, options) to execute.
+
+        Returns:
+            tuple: (pid, conn) for the child and the pipe its result arrives on.
+
+        Raises:
+            SandboxWorkerDied: If the zygote dies or cannot fork.
+        """
+        result_conn, child_conn = self.context.Pipe()
+        try:
+            with self.lock:
+                if self.process is None or not self.process.is_alive():
+                    self._discard()
+                    self._start()
+                try:
+                    self.conn.send(("run", job))
+                    reduction.send_handle(self.conn, child_conn.fileno(), self.process.pid)
+                    pid = self.conn.recv()
+                except (EOFError, OSError) as e:
+                    self._discard()
+                    raise SandboxWorkerDied() from e
+        except BaseException:
+            result_conn.close()
+            raise
+        finally:
+            child_conn.close()
+        if pid is None:
+            result_conn.close()
+            raise SandboxWorkerDied()
+        return pid, result_conn
+
+    def _kill(self, pid):
+        """
+        Asks the zygote to kill a child that timed out.
+
+        The zygote does the kill because it reaps its own children, so it
+        knows whether the pid still belongs to that child.
+
+        Args:
+            pid (int): The child's pid, from _fork.
+        """
+        with self.lock:
+            if self.process is None or not self.process.is_alive():
+                # A dead zygote's children no longer belong to anyone we can ask
+                return
+            try:
+                self.conn.send(("kill", pid))
+            except OSError:
+                self._discard()
+
+    def run(self, code, test_input, timeout, limits=None, options=None):
+        """
+        Runs user code in a freshly forked child with timeout protection.
+
+        Takes the same arguments and returns the same results as
+        SandboxPool.run. Blocks until fewer than size children are running.
+        """
+        with self.slots:
+            try:
+                pid, conn = self._fork((code, test_input, limits, options))
+            except SandboxWorkerDied:
+                return _crashed_result()
+            try:
+                if not conn.poll(timeout):
+                    self._kill(pid)
+                    return _timeout_result(timeout)
+                return conn.recv()
+            except (EOFError, OSError):
+                return _crashed_result()
+            finally:
+                conn.close()
+
+    def close(self):
+        """Stops the zygote; children that are still running finish on their own."""
+        with self.lock:
+            if self.process is None:
+                return
+            # Closing the pipe makes the zygote exit
+            self.conn.close()
+            self.process.join(timeout=1)
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join()
+            self.conn = None
+            self.process = None
+
+def zygote_supported():
+    """Returns whether this platform can run the zygote backend."""
+    return hasattr(os, "fork") and hasattr(os, "WNOHANG") and reduction.HAVE_SEND_HANDLE
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """
+    Returns the process-wide sandbox, creating it on first use.
+
+    The SANDBOX_BACKEND environment variable selects between a pool of
+    long-lived workers ("pool") and a zygote that forks a fresh child per
+    job ("zygote"). The zygote falls back to the pool on platforms without
+    fork.
+
+    Returns:
+        SandboxPool | SandboxZygote: Shared sandbox that runs jobs.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                if SANDBOX_BACKEND == "zygote" and zygote_supported():
+                    _pool = SandboxZygote()
+                else:
+                    _pool = SandboxPool()
+                atexit.register(_pool.close)
+    return _pool
@@ -0,0 +1,25 @@
+"""
+Signal handlers for the code execution app.
+
+This module provides functionality to:
+- Drop a problem's cached test suite and verdicts when it is saved or deleted
+"""
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from problems.models import Problem
+from .test_suites import test_suite_cache
+from .verdict_cache import verdict_cache
+
+@receiver(post_save, sender=Problem)
+@receiver(post_delete, sender=Problem)
+def invalidate_problem_caches(sender, instance, **kwargs):
+    """
+    Drop cached judging data for a problem that has changed.
+
+    Args:
+        sender: The Problem model class.
+        instance: Problem object that was saved or deleted.
+    """
+    test_suite_cache.invalidate(instance.id)
+    verdict_cache.invalidate(instance.id)
@@ -0,0 +1,271 @@
+"""
+Randomised stress testing against a problem's reference solution.
+
+This module provides functionality to:
+- Generate many small random inputs of growing size from a problem's
+  input generator
+- Run the reference solution and a submission on them in batches spread
+  across the sandbox pool
+- Cache the reference solution's results, since the inputs are the same
+  for every submission
+- Report the smallest input on which the submission disagrees with the
+  reference
+"""
+
+import json
+import random
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from .complexity import InputGeneratorError, load_input_generator
+from .sandbox import SANDBOX_POOL_SIZE, FunctionCall, compile_user_code, host_dependent
+
+# Constants
+STRESS_RUNS = 200  # random inputs per stress test
+STRESS_BATCH_SIZE = 25  # inputs run in each sandbox job
+STRESS_MAX_N = 50  # size of the largest generated input
+STRESS_SEED = 0
+STRESS_CPU_TIME_LIMIT = 1  # CPU seconds allowed per input, if the problem allows more
+STRESS_WORKERS = max(1, SANDBOX_POOL_SIZE // 2)  # batches run at once, leaving workers for others
+STRESS_INPUT_PREVIEW_CHARS = 200  # characters of a failing input that are reported
+REFERENCE_CACHE_SIZE = 32  # problems whose reference results are kept
+
+class StressTestError(Exception):
+    """Raised when the input generator or reference solution is broken."""
+
+def generate_stress_inputs(generator_source, entry_function="", runs=STRESS_RUNS,
+                           max_n=STRESS_MAX_N, seed=STRESS_SEED):
+    """
+    Generate the random inputs of a stress test, smallest first.
+
+    Args:
+        generator_source (str): The problem's input generator source.
+        entry_function (str): The problem's entry function, if it has one.
+        runs (int): Number of inputs.
+        max_n (int): Size of the largest input.
+        seed (int): Seed for the generator's random numbers.
+
+    Returns:
+        list: (n, test_input) pairs in order of growing n.
+
+    Raises:
+        StressTestError: If the generator fails.
+    """
+    try:
+        generate = load_input_generator(generator_source)
+    except InputGeneratorError as e:
+        raise StressTestError(str(e)) from e
+
+    rng = random.Random(seed)
+    inputs = []
+    for index in range(runs):
+        n = 1 + index * max_n // runs
+        try:
+            generated = generate(n, rng)
+        except Exception as e:
+            raise StressTestError(f"Input generator failed for n={n}: {e}") from e
+        if entry_function:
+            inputs.append((n, FunctionCall(entry_function, tuple(generated))))
+        else:
+            inputs.append((n, str(generated)))
+    return inputs
+
+def input_preview(test_input):
+    """A stress input as shown to the user, truncated to STRESS_INPUT_PREVIEW_CHARS."""
+    if isinstance(test_input, FunctionCall):
+        test_input = json.dumps(list(test_input.args))
+    return test_input[:STRESS_INPUT_PREVIEW_CHARS]
+
+def result_value(result, entry_function=""):
+    """The value of a successful run that is compared: its output or return value."""
+    return result["return_value"] if entry_function else result["output"]
+
+def stress_limits(limits):
+    """
+    Get the limits each stress input runs under.
+
+    Stress inputs are small, so they get at most STRESS_CPU_TIME_LIMIT
+    seconds of CPU time each; a solution that needs longer fails anyway.
+
+    Args:
+        limits (dict): The problem's cpu_time and memory_mb limits.
+
+    Returns:
+        dict: The limits with cpu_time capped.
+    """
+    return dict(limits, cpu_time=min(limits["cpu_time"], STRESS_CPU_TIME_LIMIT))
+
+def _single_result(results):
+    """The result of a one-input batch, which is a single result if the job failed."""
+    return results if isinstance(results, dict) else results[0]
+
+def run_batches(compiled, inputs, run_batch, stop_at=None):
+    """
+    Run code on inputs in batches spread across the sandbox pool.
+
+    At most STRESS_WORKERS batches run at once, and their results are
+    handled in input order. A batch that times out or crashes as a whole is
+    run again one input at a time, so every input gets its own result.
+    Results end at the first input that fails to run, since run_batch may
+    skip the rest of its batch after a failure.
+
+    Args:
+        compiled (bytes): Code compiled by compile_user_code.
+        inputs (list): Test inputs, in order.
+        run_batch (callable): Runs code on a list of inputs in one sandbox job,
+            returning a list of results or a single result if the job failed.
+        stop_at (callable): Optional predicate on (index, result); no more
+            results are produced once it returns True.
+
+    Returns:
+        list: The result for each input, up to and including the one stop_at
+            accepted or the first one that failed to run.
+    """
+    batches = [inputs[start:start + STRESS_BATCH_SIZE]
+               for start in range(0, len(inputs), STRESS_BATCH_SIZE)]
+    results = []
+    executor = ThreadPoolExecutor(max_workers=min(len(batches), STRESS_WORKERS) or 1)
+    try:
+        futures = [executor.submit(run_batch, compiled, batch) for batch in batches]
+        for batch, future in zip(batches, futures):
+            batch_results = future.result()
+            if isinstance(batch_results, dict):
+                if not host_dependent(batch_results):
+                    batch_results = [batch_results] * len(batch)
+                else:
+                    batch_results = [_single_result(run_batch(compiled, [test_input]))
+                                     for test_input in batch]
+            for result in batch_results:
+                results.append(result)
+                if stop_at is not None and stop_at(len(results) - 1, result):
+                    return results
+                if not result["success"]:
+                    return results
+        return results
+    finally:
+        # Don't wait for batches that are still running once we stop early
+        executor.shutdown(wait=False, cancel_futures=True)
+
+class ReferenceCache:
+    """
+    Bounded LRU cache of a reference solution's results on stress inputs.
+
+    Keys hash the reference solution, the input generator and everything
+    else that determines the inputs, so edited problems never hit stale
+    entries.
+    """
+
+    def __init__(self, max_size=REFERENCE_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            values = self.entries.get(key)
+            if values is not None:
+                self.entries.move_to_end(key)
+            return values
+
+    def set(self, key, values):
+        with self.lock:
+            self.entries[key] = values
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+reference_cache = ReferenceCache()
+
+def reference_values(reference_source, generator_source, entry_function, inputs, run_batch, limits):
+    """
+    Get the reference solution's result on each stress input.
+
+    Args:
+        reference_source (str): The problem's reference solution.
+        generator_source (str): The problem's input generator source.
+        entry_function (str): The problem's entry function, if it has one.
+        inputs (list): Test inputs from generate_stress_inputs.
+        run_batch (callable): See run_batches.
+        limits (dict): cpu_time and memory_mb limits the inputs ran under.
+
+    Returns:
+        list: Output text, or return value for function-call problems, per input.
+
+    Raises:
+        StressTestError: If the reference solution fails on any input.
+    """
+    key = hashlib.sha256(json.dumps([
+        reference_source, generator_source, entry_function, len(inputs), STRESS_MAX_N,
+        STRESS_SEED, limits["cpu_time"], limits["memory_mb"]
+    ]).encode()).hexdigest()
+    values = reference_cache.get(key)
+    if values is not None:
+        return values
+
+    compiled, compile_error = compile_user_code(reference_source)
+    if compiled is None:
+        raise StressTestError(f"Reference solution does not compile: {compile_error}")
+    results = run_batches(compiled, [test_input for _, test_input in inputs], run_batch)
+    for (n, test_input), result in zip(inputs, results):
+        if not result["success"]:
+            raise StressTestError(
+                f"Reference solution failed for n={n} on input {input_preview(test_input)}: {result['error']}"
+            )
+    values = [result_value(result, entry_function) for result in results]
+    if not any(host_dependent(result) for result in results):
+        reference_cache.set(key, values)
+    return values
+
+def stress_test(compiled, problem, run_batch, find_mismatch, limits):
+    """
+    Compare a solution with the problem's reference solution on random inputs.
+
+    Inputs are checked smallest first and checking stops at the first
+    disagreement, so the failing input reported is the smallest one found.
+
+    Args:
+        compiled (bytes): User code compiled by compile_user_code.
+        problem: Problem object with a reference solution and input generator.
+        run_batch (callable): See run_batches.
+        find_mismatch (callable): Called with (expected, actual) values, returns
+            a description of their first difference or None if they match.
+        limits (dict): cpu_time and memory_mb limits for each input, from
+            stress_limits.
+
+    Returns:
+        dict: runs (inputs checked) and failure, which is None if the
+            solution agreed on every input, otherwise n, input (truncated),
+            expected and the failing run's result, plus the mismatch for
+            wrong answers.
+
+    Raises:
+        StressTestError: If the input generator or reference solution is broken.
+    """
+    entry_function = problem.entry_function
+    inputs = generate_stress_inputs(problem.input_generator, entry_function)
+    expected_values = reference_values(
+        problem.reference_solution, problem.input_generator, entry_function, inputs, run_batch, limits
+    )
+
+    failure = None
+
+    def stop_at(index, result):
+        nonlocal failure
+        mismatch = None
+        if result["success"]:
+            mismatch = find_mismatch(expected_values[index], result_value(result, entry_function))
+            if mismatch is None:
+                return False
+        n, test_input = inputs[index]
+        failure = {
+            "n": n,
+            "input": input_preview(test_input),
+            "expected": expected_values[index],
+            "result": result,
+            "mismatch": mismatch,
+        }
+        return True
+
+    results = run_batches(compiled, [test_input for _, test_input in inputs], run_batch, stop_at)
+    return {"runs": len(results), "failure": failure}
@@ -0,0 +1,200 @@
+"""
+Lazily generated and disk-cached test data.
+
+This module provides functionality to:
+- Expand test cases whose input is a seeded run of the problem's input
+  generator or a file in the test data directory, instead of inline values
+- Store each expanded input once in a disk cache, keyed by a hash of what
+  produced it, so the web process and workers never hold it in the database
+- Hand cached inputs to sandbox workers as files they memory-map
+- Load expected outputs kept in test data files
+
+Test cases reference data like this:
+    {"generate": {"n": 1000000, "seed": 1}, "output": "..."}
+    {"input_file": "sorting/big.txt", "output_file": "sorting/big.out"}
+For function-call problems the generator returns the argument list, input
+files hold the arguments as a JSON list and output files the expected
+return value as JSON.
+"""
+
+import os
+import json
+import random
+import hashlib
+import marshal
+import tempfile
+import threading
+from django.conf import settings
+from .complexity import InputGeneratorError, load_input_generator
+from .sandbox import MappedInput
+
+# Constants
+HASH_CHUNK_BYTES = 1 << 20  # bytes read at a time when hashing data files
+
+class TestDataError(Exception):
+    """Raised when a test case references data that cannot be produced."""
+
+_file_hashes = {}
+_file_hashes_lock = threading.Lock()
+
+def data_file_path(name):
+    """
+    Resolve a data file named by a test case.
+
+    Args:
+        name (str): Path relative to settings.TEST_DATA_DIR.
+
+    Returns:
+        str: Absolute path of the file.
+
+    Raises:
+        TestDataError: If the name leaves the directory or the file is missing.
+    """
+    root = os.path.realpath(settings.TEST_DATA_DIR)
+    path = os.path.realpath(os.path.join(root, name))
+    if os.path.commonpath([root, path]) != root:
+        raise TestDataError(f"Test data file {name} is outside the test data directory")
+    if not os.path.isfile(path):
+        raise TestDataError(f"Test data file {name} does not exist")
+    return path
+
+def data_file_hash(path):
+    """
+    Hash a data file's contents, reusing the hash while the file is unchanged.
+
+    Args:
+        path (str): Absolute path of the file.
+
+    Returns:
+        str: Hex digest of the contents.
+    """
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    with _file_hashes_lock:
+        if key in _file_hashes:
+            return _file_hashes[key]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    with _file_hashes_lock:
+        _file_hashes[key] = digest.hexdigest()
+    return _file_hashes[key]
+
+def _cache_file(key, produce):
+    """
+    Get the cache file for a key, writing it with produce() on first use.
+
+    The file is written under a temporary name and renamed into place, so
+    workers never see a partial file and concurrent writers are harmless.
+
+    Args:
+        key (str): Hash identifying the data.
+        produce (callable): Returns the file's bytes.
+
+    Returns:
+        str: Absolute path of the cache file.
+    """
+    cache_dir = os.path.abspath(settings.TEST_DATA_CACHE_DIR)
+    path = os.path.join(cache_dir, key)
+    if os.path.exists(path):
+        return path
+
+    data = produce()
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=cache_dir, prefix=".partial-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    return path
+
+def _encode_input(value, entry_function):
+    """Encode an input as written to a cache file: text, or marshalled arguments."""
+    if entry_function:
+        return marshal.dumps(tuple(value))
+    return str(value).encode()
+
+def expand_input(test_data, entry_function="", generator_source=""):
+    """
+    Expand a test case's referenced input into the disk cache.
+
+    Args:
+        test_data (dict): The test case.
+        entry_function (str): The problem's entry function, if it has one.
+        generator_source (str): The problem's input generator source.
+
+    Returns:
+        tuple: (MappedInput, key) for the cached input, or (None, None) if
+            the test case holds its input inline.
+
+    Raises:
+        TestDataError: If the input cannot be produced.
+    """
+    mode = "args" if entry_function else "text"
+    if "generate" in test_data:
+        spec = test_data["generate"]
+        if not isinstance(spec, dict) or "n" not in spec:
+            raise TestDataError('"generate" must give the input size n and optionally a seed')
+        seed = spec.get("seed", 0)
+        key = hashlib.sha256(
+            json.dumps([mode, generator_source, spec["n"], seed]).encode()
+        ).hexdigest()
+
+        def produce():
+            try:
+                generate = load_input_generator(generator_source)
+                return _encode_input(generate(spec["n"], random.Random(seed)), entry_function)
+            except InputGeneratorError as e:
+                raise TestDataError(str(e)) from e
+            except Exception as e:
+                raise TestDataError(f"Input generator failed for n={spec['n']}: {e}") from e
+    elif "input_file" in test_data:
+        path = data_file_path(test_data["input_file"])
+        key = hashlib.sha256(f"{mode}:{data_file_hash(path)}".encode()).hexdigest()
+
+        def produce():
+            with open(path, "rb") as f:
+                if not entry_function:
+                    return f.read()
+                try:
+                    return _encode_input(json.load(f), entry_function)
+                except ValueError as e:
+                    raise TestDataError(f"Test data file {test_data['input_file']} is not a JSON list: {e}") from e
+    else:
+        return None, None
+
+    return MappedInput(_cache_file(key, produce)), key
+
+def load_expected(test_data, entry_function=""):
+    """
+    Load a test case's expected output from its output file, if it has one.
+
+    Args:
+        test_data (dict): The test case.
+        entry_function (str): The problem's entry function, if it has one.
+
+    Returns:
+        tuple: (expected, key) where expected is the output text or, for
+            function-call problems, the decoded return value, and key hashes
+            the file's contents; (None, None) if the expected output is inline.
+
+    Raises:
+        TestDataError: If the file is missing or not valid JSON.
+    """
+    if "output_file" not in test_data:
+        return None, None
+    path = data_file_path(test_data["output_file"])
+    with open(path, "rb") as f:
+        data = f.read()
+    key = hashlib.sha256(data).hexdigest()
+    if not entry_function:
+        return data.decode(), key
+    try:
+        return json.loads(data), key
+    except ValueError as e:
+        raise TestDataError(f"Test data file {test_data['output_file']} is not valid JSON: {e}") from e
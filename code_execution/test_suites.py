@@ -0,0 +1,318 @@
+"""
+Precompiled, cached test suites for judging.
+
+This module provides functionality to:
+- Build a judging-ready form of a problem's test cases, with inputs already
+  split into values and expected outputs already normalised into lines, or
+  as entry function calls and expected return values for function-call
+  problems
+- Expand inputs and expected outputs that test cases reference rather than
+  hold inline (see test_data.py)
+- Cache the suites per problem so hot problems are judged without touching
+  the database or re-parsing their test cases
+- Order test cases so the most frequently failed ones run first
+- Drop a problem's cached suite when the problem changes
+"""
+
+import json
+import time
+import threading
+from collections import OrderedDict, namedtuple
+from problems.models import Problem, ProblemStats
+from .sandbox import MAX_OUTPUT_CHARS, FunctionCall, split_input
+from .test_data import expand_input, load_expected
+from .verdict_cache import test_suite_hash
+
+# Constants
+TEST_SUITE_CACHE_SIZE = 256  # maximum number of cached suites
+TEST_SUITE_CACHE_TTL = 60  # seconds before a suite is reloaded from the database
+OUTPUT_SLACK_CHARS = 1024  # output allowed beyond twice the expected length
+FUNCTION_OUTPUT_CHARS = 64 * 1024  # output allowed from function-call solutions, which is not judged
+
+# A single test case, ready to be sent to the sandbox and compared against.
+# For function-call problems input_values is a FunctionCall and the result is
+# compared against expected_value instead of expected_lines. Referenced
+# inputs are sent as a MappedInput, and data_key identifies the referenced
+# data (None if the test case is entirely inline).
+TestCase = namedtuple(
+    "TestCase",
+    ["name", "input_values", "expected_output", "expected_lines", "output_chars",
+     "expected_value", "data_key"]
+)
+
+def _strip_bounds(text):
+    """Return the (start, end) indices of text with surrounding whitespace removed."""
+    start, end = 0, len(text)
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+def iter_output_lines(text):
+    """
+    Yield the lines of an output lazily, ignoring surrounding whitespace.
+
+    Windows line endings are treated as plain newlines. Only one line is
+    copied at a time, so huge outputs are never duplicated in full.
+
+    Args:
+        text (str): Output to split.
+
+    Yields:
+        str: Each line without its line ending.
+    """
+    start, end = _strip_bounds(text)
+    while True:
+        newline = text.find('\n', start, end)
+        if newline == -1:
+            yield text[start:end]
+            return
+        line = text[start:newline]
+        yield line[:-1] if line.endswith('\r') else line
+        start = newline + 1
+
+def output_limit(expected):
+    """
+    Output cap for a test: anything much longer than expected cannot pass.
+
+    The cap is twice the expected length plus OUTPUT_SLACK_CHARS, at most
+    MAX_OUTPUT_CHARS unless the expected output is itself that long, so a
+    correct answer always fits.
+
+    Args:
+        expected (str): Expected output from test case.
+
+    Returns:
+        int: Maximum number of characters the code may print.
+    """
+    limit = len(expected) * 2 + OUTPUT_SLACK_CHARS
+    if len(expected) + OUTPUT_SLACK_CHARS <= MAX_OUTPUT_CHARS:
+        limit = min(limit, MAX_OUTPUT_CHARS)
+    return limit
+
+def problem_limits(problem):
+    """
+    Get the per-test execution limits configured for a problem.
+
+    Args:
+        problem: Problem object being judged.
+
+    Returns:
+        dict: cpu_time (seconds) and memory_mb limits for the sandbox.
+    """
+    return {"cpu_time": problem.time_limit, "memory_mb": problem.memory_limit}
+
+def build_test_case(test_name, test_data, entry_function="", generator_source=""):
+    """
+    Prepare a single test case for judging.
+
+    Args:
+        test_name (str): Name of the test case.
+        test_data (dict): Test case with input and expected output, or with
+            args and the expected return value for function-call problems.
+            Either may instead be referenced, see test_data.py.
+        entry_function (str): Name of the function solutions must define, or
+            empty for problems judged on printed output.
+        generator_source (str): The problem's input generator, used by test
+            cases with generated input.
+
+    Returns:
+        TestCase: The test case with split input and normalised expected
+            output, or with the function call to make.
+
+    Raises:
+        TestDataError: If referenced data cannot be produced.
+    """
+    mapped_input, input_key = expand_input(test_data, entry_function, generator_source)
+    file_expected, output_key = load_expected(test_data, entry_function)
+    data_key = ":".join(key for key in (input_key, output_key) if key) or None
+
+    if entry_function:
+        expected_value = file_expected if output_key else test_data.get("expected")
+        args = mapped_input if mapped_input is not None else tuple(test_data.get("args", ()))
+        return TestCase(
+            name=test_name,
+            input_values=FunctionCall(entry_function, args),
+            expected_output=json.dumps(expected_value),
+            expected_lines=(),
+            output_chars=FUNCTION_OUTPUT_CHARS,
+            expected_value=expected_value,
+            data_key=data_key,
+        )
+    expected_output = file_expected if output_key else test_data.get("output", "")
+    return TestCase(
+        name=test_name,
+        input_values=mapped_input if mapped_input is not None else split_input(test_data.get("input", "")),
+        expected_output=expected_output,
+        expected_lines=tuple(iter_output_lines(expected_output)),
+        output_chars=output_limit(expected_output),
+        expected_value=None,
+        data_key=data_key,
+    )
+
+def problem_key(problem_id):
+    """
+    Normalise a problem ID to the int that suites are cached under.
+
+    Args:
+        problem_id (int or str): ID of a problem, as given by a client.
+
+    Returns:
+        int: The problem ID.
+
+    Raises:
+        Problem.DoesNotExist: If the ID is not a number.
+    """
+    try:
+        return int(problem_id)
+    except (TypeError, ValueError):
+        raise Problem.DoesNotExist(f"Problem {problem_id!r} does not exist") from None
+
+class TestSuite:
+    """
+    Judging-ready snapshot of a problem and its test cases.
+
+    Attributes:
+        problem: Problem object the suite was built from.
+        cases (tuple): TestCase for each test, in the problem's order.
+        content_hash (str): Hash of the problem's test cases and of the
+            sources stress tests depend on.
+        limits (dict): cpu_time and memory_mb limits for each test.
+        fail_fast (bool): The problem's own fail-fast setting.
+        language (str): Language submissions to the problem are written in.
+        entry_function (str): Function solutions must define, or empty if
+            they are judged on printed output.
+        failure_order (tuple): Indices of the cases, most frequently failed
+            first and otherwise in their own order.
+        loaded_at (float): time.monotonic() when the suite was built.
+    """
+
+    def __init__(self, problem, failure_counts=None):
+        test_cases = problem.test_cases or {}
+        failure_counts = failure_counts or {}
+        self.problem = problem
+        self.entry_function = problem.entry_function
+        self.cases = tuple(
+            build_test_case(test_name, test_data, self.entry_function, problem.input_generator)
+            for test_name, test_data in test_cases.items()
+        )
+        # sorted() is stable, so tests that never failed keep their order
+        self.failure_order = tuple(sorted(
+            range(len(self.cases)), key=lambda index: -failure_counts.get(self.cases[index].name, 0)
+        ))
+        self.content_hash = test_suite_hash(
+            test_cases,
+            self.entry_function,
+            [case.data_key for case in self.cases if case.data_key],
+            problem.reference_solution,
+            problem.input_generator
+        )
+        self.limits = problem_limits(problem)
+        self.fail_fast = problem.fail_fast
+        self.language = problem.language
+        self.loaded_at = time.monotonic()
+
+    @property
+    def stress_ready(self):
+        """Whether the problem has what stress testing needs: a reference solution and input generator."""
+        return bool(self.problem.reference_solution and self.problem.input_generator)
+
+    @property
+    def test_names(self):
+        """Names of the test cases, in order."""
+        return [case.name for case in self.cases]
+
+class TestSuiteCache:
+    """
+    Bounded LRU cache of test suites keyed by problem ID.
+
+    Saving or deleting a problem drops its suite (see signals.py). Entries
+    also expire after a TTL, since saves made by other processes are not
+    signalled to this one; the TTL also picks up new test failure counts.
+    """
+
+    def __init__(self, max_size=TEST_SUITE_CACHE_SIZE, ttl=TEST_SUITE_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.generation = 0
+        self.lock = threading.Lock()
+
+    def get(self, problem_id):
+        """
+        Get the test suite for a problem, loading it on a miss.
+
+        Args:
+            problem_id (int or str): ID of the problem being judged; IDs
+                sent by clients as strings share the entry of the int ID.
+
+        Returns:
+            TestSuite: The problem's current test suite.
+
+        Raises:
+            Problem.DoesNotExist: If the problem does not exist or the ID is
+                not a number.
+            TestDataError: If the problem references test data that cannot
+                be produced.
+        """
+        problem_id = problem_key(problem_id)
+        with self.lock:
+            suite = self.entries.get(problem_id)
+            if suite is not None and time.monotonic() - suite.loaded_at < self.ttl:
+                self.entries.move_to_end(problem_id)
+                return suite
+            generation = self.generation
+
+        problem = Problem.objects.select_related('stats').get(id=problem_id)
+        try:
+            failure_counts = problem.stats.test_failure_counts
+        except ProblemStats.DoesNotExist:
+            failure_counts = None
+        suite = TestSuite(problem, failure_counts)
+
+        with self.lock:
+            # Don't cache a suite that was invalidated while it was loading
+            if self.generation == generation:
+                self.entries[problem_id] = suite
+                self.entries.move_to_end(problem_id)
+                while len(self.entries) > self.max_size:
+                    self.entries.popitem(last=False)
+        return suite
+
+    def invalidate(self, problem_id):
+        """
+        Drop the cached suite for a problem.
+
+        Args:
+            problem_id (int): ID of the problem that changed.
+        """
+        with self.lock:
+            self.entries.pop(problem_id, None)
+            self.generation += 1
+
+    def clear(self):
+        """Drop every cached suite."""
+        with self.lock:
+            self.entries.clear()
+            self.generation += 1
+
+test_suite_cache = TestSuiteCache()
+
+def get_test_suite(problem_id):
+    """
+    Get the cached test suite for a problem.
+
+    Args:
+        problem_id (int or str): ID of the problem being judged.
+
+    Returns:
+        TestSuite: The problem's current test suite.
+
+    Raises:
+        Problem.DoesNotExist: If the problem does not exist or the ID is not
+            a number.
+        TestDataError: If the problem references test data that cannot be
+            produced.
+    """
+    return test_suite_cache.get(problem_id)
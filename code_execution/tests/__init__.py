@@ -0,0 +1,24 @@
+from django.contrib.auth.models import User
+from accounts.models import Profile
+from problems.models import Problem
+
+def create_problem(**fields):
+    """Create a problem with working defaults for any field not given."""
+    defaults = {
+        "name": "Sum of Two Numbers",
+        "language": "python",
+        "difficulty": "easy",
+        "description": "Print the sum of two numbers.",
+        "test_cases": {"test1": {"input": "1,2", "output": "3"}},
+        "boilerplate_code": "",
+        "problem_type": "problem_set",
+        "order": Problem.objects.count() + 1,
+    }
+    defaults.update(fields)
+    return Problem.objects.create(**defaults)
+
+def create_user(username):
+    """Create a user with a profile."""
+    user = User.objects.create_user(username=username, email=f"{username}@example.com", password="password")
+    Profile.objects.create(user=user)
+    return user
@@ -0,0 +1,77 @@
+import json
+from unittest import mock
+from django.test import SimpleTestCase, TestCase
+from code_execution.admission import USER_MAX_QUEUED_JOBS, AdmissionController, AdmissionRejected, TokenBucket
+from code_execution.models import JudgeJob
+from . import create_problem, create_user
+
+class TokenBucketTests(SimpleTestCase):
+    def test_allows_burst_then_reports_wait(self):
+        bucket = TokenBucket(rate=2.0, capacity=2)
+        self.assertEqual(bucket.take(now=bucket.updated), 0)
+        self.assertEqual(bucket.take(now=bucket.updated), 0)
+        self.assertAlmostEqual(bucket.take(now=bucket.updated), 0.5)
+
+    def test_time_read_before_creation_does_not_drain_tokens(self):
+        bucket = TokenBucket(rate=0.25, capacity=1)
+        self.assertEqual(bucket.take(now=bucket.updated - 0.01), 0)
+
+    def test_refills_over_time(self):
+        bucket = TokenBucket(rate=2.0, capacity=1)
+        start = bucket.updated
+        bucket.take(now=start)
+        self.assertEqual(bucket.take(now=start + 0.5), 0)
+
+class AdmissionControllerTests(SimpleTestCase):
+    def test_limits_executions_in_flight_per_user(self):
+        controller = AdmissionController(user_max_in_flight=1, user_burst=10)
+        controller.acquire("user:1")
+        with self.assertRaises(AdmissionRejected):
+            controller.acquire("user:1")
+        controller.acquire("user:2")
+        controller.release("user:1")
+        controller.acquire("user:1")
+
+    def test_limits_executions_in_flight_globally(self):
+        controller = AdmissionController(global_max_in_flight=1)
+        controller.acquire("user:1")
+        with self.assertRaises(AdmissionRejected):
+            controller.acquire("user:2")
+
+    def test_disabled_controller_admits_everything(self):
+        controller = AdmissionController(user_max_in_flight=0)
+        controller.enabled = False
+        controller.acquire("user:1")
+
+class AdmissionResponseTests(TestCase):
+    def setUp(self):
+        self.user = create_user("learner")
+        self.client.force_login(self.user)
+        self.problem = create_problem()
+
+    def post(self, path, **data):
+        return self.client.post(path, json.dumps(data), content_type="application/json")
+
+    def test_rate_limited_request_gets_429_with_retry_after(self):
+        controller = AdmissionController(user_rate=0.25, user_burst=1)
+        with mock.patch("code_execution.admission.admission_controller", controller):
+            first = self.post("/code_execution/execute/", code="")
+            second = self.post("/code_execution/execute/", code="")
+        self.assertEqual(first.status_code, 400)
+        self.assertEqual(second.status_code, 429)
+        self.assertEqual(second["Retry-After"], "4")
+        self.assertEqual(second.json()["retry_after"], 4)
+
+    def test_admission_is_released_after_each_request(self):
+        controller = AdmissionController(user_max_in_flight=1, user_burst=10)
+        with mock.patch("code_execution.admission.admission_controller", controller):
+            for _ in range(3):
+                self.assertEqual(self.post("/code_execution/execute/", code="").status_code, 400)
+        self.assertEqual(controller.total_in_flight, 0)
+
+    def test_queue_admission_limits_jobs_per_user(self):
+        for _ in range(USER_MAX_QUEUED_JOBS):
+            JudgeJob.objects.create(user=self.user, problem=self.problem, code="print(3)")
+        response = self.post("/code_execution/submit/", code="print(3)", problem_id=self.problem.id)
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "2")
@@ -0,0 +1,53 @@
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from problems.models import Problem, Submission
+from code_execution.benchmark import (
+    BENCHMARK_PROBLEM_NAME, BENCHMARK_USERNAME, build_schedule, latency_summary, parse_mix, percentile,
+    run_benchmark
+)
+
+class MixTests(SimpleTestCase):
+    def test_parse_mix(self):
+        self.assertEqual(parse_mix("accepted=3, timeout"), {"accepted": 3, "timeout": 1})
+
+    def test_rejects_unknown_kinds_and_bad_weights(self):
+        with self.assertRaises(ValueError):
+            parse_mix("fast=1")
+        with self.assertRaises(ValueError):
+            parse_mix("accepted=0")
+
+    def test_schedule_follows_weights(self):
+        schedule = build_schedule({"accepted": 3, "timeout": 1}, 8)
+        self.assertEqual(schedule.count("accepted"), 6)
+        self.assertEqual(schedule, build_schedule({"accepted": 3, "timeout": 1}, 8))
+
+class LatencySummaryTests(SimpleTestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertIsNone(percentile([], 50))
+
+    def test_summary_in_milliseconds(self):
+        summary = latency_summary([0.002, 0.001, 0.003])
+        self.assertEqual(summary["count"], 3)
+        self.assertEqual(summary["p50_ms"], 2.0)
+        self.assertEqual(summary["max_ms"], 3.0)
+        self.assertEqual(latency_summary([]), {"count": 0})
+
+@override_settings(ALLOWED_HOSTS=["localhost"])
+class RunBenchmarkTests(TransactionTestCase):
+    def test_in_process_run_reports_and_cleans_up(self):
+        report = run_benchmark(total=4, concurrency=1, mix="accepted=1,wrong_answer=1", warmup=1)
+
+        self.assertEqual(report["errors"], 0)
+        self.assertEqual(report["latency"]["count"], 4)
+        self.assertEqual(report["by_kind"]["accepted"]["verdicts"], {"accepted": 2})
+        self.assertEqual(report["by_kind"]["wrong_answer"]["verdicts"], {"wrong answer": 2})
+        self.assertFalse(Problem.objects.filter(name=BENCHMARK_PROBLEM_NAME).exists())
+        self.assertFalse(User.objects.filter(username=BENCHMARK_USERNAME).exists())
+        self.assertFalse(Submission.objects.exists())
+
+    def test_keep_data(self):
+        run_benchmark(total=1, concurrency=1, mix="accepted", warmup=0, keep_data=True)
+        self.assertEqual(Submission.objects.filter(user__username=BENCHMARK_USERNAME).count(), 1)
@@ -0,0 +1,146 @@
+from django.test import SimpleTestCase, TestCase
+from problems.models import Problem
+from code_execution.test_suites import get_test_suite, test_suite_cache
+from code_execution.verdict_cache import (
+    VerdictCache, normalized_code_hash, source_code_hash, test_suite_hash, verdict_cache
+)
+from code_execution.views import judge_code
+from . import create_problem
+
+RESULTS = [{"test_name": "test1", "passed": True}]
+
+class CodeHashTests(SimpleTestCase):
+    def test_normalized_hash_ignores_comments_and_formatting(self):
+        self.assertEqual(
+            normalized_code_hash("x = 1\nprint(x)"),
+            normalized_code_hash("x=1  # one\n\nprint( x )\n")
+        )
+        self.assertNotEqual(normalized_code_hash("print(1)"), normalized_code_hash("print(2)"))
+
+    def test_source_hash_is_exact(self):
+        self.assertNotEqual(source_code_hash("print(1)"), source_code_hash("print(1)\n"))
+
+    def test_suite_hash_covers_test_cases(self):
+        self.assertNotEqual(
+            test_suite_hash({"test1": {"input": "1", "output": "1"}}),
+            test_suite_hash({"test1": {"input": "1", "output": "2"}})
+        )
+
+    def test_suite_hash_covers_entry_function(self):
+        test_cases = {"test1": {"args": [1], "expected": 1}}
+        self.assertNotEqual(test_suite_hash(test_cases), test_suite_hash(test_cases, entry_function="solve"))
+
+    def test_suite_hash_covers_stress_sources(self):
+        test_cases = {"test1": {"input": "1", "output": "1"}}
+        base = test_suite_hash(test_cases)
+        self.assertNotEqual(base, test_suite_hash(test_cases, reference_solution="print(1)"))
+        self.assertNotEqual(base, test_suite_hash(test_cases, input_generator="def generate(n, rng): pass"))
+
+class VerdictCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = VerdictCache(max_size=2)
+
+    def test_hit_and_miss(self):
+        self.cache.set(1, "suite", "code", RESULTS, True)
+        self.assertEqual(self.cache.get(1, "suite", "code"), (RESULTS, True))
+        self.assertIsNone(self.cache.get(1, "suite", "other"))
+        self.assertIsNone(self.cache.get(1, "suite", "code", mode=(True,)))
+
+    def test_changed_suite_drops_problem_entries(self):
+        self.cache.set(1, "suite", "code", RESULTS, True)
+        self.assertIsNone(self.cache.get(1, "new suite", "code"))
+        self.assertIsNone(self.cache.get(1, "suite", "code"))
+
+    def test_invalidate(self):
+        self.cache.set(1, "suite", "code", RESULTS, True)
+        self.cache.set(2, "suite", "code", RESULTS, True)
+        self.cache.invalidate(1)
+        self.assertIsNone(self.cache.get(1, "suite", "code"))
+        self.assertIsNotNone(self.cache.get(2, "suite", "code"))
+
+    def test_evicts_least_recently_used(self):
+        self.cache.set(1, "suite", "a", RESULTS, True)
+        self.cache.set(1, "suite", "b", RESULTS, True)
+        self.cache.get(1, "suite", "a")
+        self.cache.set(1, "suite", "c", RESULTS, True)
+        self.assertIsNotNone(self.cache.get(1, "suite", "a"))
+        self.assertIsNone(self.cache.get(1, "suite", "b"))
+
+    def test_source_bound_entries_only_match_their_source(self):
+        self.cache.set(1, "suite", "code", RESULTS, False, source_hash="source")
+        self.assertIsNone(self.cache.get(1, "suite", "code", source_hash="reformatted"))
+        self.assertEqual(self.cache.get(1, "suite", "code", source_hash="source"), (RESULTS, False))
+
+class JudgeCodeCacheTests(TestCase):
+    def setUp(self):
+        test_suite_cache.clear()
+        verdict_cache.clear()
+        self.suite = get_test_suite(create_problem().id)
+
+    def test_reformatted_resubmission_reuses_verdict(self):
+        first = judge_code(self.suite, "a = int(input())\nb = int(input())\nprint(a + b)")
+        second = judge_code(self.suite, "a=int(input())  # first\nb=int(input())\n\nprint(a+b)")
+        self.assertFalse(first[2])
+        self.assertTrue(second[2])
+        self.assertEqual(second[:2], first[:2])
+
+    def test_traceback_is_only_reused_for_the_same_source(self):
+        first = judge_code(self.suite, "raise ValueError()")
+        self.assertTrue(judge_code(self.suite, "raise ValueError()")[2])
+        moved = judge_code(self.suite, "\n\nraise ValueError()")
+        self.assertFalse(moved[2])
+        self.assertIn("line 1,", first[0][0]["error"])
+        self.assertIn("line 3,", moved[0][0]["error"])
+
+class TestSuiteCacheTests(TestCase):
+    def setUp(self):
+        test_suite_cache.clear()
+        verdict_cache.clear()
+        self.problem = create_problem()
+
+    def test_suite_is_prepared_for_judging(self):
+        case = get_test_suite(self.problem.id).cases[0]
+        self.assertEqual(case.input_values, ("1", "2"))
+        self.assertEqual(case.expected_lines, ("3",))
+
+    def test_cached_suite_needs_no_queries(self):
+        suite = get_test_suite(self.problem.id)
+        with self.assertNumQueries(0):
+            self.assertIs(get_test_suite(self.problem.id), suite)
+
+    def test_string_ids_share_the_cached_suite(self):
+        suite = get_test_suite(self.problem.id)
+        with self.assertNumQueries(0):
+            self.assertIs(get_test_suite(str(self.problem.id)), suite)
+            self.assertIs(get_test_suite(str(self.problem.id)), suite)
+
+    def test_string_id_is_cached_after_a_miss(self):
+        suite = get_test_suite(str(self.problem.id))
+        with self.assertNumQueries(0):
+            self.assertIs(get_test_suite(self.problem.id), suite)
+
+    def test_non_numeric_id_does_not_exist(self):
+        for problem_id in ("abc", None, ""):
+            with self.assertRaises(Problem.DoesNotExist):
+                get_test_suite(problem_id)
+
+    def test_saving_problem_reloads_its_suite(self):
+        suite = get_test_suite(self.problem.id)
+        self.problem.test_cases = {"test1": {"input": "2,2", "output": "4"}}
+        self.problem.save()
+        reloaded = get_test_suite(self.problem.id)
+        self.assertIsNot(reloaded, suite)
+        self.assertNotEqual(reloaded.content_hash, suite.content_hash)
+        self.assertEqual(reloaded.cases[0].expected_output, "4")
+
+    def test_saving_problem_drops_its_verdicts(self):
+        suite = get_test_suite(self.problem.id)
+        verdict_cache.set(self.problem.id, suite.content_hash, "code", RESULTS, True)
+        self.problem.save()
+        self.assertIsNone(verdict_cache.get(self.problem.id, suite.content_hash, "code"))
+
+    def test_editing_reference_solution_changes_suite_hash(self):
+        suite = get_test_suite(self.problem.id)
+        self.problem.reference_solution = "print(3)"
+        self.problem.save()
+        self.assertNotEqual(get_test_suite(self.problem.id).content_hash, suite.content_hash)
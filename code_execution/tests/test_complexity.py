@@ -0,0 +1,64 @@
+import math
+from django.test import SimpleTestCase
+from code_execution.complexity import ANALYSIS_MAX_N, ANALYSIS_SIZES, analyze_complexity, fit_complexity
+
+GENERATOR = "def generate(n, rng):\n    return ','.join(str(rng.randint(0, 9)) for _ in range(n))"
+
+def fake_run_code(operations, cpu_time):
+    """A run_code that reports operations(n) and cpu_time(n) for an input of n values."""
+    def run_code(compiled, test_input, options=None):
+        n = test_input.count(",") + 1
+        result = {"success": True, "output": "", "cpu_time": cpu_time(n)}
+        if options and options.get("count_operations"):
+            result["operations"] = operations(n)
+        return result
+    return run_code
+
+class FitComplexityTests(SimpleTestCase):
+    def test_ranks_the_generating_class_first(self):
+        sizes = [16, 32, 64, 128, 256]
+        self.assertEqual(fit_complexity(sizes, [5 * n for n in sizes])[0][0], "O(n)")
+        self.assertEqual(fit_complexity(sizes, [n * n for n in sizes])[0][0], "O(n^2)")
+        self.assertEqual(fit_complexity(sizes, [3 for _ in sizes])[0][0], "O(1)")
+
+class AnalyzeComplexityTests(SimpleTestCase):
+    def test_fits_operation_counts(self):
+        result = analyze_complexity(
+            b"", GENERATOR, fake_run_code(lambda n: n * n, lambda n: n * n * 1e-8)
+        )
+        self.assertEqual(result["estimate"], "O(n^2)")
+        self.assertEqual([m["n"] for m in result["measurements"]], list(ANALYSIS_SIZES))
+        self.assertNotIn("error", result)
+
+    def test_stops_once_runs_get_slow(self):
+        result = analyze_complexity(
+            b"", GENERATOR, fake_run_code(lambda n: 2 ** min(n, 1000), lambda n: n * 0.01)
+        )
+        self.assertEqual(result["measurements"][-1]["n"], 128)
+
+    def test_built_in_work_is_fitted_to_cpu_time(self):
+        # sorted(a) is a single traced line, however long a is
+        result = analyze_complexity(
+            b"", GENERATOR, fake_run_code(lambda n: 3, lambda n: n * math.log2(n) * 1e-7)
+        )
+        self.assertEqual(result["estimate"], "O(n log n)")
+        self.assertEqual(result["time_estimate"], "O(n log n)")
+        self.assertGreater(result["measurements"][-1]["n"], ANALYSIS_SIZES[-1])
+        self.assertIsNone(result["measurements"][-1]["operations"])
+
+    def test_constant_time_needs_the_largest_input(self):
+        result = analyze_complexity(b"", GENERATOR, fake_run_code(lambda n: 3, lambda n: 1e-5))
+        self.assertEqual(result["estimate"], "O(1)")
+        self.assertEqual(result["measurements"][-1]["n"], ANALYSIS_MAX_N)
+
+    def test_broken_generator(self):
+        result = analyze_complexity(b"", "x = 1", fake_run_code(lambda n: n, lambda n: 0.0))
+        self.assertIsNone(result["estimate"])
+        self.assertIn("generate(n, rng)", result["error"])
+
+    def test_failing_solution(self):
+        def run_code(compiled, test_input, options=None):
+            return {"success": False, "error": "boom"}
+        result = analyze_complexity(b"", GENERATOR, run_code)
+        self.assertIsNone(result["estimate"])
+        self.assertEqual(result["error"], "Solution failed for n=16")
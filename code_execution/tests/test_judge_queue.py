@@ -0,0 +1,87 @@
+import json
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from code_execution.judge_queue import claim_next_job, process_job, requeue_stale_jobs
+from code_execution.models import JudgeJob
+from code_execution.test_suites import test_suite_cache
+from code_execution.verdict_cache import verdict_cache
+from . import create_problem, create_user
+
+class ClaimNextJobTests(TestCase):
+    def setUp(self):
+        self.problem = create_problem()
+        self.busy = create_user("busy")
+        self.idle = create_user("idle")
+        self.start = timezone.now()
+
+    def queue_job(self, user, minutes_ago, status='queued'):
+        job = JudgeJob.objects.create(user=user, problem=self.problem, code="print(3)", status=status)
+        JudgeJob.objects.filter(id=job.id).update(created_at=self.start - timedelta(minutes=minutes_ago))
+        return job
+
+    def test_empty_queue(self):
+        self.assertIsNone(claim_next_job())
+
+    def test_claims_oldest_job_first(self):
+        newer = self.queue_job(self.busy, 1)
+        older = self.queue_job(self.idle, 2)
+        self.assertEqual(claim_next_job().id, older.id)
+        self.assertEqual(claim_next_job().id, newer.id)
+        self.assertIsNone(claim_next_job())
+
+    def test_claimed_job_is_not_claimed_again(self):
+        job = self.queue_job(self.idle, 1)
+        self.assertEqual(claim_next_job().id, job.id)
+        self.assertIsNone(claim_next_job())
+        self.assertEqual(JudgeJob.objects.get(id=job.id).status, 'running')
+
+    def test_users_with_running_jobs_wait_their_turn(self):
+        self.queue_job(self.busy, 10, status='running')
+        busy_first = self.queue_job(self.busy, 5)
+        busy_second = self.queue_job(self.busy, 4)
+        idle_job = self.queue_job(self.idle, 1)
+
+        claimed = claim_next_job()
+        self.assertEqual(claimed.id, idle_job.id)
+        self.assertEqual(claimed.status, 'running')
+        self.assertIsNotNone(claimed.started_at)
+        # Both users now have one job running, so age decides
+        self.assertEqual(claim_next_job().id, busy_first.id)
+        self.assertEqual(claim_next_job().id, busy_second.id)
+
+    def test_stale_running_jobs_are_requeued(self):
+        job = self.queue_job(self.idle, 1, status='running')
+        JudgeJob.objects.filter(id=job.id).update(started_at=self.start - timedelta(hours=1))
+        self.assertEqual(requeue_stale_jobs(), 1)
+        self.assertEqual(claim_next_job().id, job.id)
+
+class JobLifecycleTests(TestCase):
+    def setUp(self):
+        test_suite_cache.clear()
+        verdict_cache.clear()
+        self.user = create_user("learner")
+        self.client.force_login(self.user)
+        self.problem = create_problem()
+
+    def test_submitted_job_is_judged_and_polled(self):
+        response = self.client.post(
+            "/code_execution/submit/",
+            json.dumps({"code": "print(int(input()) + int(input()))", "problem_id": self.problem.id}),
+            content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()["job_id"]
+        self.assertEqual(self.client.get(f"/code_execution/jobs/{job_id}/").json()["status"], 'queued')
+
+        process_job(claim_next_job())
+
+        status = self.client.get(f"/code_execution/jobs/{job_id}/").json()
+        self.assertEqual(status["status"], 'finished')
+        self.assertTrue(status["all_tests_passed"])
+        self.assertEqual([result["test_name"] for result in status["test_results"]], ["test1"])
+        self.assertIsNotNone(status["submission_id"])
+
+    def test_jobs_of_other_users_are_hidden(self):
+        job = JudgeJob.objects.create(user=create_user("other"), problem=self.problem, code="print(3)")
+        self.assertEqual(self.client.get(f"/code_execution/jobs/{job.id}/").status_code, 404)
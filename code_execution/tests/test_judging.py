@@ -0,0 +1,318 @@
+from unittest import mock
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase, TestCase
+from gamification.models import LeaderboardEntry
+from problems.models import Problem, ProblemStats, UserProgress
+from code_execution.sandbox import STATUS_TIME_LIMIT, compile_user_code
+from code_execution.test_suites import (
+    TestSuite, build_test_case, get_test_suite, iter_output_lines, test_suite_cache
+)
+from code_execution.verdict_cache import verdict_cache
+from code_execution.views import (
+    RESULT_VALUE_CHARS, STRESS_TEST_NAME, VERDICT_ACCEPTED, VERDICT_COMPILATION_ERROR, VERDICT_SKIPPED, VERDICT_WRONG_ANSWER,
+    find_first_mismatch, find_value_mismatch, judge_code, judge_submission, judge_test_case, record_test_failures,
+    run_test_cases, update_leaderboard, update_user_progress
+)
+from . import create_problem, create_user
+
+class CompileErrorTests(TestCase):
+    def setUp(self):
+        test_suite_cache.clear()
+        verdict_cache.clear()
+        self.problem = create_problem(test_cases={
+            "test1": {"input": "1,2", "output": "3"},
+            "test2": {"input": "2,2", "output": "4"},
+        })
+
+    def test_syntax_error_fails_every_test_without_running(self):
+        test_results, all_tests_passed, cached, compiled = judge_code(
+            get_test_suite(self.problem.id), "print(1 +"
+        )
+        self.assertFalse(all_tests_passed)
+        self.assertFalse(cached)
+        self.assertIsNone(compiled)
+        self.assertEqual([result["test_name"] for result in test_results], ["test1", "test2"])
+        for result in test_results:
+            self.assertEqual(result["verdict"], VERDICT_COMPILATION_ERROR)
+            self.assertIn("SyntaxError", result["error"])
+            self.assertNotIn("cpu_time", result)
+
+    def test_valid_code_is_compiled_once_for_every_test(self):
+        test_results, all_tests_passed, _, compiled = judge_code(
+            get_test_suite(self.problem.id), "print(int(input()) + int(input()))"
+        )
+        self.assertTrue(all_tests_passed)
+        self.assertIsInstance(compiled, bytes)
+        self.assertEqual(len(test_results), 2)
+
+# Echoes its input after spinning for a time that grows with it
+SPIN_AND_ECHO = "n = int(input())\nfor _ in range(n):\n    pass\nprint(n)"
+
+def echo_cases(*values):
+    return tuple(
+        build_test_case(f"test{i}", {"input": str(value), "output": str(value)})
+        for i, value in enumerate(values, start=1)
+    )
+
+class ParallelJudgingTests(SimpleTestCase):
+    def setUp(self):
+        self.compiled, _ = compile_user_code(SPIN_AND_ECHO)
+
+    def test_results_keep_test_case_order(self):
+        finished = []
+        test_results, all_tests_passed = run_test_cases(
+            self.compiled, echo_cases(5_000_000, 1), parallel=True,
+            on_result=lambda index, result: finished.append(index)
+        )
+        self.assertTrue(all_tests_passed)
+        self.assertEqual([result["test_name"] for result in test_results], ["test1", "test2"])
+        self.assertEqual([result["actual_output"] for result in test_results], ["5000000", "1"])
+        # The quick test finished first but is still reported second
+        self.assertEqual(finished, [1, 0])
+
+    def test_matches_sequential_verdicts(self):
+        cases = echo_cases(1, 2, 3) + (build_test_case("test4", {"input": "4", "output": "5"}),)
+        sequential, _ = run_test_cases(self.compiled, cases)
+        parallel, all_tests_passed = run_test_cases(self.compiled, cases, parallel=True)
+        self.assertFalse(all_tests_passed)
+        self.assertEqual(
+            [result["verdict"] for result in parallel], [result["verdict"] for result in sequential]
+        )
+
+class FailFastTests(SimpleTestCase):
+    def setUp(self):
+        self.compiled, _ = compile_user_code(SPIN_AND_ECHO)
+        self.cases = echo_cases(1, 2, 3)
+        self.cases = (self.cases[0], self.cases[1]._replace(expected_lines=("0",)), self.cases[2])
+
+    def test_stops_at_first_failure_and_skips_the_rest(self):
+        finished = []
+        test_results, all_tests_passed = run_test_cases(
+            self.compiled, self.cases, fail_fast=True,
+            on_result=lambda index, result: finished.append(index)
+        )
+        self.assertFalse(all_tests_passed)
+        self.assertEqual(finished, [0, 1])
+        self.assertEqual(
+            [result["verdict"] for result in test_results],
+            [VERDICT_ACCEPTED, VERDICT_WRONG_ANSWER, VERDICT_SKIPPED]
+        )
+        self.assertTrue(test_results[2]["skipped"])
+
+    def test_without_fail_fast_every_test_runs(self):
+        test_results, _ = run_test_cases(self.compiled, self.cases)
+        self.assertNotIn(VERDICT_SKIPPED, [result["verdict"] for result in test_results])
+
+class ProblemLimitTests(TestCase):
+    def setUp(self):
+        test_suite_cache.clear()
+        verdict_cache.clear()
+
+    def test_limits_must_be_positive(self):
+        problem = create_problem(time_limit=0, memory_limit=-1)
+        with self.assertRaises(ValidationError) as raised:
+            problem.full_clean()
+        self.assertIn("time_limit", raised.exception.message_dict)
+        self.assertIn("memory_limit", raised.exception.message_dict)
+
+    def test_problem_limits_apply_to_its_tests(self):
+        problem = create_problem(time_limit=0.3, memory_limit=128)
+        suite = get_test_suite(problem.id)
+        self.assertEqual(suite.limits, {"cpu_time": 0.3, "memory_mb": 128})
+        test_results, _, _, _ = judge_code(suite, "while True:\n    pass")
+        self.assertEqual(test_results[0]["verdict"], STATUS_TIME_LIMIT)
+
+    def test_problem_limits_apply_to_complexity_analysis(self):
+        problem = create_problem(time_limit=0.3, memory_limit=128, input_generator="def generate(n, rng):\n    return '1,2'")
+        with mock.patch("code_execution.views.analyze_complexity", return_value={}) as analyze:
+            judge_submission(create_user("alice"), problem, "print(int(input()) + int(input()))", analyze=True)
+        run_code = analyze.call_args.args[2]
+        with mock.patch("code_execution.views.run_code_with_test") as run:
+            run_code(b"code", "1,2", {"count_operations": True})
+        run.assert_called_once_with(b"code", "1,2", {"count_operations": True}, {"cpu_time": 0.3, "memory_mb": 128})
+
+class FindFirstMismatchTests(SimpleTestCase):
+    def test_matching_outputs(self):
+        self.assertIsNone(find_first_mismatch("1\n2\n3", "1\n2\n3"))
+
+    def test_ignores_surrounding_whitespace_and_line_endings(self):
+        self.assertIsNone(find_first_mismatch("1\n2", "\n1\r\n2\n\n"))
+
+    def test_reports_line_and_column(self):
+        mismatch = find_first_mismatch("abc\ndef", "abc\ndxf")
+        self.assertEqual(mismatch, {"line": 2, "column": 2, "expected": "def", "actual": "dxf"})
+
+    def test_missing_line(self):
+        mismatch = find_first_mismatch("1\n2", "1")
+        self.assertEqual(mismatch["line"], 2)
+        self.assertEqual(mismatch["expected"], "2")
+        self.assertIsNone(mismatch["actual"])
+
+    def test_extra_line(self):
+        mismatch = find_first_mismatch("1", "1\n2")
+        self.assertIsNone(mismatch["expected"])
+        self.assertEqual(mismatch["actual"], "2")
+
+    def test_accepts_split_expected_lines(self):
+        self.assertIsNone(find_first_mismatch(tuple(iter_output_lines("1\n2\n")), "1\n2"))
+
+    def test_long_lines_are_truncated(self):
+        mismatch = find_first_mismatch("x" * 1000, "x" * 999 + "y")
+        self.assertEqual(mismatch["column"], 1000)
+        self.assertLessEqual(len(mismatch["actual"]), 100)
+
+class OutputTruncationTests(SimpleTestCase):
+    def test_large_outputs_are_truncated_in_results(self):
+        compiled, _ = compile_user_code("for i in range(100000):\n    print(i)")
+        expected = "\n".join(str(i) for i in range(100000))
+        passed = judge_test_case(compiled, build_test_case("test1", {"input": "", "output": expected}))
+        self.assertTrue(passed["passed"])
+        self.assertEqual(len(passed["expected_output"]), RESULT_VALUE_CHARS)
+        self.assertEqual(len(passed["actual_output"]), RESULT_VALUE_CHARS)
+
+        failed = judge_test_case(compiled, build_test_case("test1", {"input": "", "output": expected + "\n0"}))
+        self.assertEqual(failed["mismatch"]["line"], 100001)
+        self.assertEqual(len(failed["actual_output"]), RESULT_VALUE_CHARS)
+
+class UserProgressTests(TestCase):
+    def setUp(self):
+        test_suite_cache.clear()
+        verdict_cache.clear()
+        self.user = create_user("learner")
+        self.problem = create_problem()
+
+    def test_counts_attempts(self):
+        update_user_progress(self.user, self.problem, 10, False)
+        progress, newly_completed = update_user_progress(self.user, self.problem, 0, False)
+        self.assertEqual(progress.attempts, 2)
+        self.assertEqual(progress.time_spent, 10)
+        self.assertFalse(progress.is_completed)
+        self.assertFalse(newly_completed)
+
+    def test_failed_attempt_does_not_undo_a_solve(self):
+        update_user_progress(self.user, self.problem, 0, True)
+        progress, _ = update_user_progress(self.user, self.problem, 0, False)
+        self.assertTrue(progress.is_completed)
+        self.assertIsNotNone(progress.last_submitted)
+        self.assertEqual(UserProgress.objects.get(user=self.user).attempts, 2)
+
+    def test_only_the_first_solve_completes_the_problem(self):
+        self.assertTrue(update_user_progress(self.user, self.problem, 0, True)[1])
+        progress, newly_completed = update_user_progress(self.user, self.problem, 0, True)
+        self.assertFalse(newly_completed)
+        self.assertEqual(progress.attempts, 2)
+
+    def test_solving_twice_counts_once_on_the_leaderboard(self):
+        judge_submission(self.user, self.problem, "print(int(input()) + int(input()))")
+        judge_submission(self.user, self.problem, "a = int(input())\nprint(a + int(input()))")
+        self.assertEqual(LeaderboardEntry.objects.get(user=self.user).total_solved, 1)
+
+    def test_concurrent_solve_counts_once_on_the_leaderboard(self):
+        LeaderboardEntry.objects.create(user=self.user, total_solved=5)
+
+        def racing_update(*args):
+            # Another request records its solve of the same problem first
+            _, newly_completed = update_user_progress(*args)
+            update_leaderboard(self.user, self.problem, not newly_completed)
+            return update_user_progress(*args)
+
+        with mock.patch("code_execution.views.update_user_progress", racing_update):
+            judge_submission(self.user, self.problem, "print(int(input()) + int(input()))")
+        self.assertEqual(LeaderboardEntry.objects.get(user=self.user).total_solved, 6)
+
+class FailureOrderTests(TestCase):
+    def setUp(self):
+        test_suite_cache.clear()
+        verdict_cache.clear()
+        self.problem = create_problem(test_cases={
+            "test1": {"input": "1", "output": "1"},
+            "test2": {"input": "2", "output": "2"},
+            "test3": {"input": "3", "output": "3"},
+        })
+
+    def test_most_failed_tests_come_first(self):
+        suite = TestSuite(Problem(test_cases=self.problem.test_cases), {"test3": 5, "test2": 1})
+        self.assertEqual(suite.failure_order, (2, 1, 0))
+        self.assertEqual(TestSuite(Problem(test_cases=self.problem.test_cases)).failure_order, (0, 1, 2))
+
+    def test_only_real_failures_are_counted(self):
+        record_test_failures(self.problem, [
+            {"test_name": "test1", "passed": True},
+            {"test_name": "test2", "passed": False},
+            {"test_name": "test3", "passed": False, "timed_out": True},
+            {"test_name": "test4", "passed": False, "skipped": True},
+            {"test_name": "test1", "passed": False, "crashed": True},
+            {"test_name": STRESS_TEST_NAME, "passed": False},
+        ])
+        stats = ProblemStats.objects.get(problem=self.problem)
+        self.assertEqual(stats.test_failure_counts, {"test2": 1})
+
+    def test_fail_fast_runs_the_most_failed_test_first(self):
+        record_test_failures(self.problem, [{"test_name": "test3", "passed": False}])
+        test_suite_cache.clear()
+        test_results, _, _, _ = judge_code(get_test_suite(self.problem.id), "print(0)", fail_fast=True)
+        self.assertEqual(
+            [result["verdict"] for result in test_results],
+            [VERDICT_SKIPPED, VERDICT_SKIPPED, VERDICT_WRONG_ANSWER]
+        )
+
+class FindValueMismatchTests(SimpleTestCase):
+    def test_matching_values(self):
+        self.assertIsNone(find_value_mismatch([1, {"a": [2.0, "x"]}], [1, {"a": [2.0, "x"]}]))
+
+    def test_reports_path_of_nested_difference(self):
+        mismatch = find_value_mismatch([1, {"a": [2, 3]}], [1, {"a": [2, 4]}])
+        self.assertEqual(mismatch, {"path": '[1]["a"][1]', "expected": "3", "actual": "4"})
+
+    def test_length_difference(self):
+        mismatch = find_value_mismatch([1, 2], [1, 2, 3])
+        self.assertEqual(mismatch["path"], "")
+
+    def test_dict_keys_must_match(self):
+        self.assertIsNotNone(find_value_mismatch({"a": 1}, {"a": 1, "b": 2}))
+
+    def test_floats_compare_within_tolerance(self):
+        self.assertIsNone(find_value_mismatch(0.3, 0.1 + 0.2))
+        self.assertIsNone(find_value_mismatch(2, 2.0))
+        self.assertIsNotNone(find_value_mismatch(0.3, 0.31))
+
+    def test_bools_are_not_numbers(self):
+        self.assertIsNotNone(find_value_mismatch(1, True))
+        self.assertIsNotNone(find_value_mismatch(False, 0))
+        self.assertIsNone(find_value_mismatch(True, True))
+
+    def test_types_must_match(self):
+        self.assertIsNotNone(find_value_mismatch("1", 1))
+        self.assertIsNotNone(find_value_mismatch(None, []))
+
+class FunctionCallJudgingTests(SimpleTestCase):
+    def judge(self, source, test_data):
+        compiled, _ = compile_user_code(source)
+        case = build_test_case("test1", test_data, entry_function="solve")
+        return judge_test_case(compiled, case, {"cpu_time": 2, "memory_mb": 256})
+
+    def test_return_value_is_judged(self):
+        result = self.judge("def solve(a):\n    return sorted(a)", {"args": [[3, 1, 2]], "expected": [1, 2, 3]})
+        self.assertTrue(result["passed"])
+        self.assertEqual(result["actual_output"], "[1, 2, 3]")
+
+    def test_wrong_return_value(self):
+        result = self.judge("def solve(a):\n    return a", {"args": [[3, 1]], "expected": [1, 3]})
+        self.assertEqual(result["verdict"], VERDICT_WRONG_ANSWER)
+        self.assertEqual(result["mismatch"]["path"], "[0]")
+
+    def test_missing_entry_function(self):
+        result = self.judge("def other(a):\n    return a", {"args": [1], "expected": 1})
+        self.assertFalse(result["passed"])
+        self.assertIn("solve()", result["error"])
+
+    def test_large_return_value_is_truncated(self):
+        result = self.judge("def solve(n):\n    return list(range(n))", {"args": [100000], "expected": []})
+        self.assertEqual(result["verdict"], VERDICT_WRONG_ANSWER)
+        self.assertEqual(len(result["actual_output"]), RESULT_VALUE_CHARS)
+
+    def test_large_expected_value_is_truncated(self):
+        expected = list(range(100000))
+        result = self.judge("def solve(n):\n    return list(range(n))", {"args": [100000], "expected": expected})
+        self.assertTrue(result["passed"])
+        self.assertEqual(len(result["expected_output"]), RESULT_VALUE_CHARS)
@@ -0,0 +1,75 @@
+from django.test import SimpleTestCase
+from code_execution.sandbox import compile_user_code, execute_job
+from code_execution.test_suites import build_test_case
+from code_execution.views import profile_options, profile_test_cases, skipped_test_result
+
+LOOP = "total = 0\nfor i in range(1000):\n    total += i\nprint(total)"
+CALLS = "def work():\n    return sum(range(200000))\n\nfor _ in range(3):\n    work()"
+
+class LineProfileTests(SimpleTestCase):
+    def profile(self, source):
+        compiled, _ = compile_user_code(source)
+        result = execute_job(compiled, options={"profile_lines": True})
+        self.assertTrue(result["success"])
+        lines = {entry[0]: tuple(entry[1:]) for entry in result["line_profile"]["lines"]}
+        return lines, result
+
+    def test_counts_hits_per_line(self):
+        lines, result = self.profile(LOOP)
+        self.assertEqual(result["output"], "499500")
+        self.assertEqual(lines[1][0], 1)
+        self.assertEqual(lines[2][0], 1001)
+        self.assertEqual(lines[3][0], 1000)
+        self.assertIn(result["line_profile"]["hottest"], (2, 3))
+
+    def test_calls_count_toward_the_calling_line_total_only(self):
+        lines, result = self.profile(CALLS)
+        hits, total_ms, self_ms = lines[5]
+        self.assertEqual(hits, 3)
+        self.assertLess(self_ms, total_ms)
+        self.assertEqual(result["line_profile"]["hottest"], 2)
+
+    def test_not_profiled_unless_requested(self):
+        compiled, _ = compile_user_code(LOOP)
+        self.assertNotIn("line_profile", execute_job(compiled))
+
+class MemoryProfileTests(SimpleTestCase):
+    def profile(self, source):
+        compiled, _ = compile_user_code(source)
+        result = execute_job(compiled, options={"profile_memory": True})
+        self.assertTrue(result["success"])
+        return result["memory_profile"]
+
+    def test_reports_peak_and_top_allocation_lines(self):
+        profile = self.profile("small = [0] * 10\nbig = [str(i) for i in range(100000)]\nprint(len(big))")
+        self.assertGreater(profile["peak_kb"], 1000)
+        line, size_kb, count = profile["top"][0]
+        self.assertEqual(line, 2)
+        self.assertGreater(size_kb, 1000)
+        self.assertGreater(count, 1000)
+
+    def test_freed_memory_counts_toward_peak_only(self):
+        profile = self.profile("data = [str(i) for i in range(100000)]\ndata = None")
+        self.assertGreater(profile["peak_kb"], 1000)
+        self.assertLess(sum(size_kb for _, size_kb, _ in profile["top"]), 100)
+
+class ProfileTestCasesTests(SimpleTestCase):
+    def test_profiles_tests_that_ran(self):
+        compiled, _ = compile_user_code("print(int(input()) * 2)")
+        cases = (
+            build_test_case("test1", {"input": "2", "output": "4"}),
+            build_test_case("test2", {"input": "3", "output": "6"}),
+        )
+        test_results = [{"test_name": "test1", "passed": True}, skipped_test_result("test2")]
+        profiled = profile_test_cases(compiled, cases, test_results, profile_options({"profile_lines": True}))
+        self.assertIn("line_profile", profiled[0])
+        self.assertNotIn("line_profile", profiled[1])
+        self.assertNotIn("line_profile", test_results[0])
+
+    def test_profile_options(self):
+        self.assertEqual(profile_options({"profile_lines": True, "stress": True}), {"profile_lines": True})
+        self.assertEqual(
+            profile_options({"profile_lines": True, "profile_memory": True}),
+            {"profile_lines": True, "profile_memory": True}
+        )
+        self.assertEqual(profile_options({}), {})
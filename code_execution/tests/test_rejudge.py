@@ -0,0 +1,99 @@
+import os
+import tempfile
+from datetime import date, timedelta
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from accounts.models import Profile
+from gamification.models import LeaderboardEntry
+from problems.models import Submission, UserProgress
+from code_execution.rejudge import build_filters, reconcile, run_rejudge, solve_streaks
+from code_execution.test_suites import test_suite_cache
+from code_execution.verdict_cache import verdict_cache
+from . import create_problem, create_user
+
+class SolveStreaksTests(SimpleTestCase):
+    def test_no_solves(self):
+        self.assertEqual(solve_streaks([]), (0, 0))
+
+    def test_consecutive_days(self):
+        start = date(2025, 1, 1)
+        self.assertEqual(solve_streaks([start + timedelta(days=i) for i in range(3)]), (3, 3))
+
+    def test_current_streak_ends_on_last_solve(self):
+        days = [date(2025, 1, 1), date(2025, 1, 2), date(2025, 1, 3), date(2025, 1, 10), date(2025, 1, 11)]
+        self.assertEqual(solve_streaks(days), (2, 3))
+
+class ReconcileTests(TestCase):
+    def setUp(self):
+        self.user = create_user("learner")
+        self.problem = create_problem()
+        self.other_problem = create_problem(name="Other")
+
+    def submit(self, problem, status, days_ago):
+        submission = Submission.objects.create(
+            user=self.user, problem=problem, code_submitted="print(3)", status=status, language="python"
+        )
+        Submission.objects.filter(id=submission.id).update(created_at=timezone.now() - timedelta(days=days_ago))
+
+    def test_recomputes_progress_leaderboard_and_streaks(self):
+        # The first problem's only accepted submission was overturned by a rejudge
+        self.submit(self.problem, 'attempted', 2)
+        self.submit(self.other_problem, 'completed', 1)
+        self.submit(self.other_problem, 'completed', 0)
+        UserProgress.objects.create(user=self.user, problem=self.problem, is_completed=True, attempts=1)
+        UserProgress.objects.create(user=self.user, problem=self.other_problem, is_completed=False, attempts=2)
+        LeaderboardEntry.objects.create(user=self.user, total_solved=1)
+
+        reconcile({(self.user.id, self.problem.id), (self.user.id, self.other_problem.id)})
+
+        self.assertFalse(UserProgress.objects.get(problem=self.problem).is_completed)
+        self.assertTrue(UserProgress.objects.get(problem=self.other_problem).is_completed)
+        self.assertEqual(LeaderboardEntry.objects.get(user=self.user).total_solved, 1)
+        profile = Profile.objects.get(user=self.user)
+        self.assertEqual((profile.streak, profile.high_score_streak), (2, 2))
+        self.assertEqual(profile.last_solved_date, timezone.now().date())
+
+    def test_creates_missing_leaderboard_entry(self):
+        self.submit(self.problem, 'completed', 0)
+        UserProgress.objects.create(user=self.user, problem=self.problem, is_completed=False, attempts=1)
+        reconcile({(self.user.id, self.problem.id)})
+        self.assertEqual(LeaderboardEntry.objects.get(user=self.user).total_solved, 1)
+
+class RunRejudgeTests(TestCase):
+    def setUp(self):
+        test_suite_cache.clear()
+        verdict_cache.clear()
+        self.user = create_user("learner")
+        self.problem = create_problem(test_cases={"test1": {"input": "1,2", "output": "3"}})
+        for code in ("print(3)", "a = int(input())\nb = int(input())\nprint(a + b)"):
+            Submission.objects.create(
+                user=self.user, problem=self.problem, code_submitted=code, status='completed', language="python"
+            )
+        UserProgress.objects.create(user=self.user, problem=self.problem, is_completed=True, attempts=2)
+        checkpoint_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(checkpoint_dir.cleanup)
+        self.checkpoint_path = os.path.join(checkpoint_dir.name, "checkpoint.json")
+
+    def test_rejudges_changed_verdicts_and_reconciles(self):
+        self.problem.test_cases = {"test1": {"input": "2,2", "output": "4"}}
+        self.problem.save()
+
+        summary = run_rejudge(build_filters(), workers=2, checkpoint_path=self.checkpoint_path)
+
+        self.assertEqual((summary["judged"], summary["changed"]), (2, 1))
+        self.assertEqual(
+            list(Submission.objects.order_by('id').values_list('status', flat=True)),
+            ['attempted', 'completed']
+        )
+        self.assertTrue(UserProgress.objects.get(user=self.user).is_completed)
+        self.assertFalse(os.path.exists(self.checkpoint_path))
+
+    def test_dry_run_writes_nothing(self):
+        self.problem.test_cases = {"test1": {"input": "5,5", "output": "10"}}
+        self.problem.save()
+
+        summary = run_rejudge(build_filters(), dry_run=True, checkpoint_path=self.checkpoint_path)
+
+        self.assertEqual(summary["changed"], 1)
+        self.assertFalse(Submission.objects.exclude(status='completed').exists())
+        self.assertFalse(os.path.exists(self.checkpoint_path))
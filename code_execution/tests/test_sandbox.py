@@ -0,0 +1,139 @@
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.test import SimpleTestCase
+from code_execution.sandbox import (
+    STATUS_MEMORY_LIMIT, STATUS_OUTPUT_LIMIT, STATUS_RUNTIME_ERROR, STATUS_TIME_LIMIT,
+    InputBatch, SandboxPool, SandboxZygote, compile_user_code, execute_job, host_dependent, host_dependent_flags,
+    zygote_supported
+)
+from code_execution.test_suites import build_test_case
+from code_execution.views import VERDICT_ACCEPTED, judge_test_case
+
+def compiled(source):
+    code, error = compile_user_code(source)
+    assert code is not None, error
+    return code
+
+class SandboxPoolTests(SimpleTestCase):
+    def setUp(self):
+        self.pool = SandboxPool(size=1)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_runs_code_with_input(self):
+        result = self.pool.run(compiled("print(int(input()) + int(input()))"), ("2", "3"), timeout=5)
+        self.assertTrue(result["success"])
+        self.assertEqual(result["output"], "5")
+
+    def test_timeout_kills_and_replaces_worker(self):
+        started = time.monotonic()
+        result = self.pool.run(compiled("while True:\n    pass"), "", timeout=0.5)
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertFalse(result["success"])
+        self.assertTrue(result["timed_out"])
+        self.assertEqual(result["status"], STATUS_TIME_LIMIT)
+        self.assertTrue(host_dependent(result))
+        self.assertEqual(host_dependent_flags(result), {"timed_out": True})
+
+        # The killed worker's slot is taken by a fresh one
+        result = self.pool.run(compiled("print('after')"), "", timeout=5)
+        self.assertEqual(result["output"], "after")
+        self.assertFalse(host_dependent(result))
+
+    def test_worker_state_does_not_leak_between_jobs(self):
+        self.pool.run(compiled("leaked = 1"), "", timeout=5)
+        result = self.pool.run(compiled("print(leaked)"), "", timeout=5)
+        self.assertFalse(result["success"])
+        self.assertEqual(result["status"], STATUS_RUNTIME_ERROR)
+
+    def test_batch_stops_on_failure(self):
+        code = compiled("x = int(input())\nprint(10 // x)")
+        results = self.pool.run(code, InputBatch(("1", "0", "2")), timeout=5)
+        self.assertEqual(len(results), 3)
+        results = self.pool.run(code, InputBatch(("1", "0", "2"), stop_on_failure=True), timeout=5)
+        self.assertEqual([result["success"] for result in results], [True, False])
+
+class SandboxZygoteTests(SimpleTestCase):
+    def setUp(self):
+        if not zygote_supported():
+            self.skipTest("The zygote backend needs fork")
+        self.zygote = SandboxZygote()
+
+    def tearDown(self):
+        self.zygote.close()
+
+    def test_runs_code_with_input(self):
+        result = self.zygote.run(compiled("print(int(input()) * 3)"), ("7",), timeout=5)
+        self.assertEqual(result["output"], "21")
+
+    def test_timeout_kills_only_the_child(self):
+        result = self.zygote.run(compiled("while True:\n    pass"), "", timeout=0.5)
+        self.assertTrue(result["timed_out"])
+        zygote_pid = self.zygote.process.pid
+
+        result = self.zygote.run(compiled("print('after')"), "", timeout=5)
+        self.assertEqual(result["output"], "after")
+        self.assertEqual(self.zygote.process.pid, zygote_pid)
+
+    def test_jobs_wait_for_a_free_slot(self):
+        zygote = SandboxZygote(size=1)
+        self.addCleanup(zygote.close)
+        results = []
+        zygote.slots.acquire()
+        waiting = threading.Thread(
+            target=lambda: results.append(zygote.run(compiled("print('ran')"), "", timeout=5))
+        )
+        waiting.start()
+        waiting.join(0.3)
+        self.assertTrue(waiting.is_alive())
+
+        zygote.slots.release()
+        waiting.join(5)
+        self.assertEqual(results[0]["output"], "ran")
+
+    def test_children_do_not_share_state(self):
+        self.zygote.run(compiled("import_me = 1"), "", timeout=5)
+        result = self.zygote.run(compiled("print(import_me)"), "", timeout=5)
+        self.assertEqual(result["status"], STATUS_RUNTIME_ERROR)
+
+class OutputCaptureTests(SimpleTestCase):
+    def test_concurrent_executions_capture_their_own_output(self):
+        code = compiled("n = int(input())\nfor i in range(200):\n    print(n)")
+        stdout = sys.stdout
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda n: execute_job(code, str(n)), range(8)))
+        self.assertIs(sys.stdout, stdout)
+        for n, result in enumerate(results):
+            self.assertEqual(set(result["output"].split()), {str(n)})
+
+class LimitVerdictTests(SimpleTestCase):
+    def judge(self, source, test_data, limits):
+        return judge_test_case(compiled(source), build_test_case("test1", test_data), limits)
+
+    def test_accepted_reports_resource_usage(self):
+        result = self.judge("print(int(input()) * 2)", {"input": "21", "output": "42"},
+                            {"cpu_time": 2, "memory_mb": 256})
+        self.assertEqual(result["verdict"], VERDICT_ACCEPTED)
+        self.assertIsNotNone(result["cpu_time"])
+        self.assertIsNotNone(result["peak_memory_kb"])
+
+    def test_cpu_time_limit(self):
+        result = self.judge("while True:\n    pass", {"input": "", "output": ""},
+                            {"cpu_time": 0.3, "memory_mb": 256})
+        self.assertFalse(result["passed"])
+        self.assertEqual(result["verdict"], STATUS_TIME_LIMIT)
+
+    def test_memory_limit(self):
+        result = self.judge("data = [0] * (64 * 1024 * 1024)", {"input": "", "output": ""},
+                            {"cpu_time": 2, "memory_mb": 128})
+        self.assertFalse(result["passed"])
+        self.assertEqual(result["verdict"], STATUS_MEMORY_LIMIT)
+
+    def test_output_limit(self):
+        result = self.judge("while True:\n    print('x' * 100)", {"input": "", "output": "x"},
+                            {"cpu_time": 2, "memory_mb": 256})
+        self.assertFalse(result["passed"])
+        self.assertEqual(result["verdict"], STATUS_OUTPUT_LIMIT)
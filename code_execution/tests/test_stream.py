@@ -0,0 +1,73 @@
+import json
+from django.test import SimpleTestCase, TransactionTestCase
+from code_execution.test_suites import test_suite_cache
+from code_execution.verdict_cache import verdict_cache
+from code_execution.views import format_sse_event
+from . import create_problem, create_user
+
+def parse_events(response):
+    """Decode a streamed text/event-stream response into (event, data) pairs."""
+    body = b"".join(response.streaming_content).decode()
+    events = []
+    for message in body.strip().split("\n\n"):
+        event_line, data_line = message.split("\n")
+        events.append((event_line[len("event: "):], json.loads(data_line[len("data: "):])))
+    return events
+
+class FormatSSEEventTests(SimpleTestCase):
+    def test_format(self):
+        self.assertEqual(format_sse_event("test", {"index": 0}), 'event: test\ndata: {"index": 0}\n\n')
+
+class ExecuteCodeStreamTests(TransactionTestCase):
+    def setUp(self):
+        test_suite_cache.clear()
+        verdict_cache.clear()
+        self.user = create_user("learner")
+        self.client.force_login(self.user)
+        self.problem = create_problem(test_cases={
+            "test1": {"input": "1,2", "output": "3"},
+            "test2": {"input": "2,2", "output": "4"},
+            "test3": {"input": "5,5", "output": "0"},
+        })
+
+    def stream(self, **data):
+        return self.client.post("/code_execution/execute/stream/", json.dumps(data), content_type="application/json")
+
+    def test_streams_each_test_then_summary(self):
+        response = self.stream(code="print(int(input()) + int(input()))", problem_id=self.problem.id)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        events = parse_events(response)
+
+        self.assertEqual([event for event, _ in events], ["test", "test", "test", "summary"])
+        tests = sorted((data for event, data in events if event == "test"), key=lambda data: data["index"])
+        self.assertEqual([data["index"] for data in tests], [0, 1, 2])
+        self.assertEqual([data["passed"] for data in tests], [True, True, False])
+        summary = events[-1][1]
+        self.assertFalse(summary["all_tests_passed"])
+        self.assertIsNotNone(summary["submission_id"])
+
+    def test_cached_verdict_still_sends_every_test(self):
+        code = "print(int(input()) + int(input()))"
+        parse_events(self.stream(code=code, problem_id=self.problem.id))
+        events = parse_events(self.stream(code=code, problem_id=self.problem.id))
+        self.assertEqual([event for event, _ in events], ["test", "test", "test", "summary"])
+        self.assertTrue(events[-1][1]["cached"])
+
+    def test_bad_requests_get_json_errors(self):
+        self.assertEqual(self.stream(code="", problem_id=self.problem.id).status_code, 400)
+        self.assertEqual(self.stream(code="print(1)", problem_id=self.problem.id + 1).status_code, 404)
+        self.assertEqual(self.stream(code="print(1)", problem_id="abc").status_code, 404)
+
+        response = self.stream(code=42, problem_id=self.problem.id)
+        self.assertEqual(response.status_code, 500)
+        self.assertIn("error", response.json())
+
+    def test_broken_test_data_gets_json_error(self):
+        problem = create_problem(test_cases={"test1": {"input_file": "missing.txt", "output": ""}})
+        response = self.stream(code="print(1)", problem_id=problem.id)
+        self.assertEqual(response.status_code, 500)
+        self.assertIn("missing.txt", response.json()["error"])
+
+    def test_string_problem_id(self):
+        response = self.stream(code="print(int(input()) + int(input()))", problem_id=str(self.problem.id))
+        self.assertEqual(parse_events(response)[-1][0], "summary")
@@ -0,0 +1,83 @@
+from django.test import SimpleTestCase, TestCase
+from code_execution.sandbox import STATUS_RUNTIME_ERROR, STATUS_TIME_LIMIT
+from code_execution.stress import STRESS_MAX_N, generate_stress_inputs, reference_cache, run_batches
+from code_execution.test_suites import test_suite_cache
+from code_execution.verdict_cache import verdict_cache
+from code_execution.views import STRESS_TEST_NAME, VERDICT_ACCEPTED, VERDICT_WRONG_ANSWER, judge_submission
+from . import create_problem, create_user
+
+GENERATOR = "def generate(n, rng):\n    return ','.join(str(rng.randint(-9, 9)) for _ in range(n))"
+REFERENCE = "values = []\nv = input()\nwhile v != '':\n    values.append(int(v))\n    v = input()\nprint(max(values))"
+# Wrong whenever every value is negative, which only random inputs catch
+ZERO_FLOOR = "best = 0\nv = input()\nwhile v != '':\n    best = max(best, int(v))\n    v = input()\nprint(best)"
+
+class GenerateStressInputsTests(SimpleTestCase):
+    def test_inputs_grow_and_repeat(self):
+        inputs = generate_stress_inputs(GENERATOR, runs=20)
+        sizes = [n for n, _ in inputs]
+        self.assertEqual(sizes, sorted(sizes))
+        self.assertEqual((sizes[0], sizes[-1] <= STRESS_MAX_N), (1, True))
+        self.assertEqual(inputs, generate_stress_inputs(GENERATOR, runs=20))
+
+class RunBatchesTests(SimpleTestCase):
+    def test_failed_single_rerun_is_reported(self):
+        timed_out = {"success": False, "error": "timed out", "status": STATUS_TIME_LIMIT, "timed_out": True}
+        results = run_batches(b"", ["1", "2", "3"], lambda compiled, inputs: timed_out)
+        self.assertEqual(results, [timed_out])
+
+    def test_results_follow_input_order(self):
+        def run_batch(compiled, inputs):
+            return [{"success": True, "output": value} for value in inputs]
+        inputs = [str(i) for i in range(60)]
+        self.assertEqual([result["output"] for result in run_batches(b"", inputs, run_batch)], inputs)
+
+class StressTestTests(TestCase):
+    def setUp(self):
+        test_suite_cache.clear()
+        verdict_cache.clear()
+        reference_cache.entries.clear()
+        self.user = create_user("learner")
+        self.problem = create_problem(
+            test_cases={"test1": {"input": "1,5,2", "output": "5"}},
+            input_generator=GENERATOR,
+            reference_solution=REFERENCE
+        )
+
+    def stress_result(self, code, stress=True):
+        response = judge_submission(self.user, self.problem, code, stress=stress)
+        names = [result["test_name"] for result in response["test_results"]]
+        return response, dict(zip(names, response["test_results"])).get(STRESS_TEST_NAME)
+
+    def test_stress_testing_is_opt_in(self):
+        response, result = self.stress_result(ZERO_FLOOR, stress=False)
+        self.assertTrue(response["all_tests_passed"])
+        self.assertIsNone(result)
+
+    def test_correct_solution_passes(self):
+        response, result = self.stress_result(REFERENCE)
+        self.assertTrue(response["all_tests_passed"])
+        self.assertEqual(result["verdict"], VERDICT_ACCEPTED)
+        self.assertGreater(result["stress_runs"], 1)
+
+    def test_reports_smallest_failing_input(self):
+        response, result = self.stress_result(ZERO_FLOOR)
+        self.assertFalse(response["all_tests_passed"])
+        self.assertEqual(result["verdict"], VERDICT_WRONG_ANSWER)
+        self.assertEqual(result["n"], 1)
+        self.assertTrue(result["input"].startswith("-"))
+        self.assertEqual(result["actual_output"], "0")
+
+    def test_slow_solution_hits_the_stress_time_limit(self):
+        slow = REFERENCE.replace("print(", "while len(values) >= 10:\n    pass\nprint(")
+        response, result = self.stress_result(slow)
+        self.assertFalse(response["all_tests_passed"])
+        self.assertEqual(result["verdict"], STATUS_TIME_LIMIT)
+        self.assertEqual(result["n"], 10)
+
+    def test_broken_reference_solution(self):
+        self.problem.reference_solution = "raise ValueError()"
+        self.problem.save()
+        response, result = self.stress_result(REFERENCE)
+        self.assertFalse(response["all_tests_passed"])
+        self.assertEqual(result["verdict"], STATUS_RUNTIME_ERROR)
+        self.assertIn("Stress test could not run", result["error"])
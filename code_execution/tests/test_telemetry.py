@@ -0,0 +1,60 @@
+from django.test import SimpleTestCase, TestCase
+from problems.models import ProblemStats, Submission
+from code_execution.test_suites import test_suite_cache
+from code_execution.verdict_cache import verdict_cache
+from code_execution.views import build_telemetry, judge_submission, total_cpu_ms
+from . import create_problem, create_user
+
+SOLUTION = "print(int(input()) + int(input()))"
+
+class ProblemStatsTests(SimpleTestCase):
+    def setUp(self):
+        self.stats = ProblemStats()
+
+    def test_nothing_counted(self):
+        self.assertIsNone(self.stats.faster_than(10))
+
+    def test_faster_than(self):
+        for runtime_ms in (1, 10, 100, 1000):
+            self.stats.add_runtime(runtime_ms)
+        self.assertEqual(self.stats.accepted_count, 4)
+        self.assertEqual(self.stats.faster_than(0.1), 100.0)
+        self.assertEqual(self.stats.faster_than(5000), 0.0)
+        # The matching bucket counts as half slower
+        self.assertEqual(self.stats.faster_than(100), 37.5)
+
+class TelemetryTests(SimpleTestCase):
+    def test_build_telemetry(self):
+        telemetry = build_telemetry([
+            {"cpu_time": 0.0012, "wall_time": 0.002, "peak_memory_kb": 900},
+            {"skipped": True},
+        ])
+        self.assertEqual(telemetry, {"cpu_ms": [1.2, None], "wall_ms": [2.0, None], "peak_kb": [900, None]})
+        self.assertEqual(total_cpu_ms(telemetry), 1.2)
+
+class RuntimePercentileTests(TestCase):
+    def setUp(self):
+        test_suite_cache.clear()
+        verdict_cache.clear()
+        self.user = create_user("learner")
+        self.problem = create_problem()
+
+    def test_first_accepted_solution_has_no_percentile(self):
+        response = judge_submission(self.user, self.problem, SOLUTION)
+        self.assertIsNone(response["runtime_percentile"])
+        self.assertEqual(ProblemStats.objects.get(problem=self.problem).accepted_count, 1)
+        telemetry = Submission.objects.get(id=response["submission_id"]).telemetry
+        self.assertEqual(len(telemetry["cpu_ms"]), 1)
+
+    def test_percentile_against_earlier_solutions(self):
+        stats = ProblemStats.objects.create(problem=self.problem)
+        for _ in range(3):
+            stats.add_runtime(60_000)
+        stats.save()
+        response = judge_submission(self.user, self.problem, SOLUTION)
+        self.assertEqual(response["runtime_percentile"], 100.0)
+
+    def test_failed_solution_is_not_counted(self):
+        response = judge_submission(self.user, self.problem, "print(0)")
+        self.assertIsNone(response["runtime_percentile"])
+        self.assertFalse(ProblemStats.objects.filter(problem=self.problem, accepted_count__gt=0).exists())
@@ -0,0 +1,109 @@
+import os
+import marshal
+import tempfile
+from django.test import SimpleTestCase, override_settings
+from code_execution.sandbox import MAX_OUTPUT_CHARS, compile_user_code, iter_mapped_values
+from code_execution.test_data import TestDataError, expand_input, load_expected
+from code_execution.test_suites import OUTPUT_SLACK_CHARS, build_test_case, output_limit
+from code_execution.views import VERDICT_ACCEPTED, judge_test_case
+
+GENERATOR = "def generate(n, rng):\n    return ','.join(str(rng.randint(1, 9)) for _ in range(n))"
+ARGS_GENERATOR = "def generate(n, rng):\n    return [list(range(n))]"
+SUM_INPUT = "total = 0\nv = input()\nwhile v != '':\n    total += int(v)\n    v = input()\nprint(total)"
+
+class TestDataTests(SimpleTestCase):
+    def setUp(self):
+        data_dir = tempfile.TemporaryDirectory()
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(data_dir.cleanup)
+        self.addCleanup(cache_dir.cleanup)
+        self.data_dir = data_dir.name
+        self.cache_dir = cache_dir.name
+        self.enterContext(override_settings(TEST_DATA_DIR=self.data_dir, TEST_DATA_CACHE_DIR=self.cache_dir))
+
+    def write_data(self, name, content):
+        with open(os.path.join(self.data_dir, name), "w") as f:
+            f.write(content)
+
+    def read(self, mapped):
+        with open(mapped.path, "rb") as f:
+            return f.read()
+
+    def test_inline_input_is_not_expanded(self):
+        self.assertEqual(expand_input({"input": "1,2", "output": "3"}), (None, None))
+        self.assertEqual(load_expected({"input": "1,2", "output": "3"}), (None, None))
+
+    def test_generated_input_is_cached_once(self):
+        mapped, key = expand_input({"generate": {"n": 100, "seed": 3}}, generator_source=GENERATOR)
+        self.assertEqual(os.path.dirname(mapped.path), os.path.abspath(self.cache_dir))
+        self.assertEqual(len(self.read(mapped).split(b",")), 100)
+
+        again, same_key = expand_input({"generate": {"n": 100, "seed": 3}}, generator_source=GENERATOR)
+        self.assertEqual((again.path, same_key), (mapped.path, key))
+        _, other_key = expand_input({"generate": {"n": 100, "seed": 4}}, generator_source=GENERATOR)
+        self.assertNotEqual(other_key, key)
+
+    def test_generated_arguments(self):
+        mapped, _ = expand_input({"generate": {"n": 3}}, "solve", ARGS_GENERATOR)
+        self.assertEqual(marshal.loads(self.read(mapped)), ([0, 1, 2],))
+
+    def test_bad_generate_spec(self):
+        with self.assertRaises(TestDataError):
+            expand_input({"generate": {"seed": 1}}, generator_source=GENERATOR)
+        with self.assertRaises(TestDataError):
+            expand_input({"generate": {"n": 1}}, generator_source="def generate(n, rng):\n    raise ValueError()")
+
+    def test_input_file(self):
+        self.write_data("big.txt", "4,5,6")
+        mapped, key = expand_input({"input_file": "big.txt"})
+        self.assertEqual(self.read(mapped), b"4,5,6")
+        self.write_data("big.txt", "4,5,7")
+        self.assertNotEqual(expand_input({"input_file": "big.txt"})[1], key)
+
+    def test_data_files_must_exist_inside_the_data_directory(self):
+        with self.assertRaises(TestDataError):
+            expand_input({"input_file": "missing.txt"})
+        with self.assertRaises(TestDataError):
+            load_expected({"output_file": "../outside.txt"})
+
+    def test_expected_output_file(self):
+        self.write_data("big.out", "15\n")
+        self.assertEqual(load_expected({"output_file": "big.out"})[0], "15\n")
+        self.write_data("value.json", "[1, 2]")
+        self.assertEqual(load_expected({"output_file": "value.json"}, "solve")[0], [1, 2])
+        self.write_data("broken.json", "[1,")
+        with self.assertRaises(TestDataError):
+            load_expected({"output_file": "broken.json"}, "solve")
+
+    def test_mapped_input_is_judged(self):
+        self.write_data("big.txt", ",".join(["3"] * 10000))
+        self.write_data("big.out", "30000")
+        compiled, _ = compile_user_code(SUM_INPUT)
+        case = build_test_case("test1", {"input_file": "big.txt", "output_file": "big.out"})
+        self.assertIsNotNone(case.data_key)
+        result = judge_test_case(compiled, case)
+        self.assertEqual(result["verdict"], VERDICT_ACCEPTED)
+
+    def test_output_larger_than_the_default_cap_can_pass(self):
+        self.write_data("huge.out", "12345\n" * 300_000)
+        compiled, _ = compile_user_code("for _ in range(300000):\n    print(12345)")
+        case = build_test_case("test1", {"input": "", "output_file": "huge.out"})
+        self.assertGreater(len(case.expected_output), MAX_OUTPUT_CHARS)
+        result = judge_test_case(compiled, case)
+        self.assertEqual(result["verdict"], VERDICT_ACCEPTED)
+
+class OutputLimitTests(SimpleTestCase):
+    def test_small_outputs_are_capped(self):
+        self.assertEqual(output_limit("3"), 2 + OUTPUT_SLACK_CHARS)
+        self.assertEqual(output_limit("x" * 900_000), MAX_OUTPUT_CHARS)
+
+    def test_correct_answer_always_fits(self):
+        for length in (MAX_OUTPUT_CHARS - OUTPUT_SLACK_CHARS // 2, MAX_OUTPUT_CHARS, 2 * MAX_OUTPUT_CHARS):
+            self.assertGreaterEqual(output_limit("x" * length), length + OUTPUT_SLACK_CHARS)
+
+class IterMappedValuesTests(SimpleTestCase):
+    def test_splits_and_strips_values(self):
+        self.assertEqual(list(iter_mapped_values(b" 1, 2,3 ")), ["1", "2", "3"])
+
+    def test_empty_input(self):
+        self.assertEqual(list(iter_mapped_values(b"")), [])
@@ -0,0 +1,89 @@
+from unittest import mock
+from django.test import SimpleTestCase, TestCase
+from code_execution.sandbox import compile_user_code
+from code_execution.test_suites import test_suite_cache
+from code_execution.timing import BENCHMARK_MAX_RUNS, BENCHMARK_RUNS, benchmark_solution, runs_within_budget
+from code_execution.verdict_cache import verdict_cache
+from code_execution.views import benchmark_runs, judge_submission
+from . import create_problem, create_user
+
+def ok_batch(cpu_time):
+    def run_batch(compiled, inputs):
+        return [{"success": True, "output": "", "cpu_time": cpu_time} for _ in inputs]
+    return run_batch
+
+class BenchmarkSolutionTests(SimpleTestCase):
+    def setUp(self):
+        self.compiled, _ = compile_user_code("print(1)")
+
+    def test_summarises_total_runtime_over_inputs(self):
+        report = benchmark_solution(self.compiled, ["1", "2"], ok_batch(0.002), runs=3, warmup=1)
+        self.assertEqual((report["runs"], report["warmup_runs"]), (3, 1))
+        self.assertEqual(report["min_ms"], 4.0)
+        self.assertEqual(report["median_ms"], 4.0)
+        self.assertEqual(report["stdev_ms"], 0.0)
+        self.assertEqual(report["calibration_ms"], 2.0)
+        self.assertEqual(report["normalized"]["median"], 2.0)
+
+    def test_warmup_runs_are_not_measured(self):
+        def run_batch(compiled, inputs):
+            return [{"success": True, "cpu_time": 0.001 * (index + 1)} for index in range(len(inputs))]
+        report = benchmark_solution(self.compiled, ["1"], run_batch, runs=3, warmup=2)
+        self.assertEqual(report["min_ms"], 3.0)
+        self.assertEqual(report["median_ms"], 4.0)
+
+    def test_failed_run_is_reported(self):
+        def failing_batch(compiled, inputs):
+            return {"success": False, "error": "boom"}
+        report = benchmark_solution(self.compiled, ["1"], failing_batch, runs=2)
+        self.assertIn("boom", report["error"])
+        self.assertNotIn("median_ms", report)
+
+class RunsWithinBudgetTests(SimpleTestCase):
+    def test_fast_solutions_get_every_run(self):
+        self.assertEqual(runs_within_budget(50, 0.01, warmup=2, budget=10), 50)
+        self.assertEqual(runs_within_budget(50, 0.0, warmup=2, budget=10), 50)
+
+    def test_runs_are_cut_to_fit_with_warmup(self):
+        # 2 warm-up and 8 measured runs of 1 second each
+        self.assertEqual(runs_within_budget(50, 1.0, warmup=2, budget=10), 8)
+
+    def test_too_slow_to_benchmark(self):
+        self.assertEqual(runs_within_budget(50, 4.0, warmup=2, budget=10), 0)
+
+class BenchmarkRunsTests(SimpleTestCase):
+    def test_requested_runs(self):
+        self.assertEqual(benchmark_runs({}), 0)
+        self.assertEqual(benchmark_runs({"benchmark": True}), BENCHMARK_RUNS)
+        self.assertEqual(benchmark_runs({"benchmark": 3}), 3)
+        self.assertEqual(benchmark_runs({"benchmark": 10_000}), BENCHMARK_MAX_RUNS)
+        self.assertEqual(benchmark_runs({"benchmark": "5"}), 0)
+        self.assertEqual(benchmark_runs({"benchmark": -1}), 0)
+
+class JudgeBenchmarkTests(TestCase):
+    def setUp(self):
+        test_suite_cache.clear()
+        verdict_cache.clear()
+        self.user = create_user("learner")
+        self.problem = create_problem()
+
+    def test_accepted_solution_is_benchmarked(self):
+        response = judge_submission(self.user, self.problem, "print(int(input()) + int(input()))", benchmark=3)
+        self.assertEqual(response["benchmark"]["runs"], 3)
+        self.assertGreater(response["benchmark"]["calibration_ms"], 0)
+
+    def test_failed_solution_is_not_benchmarked(self):
+        response = judge_submission(self.user, self.problem, "print(0)", benchmark=3)
+        self.assertNotIn("benchmark", response)
+
+    def test_runs_are_cut_to_the_budget(self):
+        with mock.patch("code_execution.views.runs_within_budget", return_value=2) as budget:
+            response = judge_submission(self.user, self.problem, "print(int(input()) + int(input()))", benchmark=50)
+        self.assertEqual(budget.call_args.args[0], 50)
+        self.assertEqual(response["benchmark"]["runs"], 2)
+
+    def test_too_slow_solution_is_not_benchmarked(self):
+        with mock.patch("code_execution.views.runs_within_budget", return_value=0):
+            response = judge_submission(self.user, self.problem, "print(int(input()) + int(input()))", benchmark=50)
+        self.assertEqual(response["benchmark"]["runs"], 0)
+        self.assertIn("too slow", response["benchmark"]["error"])
@@ -0,0 +1,133 @@
+"""
+Repeated-run benchmarking of accepted solutions.
+
+This module provides functionality to:
+- Run a solution on every test case several times after warm-up runs, in
+  the same sandbox worker so the measured runs start warm
+- Summarise its runtime as min, median and standard deviation
+- Normalise runtimes against a calibration loop timed on the same host
+  around the benchmark, so results stay comparable when the host is busy
+- Cut the number of runs so a benchmark stays within a CPU-time budget
+"""
+
+import statistics
+from .sandbox import compile_user_code
+
+# Constants
+BENCHMARK_RUNS = 10  # measured runs per test case by default
+BENCHMARK_MAX_RUNS = 50  # most measured runs a request can ask for
+BENCHMARK_WARMUP_RUNS = 2  # unmeasured runs before each test's measured runs
+BENCHMARK_MAX_SECONDS = 10  # CPU seconds a benchmark may spend running the solution, warm-up included
+CALIBRATION_RUNS = 5  # measured runs of the calibration loop, before and after
+CALIBRATION_CODE = "total = 0\nfor i in range(100000):\n    total += i * i\n"
+
+class BenchmarkError(Exception):
+    """Raised when a run fails during benchmarking."""
+
+def measure_runs(compiled, test_input, runs, warmup, run_batch):
+    """
+    Time repeated runs of code on one input in a single sandbox job.
+
+    Args:
+        compiled (bytes): Code compiled by compile_user_code.
+        test_input: Test input as accepted by run_code_with_test.
+        runs (int): Number of measured runs.
+        warmup (int): Number of runs made first and not measured.
+        run_batch (callable): Runs code on a list of inputs in one sandbox job,
+            returning a list of results or a single result if the job failed.
+
+    Returns:
+        list: CPU seconds of each measured run.
+
+    Raises:
+        BenchmarkError: If any run fails.
+    """
+    results = run_batch(compiled, [test_input] * (warmup + runs))
+    if isinstance(results, dict):
+        results = [results]
+    for result in results:
+        if not result["success"]:
+            raise BenchmarkError(result["error"])
+    return [result["cpu_time"] for result in results[warmup:]]
+
+def calibrate(run_batch):
+    """
+    Time the calibration loop on this host.
+
+    Args:
+        run_batch (callable): See measure_runs.
+
+    Returns:
+        float: Median CPU seconds of the calibration loop.
+    """
+    compiled, _ = compile_user_code(CALIBRATION_CODE)
+    return statistics.median(measure_runs(compiled, "", CALIBRATION_RUNS, 1, run_batch))
+
+def summarize(samples, unit_suffix="_ms", digits=3):
+    """Min, median and standard deviation of samples, rounded for reporting."""
+    return {
+        f"min{unit_suffix}": round(min(samples), digits),
+        f"median{unit_suffix}": round(statistics.median(samples), digits),
+        f"stdev{unit_suffix}": round(statistics.stdev(samples), digits) if len(samples) > 1 else 0.0,
+    }
+
+def runs_within_budget(runs, run_seconds, warmup=BENCHMARK_WARMUP_RUNS, budget=BENCHMARK_MAX_SECONDS):
+    """
+    Cut the number of measured runs so a benchmark fits its CPU-time budget.
+
+    Args:
+        runs (int): Number of measured runs requested.
+        run_seconds (float): CPU seconds of one run over every test input,
+            such as the total measured when the solution was judged.
+        warmup (int): Number of unmeasured runs before each input's measured runs.
+        budget (float): CPU seconds the benchmark may spend.
+
+    Returns:
+        int: Measured runs that fit, at most runs; 0 if not even one fits.
+    """
+    if run_seconds <= 0:
+        return runs
+    return max(0, min(runs, int(budget / run_seconds) - warmup))
+
+def benchmark_solution(compiled, inputs, run_batch, runs=BENCHMARK_RUNS, warmup=BENCHMARK_WARMUP_RUNS):
+    """
+    Benchmark a solution over all of a problem's test inputs.
+
+    Each measured run of the solution is its total CPU time across every
+    test input. Test inputs are benchmarked one after another rather than
+    concurrently, so runs don't compete with each other for the CPU. The
+    calibration loop is timed before and after, and normalised figures are
+    runtimes divided by its average, in units of one calibration loop.
+
+    Args:
+        compiled (bytes): User code compiled by compile_user_code.
+        inputs (list): Test input of each test case.
+        run_batch (callable): See measure_runs.
+        runs (int): Number of measured runs.
+        warmup (int): Number of unmeasured runs before each input's measured runs.
+
+    Returns:
+        dict: runs, warmup_runs, min_ms, median_ms, stdev_ms, calibration_ms
+            and normalized (min, median and stdev in calibration units), or
+            an error if a run failed.
+    """
+    try:
+        calibration_before = calibrate(run_batch)
+        totals = [0.0] * runs
+        for test_input in inputs:
+            for index, cpu_time in enumerate(measure_runs(compiled, test_input, runs, warmup, run_batch)):
+                totals[index] += cpu_time
+        calibration = (calibration_before + calibrate(run_batch)) / 2
+    except BenchmarkError as e:
+        return {"runs": runs, "warmup_runs": warmup, "error": f"Benchmark run failed: {e}"}
+
+    report = {
+        "runs": runs,
+        "warmup_runs": warmup,
+        **summarize([total * 1000 for total in totals]),
+        "calibration_ms": round(calibration * 1000, 3),
+        "normalized": None,
+    }
+    if calibration > 0:
+        report["normalized"] = summarize([total / calibration for total in totals], "", 5)
+    return report
@@ -1,6 +1,9 @@
 from django.urls import path
-from .views import execute_code
+from .views import execute_code, execute_code_stream, submit_code, get_job_status
 
 urlpatterns = [
     path('execute/', execute_code, name='execute_code'),
+    path('execute/stream/', execute_code_stream, name='execute_code_stream'),
+    path('submit/', submit_code, name='submit_code'),
+    path('jobs/<int:job_id>/', get_job_status, name='get_job_status'),
 ]
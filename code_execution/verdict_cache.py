@@ -0,0 +1,172 @@
+"""
+In-process cache of judging verdicts for repeated submissions.
+
+This module provides functionality to:
+- Hash user code in a way that ignores comments and formatting
+- Tie verdicts that quote line numbers to the exact source they came from
+- Hash a problem's test suite so cached verdicts can be tied to it
+- Store per-test results in a bounded LRU cache, dropping a problem's
+  entries as soon as its test suite changes
+"""
+
+import ast
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Constants
+VERDICT_CACHE_SIZE = 1024  # maximum number of cached verdicts
+
+def normalized_code_hash(code):
+    """
+    Hash user code after normalising it through its AST.
+
+    Comments, blank lines and formatting do not change the hash. Code that
+    does not parse is hashed as-is.
+
+    Args:
+        code (str): Python source submitted by the user.
+
+    Returns:
+        str: Hex digest identifying the code.
+    """
+    try:
+        normalized = ast.dump(ast.parse(code))
+    except (SyntaxError, ValueError):
+        normalized = code
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+def source_code_hash(code):
+    """
+    Hash user code exactly as submitted.
+
+    Args:
+        code (str): Python source submitted by the user.
+
+    Returns:
+        str: Hex digest identifying the source text.
+    """
+    return hashlib.sha256(code.encode()).hexdigest()
+
+def test_suite_hash(test_cases, entry_function="", data_keys=(), reference_solution="", input_generator=""):
+    """
+    Hash a problem's test cases.
+
+    Args:
+        test_cases (dict): Test cases keyed by test name.
+        entry_function (str): The problem's entry function, if it has one.
+        data_keys (list): Keys of the test data the test cases reference, so
+            that changing a referenced file changes the hash.
+        reference_solution (str): The problem's reference solution, which
+            stress test verdicts depend on.
+        input_generator (str): The problem's input generator, which
+            generates the stress test inputs.
+
+    Returns:
+        str: Hex digest identifying the test suite.
+    """
+    encoded = json.dumps(test_cases, sort_keys=True, separators=(',', ':'))
+    if entry_function:
+        encoded = f"{entry_function}:{encoded}"
+    if data_keys:
+        encoded = f"{encoded}:{','.join(data_keys)}"
+    if reference_solution or input_generator:
+        encoded = f"{encoded}:{json.dumps([reference_solution, input_generator])}"
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+class VerdictCache:
+    """
+    Bounded LRU cache of test results keyed by problem, code and judging mode.
+
+    Each problem's current test suite hash is tracked, and all of a problem's
+    entries are dropped when a different suite hash is seen for it. Entries
+    stored with a source hash, such as results quoting tracebacks whose line
+    numbers depend on the exact source, only match that same source.
+    """
+
+    def __init__(self, max_size=VERDICT_CACHE_SIZE):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.suite_hashes = {}
+        self.lock = threading.Lock()
+
+    def _check_suite(self, problem_id, suite_hash):
+        """Drops a problem's entries if its test suite has changed."""
+        if self.suite_hashes.get(problem_id) != suite_hash:
+            self._invalidate(problem_id)
+            self.suite_hashes[problem_id] = suite_hash
+
+    def _invalidate(self, problem_id):
+        for key in [key for key in self.entries if key[0] == problem_id]:
+            del self.entries[key]
+        self.suite_hashes.pop(problem_id, None)
+
+    def get(self, problem_id, suite_hash, code_hash, mode=(), source_hash=None):
+        """
+        Look up cached results for a submission.
+
+        Args:
+            problem_id (int): ID of the problem being judged.
+            suite_hash (str): Hash of the problem's current test cases.
+            code_hash (str): Normalised hash of the submitted code.
+            mode (tuple): Judging options that affect the results.
+            source_hash (str): Exact hash of the submitted code, see
+                source_code_hash.
+
+        Returns:
+            tuple: (test_results, all_tests_passed), or None on a cache miss.
+        """
+        key = (problem_id, code_hash, mode)
+        with self.lock:
+            self._check_suite(problem_id, suite_hash)
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            test_results, all_tests_passed, entry_source_hash = entry
+            if entry_source_hash is not None and entry_source_hash != source_hash:
+                return None
+            self.entries.move_to_end(key)
+            return test_results, all_tests_passed
+
+    def set(self, problem_id, suite_hash, code_hash, test_results, all_tests_passed, mode=(),
+            source_hash=None):
+        """
+        Store the results of judging a submission.
+
+        Args:
+            problem_id (int): ID of the problem being judged.
+            suite_hash (str): Hash of the test cases the results were produced with.
+            code_hash (str): Normalised hash of the submitted code.
+            test_results (list): Per-test results in test case order.
+            all_tests_passed (bool): Whether every test passed.
+            mode (tuple): Judging options that affect the results.
+            source_hash (str): Exact hash of the code, if the results are
+                only valid for that source; None if they hold for any code
+                with the same normalised hash.
+        """
+        key = (problem_id, code_hash, mode)
+        with self.lock:
+            self._check_suite(problem_id, suite_hash)
+            self.entries[key] = (test_results, all_tests_passed, source_hash)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, problem_id):
+        """
+        Drop every cached verdict for a problem.
+
+        Args:
+            problem_id (int): ID of the problem whose entries should be removed.
+        """
+        with self.lock:
+            self._invalidate(problem_id)
+
+    def clear(self):
+        """Drop every cached verdict."""
+        with self.lock:
+            self.entries.clear()
+            self.suite_hashes.clear()
+
+verdict_cache = VerdictCache()
@@ -3,131 +3,221 @@ Code execution module for handling user code submissions and testing.
 
 This module provides functionality to:
 - Execute user code in a safe environment
-- Run test cases against submitted code
+- Run test cases against submitted code, comparing either printed output
+  or, for function-call problems, returned values
+- Stress test solutions against a problem's reference solution
+- Benchmark accepted solutions over repeated runs
 - Update user progress and gamification elements
 - Handle code submissions and testing endpoints
+- Stream per-test results to the client as Server-Sent Events
+- Queue submissions for background judging and report their progress
 """
 
-import io
-import sys
-import traceback
+import os
 import json
+import math
+import queue
 import threading
-from django.http import JsonResponse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import zip_longest
+from django.db import connection, transaction
+from django.db.models import F
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import login_required
 from django.utils import timezone
-from problems.models import Problem, UserProgress, Submission
+from problems.models import Problem, UserProgress, Submission, ProblemStats
 from gamification.models import LeaderboardEntry
 from accounts.models import Profile
+from .admission import AdmissionRejected, admission_controlled, check_queue_admission, rejected_response
+from .complexity import analyze_complexity
+from .models import JudgeJob
+from .sandbox import (
+    SANDBOX_POOL_SIZE,
+    STATUS_RUNTIME_ERROR,
+    FunctionCall,
+    InputBatch,
+    compile_user_code,
+    get_pool,
+    host_dependent,
+    host_dependent_flags
+)
+from .stress import StressTestError, stress_limits, stress_test
+from .test_suites import get_test_suite, iter_output_lines
+from .timing import (
+    BENCHMARK_MAX_RUNS,
+    BENCHMARK_MAX_SECONDS,
+    BENCHMARK_RUNS,
+    benchmark_solution,
+    runs_within_budget
+)
+from .verdict_cache import normalized_code_hash, source_code_hash, verdict_cache
 
 # Constants
-CODE_EXECUTION_TIMEOUT = 10  # seconds
-
-# Dictionary of allowed built-in functions for code execution
-SAFE_FUNCTIONS = {
-    "print": print,
-    "len": len,
-    "range": range,
-    "int": int,
-    "float": float,
-    "str": str,
-    "bool": bool,
-    "list": list,
-    "dict": dict,
-    "tuple": tuple,
-    "set": set,
-    "enumerate": enumerate,
-    "sum": sum,
-    "min": min,
-    "max": max,
-    "sorted": sorted,
-    "abs": abs,
-    "all": all,
-    "any": any,
-    "round": round,
-    "__builtins__": None,  # Restrict access to other builtins
-}
-
-def create_execution_environment(test_input=""):
-    """
-    Creates a safe execution environment with allowed functions and input handling.
+CPU_TIME_LIMIT = 5  # default seconds of CPU time per execution
+MEMORY_LIMIT_MB = 256  # default address space available to user code
+WALL_TIME_FACTOR = 2  # wall-clock timeout as a multiple of the CPU-time limit
+DEFAULT_LIMITS = {"cpu_time": CPU_TIME_LIMIT, "memory_mb": MEMORY_LIMIT_MB}
+MISMATCH_CONTEXT_CHARS = 100  # characters of each line shown for a mismatch
+RESULT_VALUE_CHARS = 10_000  # characters of an expected or actual output kept in a result
+FLOAT_TOLERANCE = 1e-9  # relative and absolute tolerance when comparing returned floats
+
+# Verdicts reported for each test case, on top of the sandbox statuses
+VERDICT_ACCEPTED = "accepted"
+VERDICT_WRONG_ANSWER = "wrong answer"
+VERDICT_COMPILATION_ERROR = "compilation error"
+VERDICT_SKIPPED = "skipped"
+
+# Name of the result added for a stress test against the reference solution
+STRESS_TEST_NAME = "stress test"
+
+# Profiling modes that can be requested, and the result keys they add
+PROFILE_OPTIONS = ("profile_lines", "profile_memory")
+PROFILE_RESULT_KEYS = ("line_profile", "memory_profile")
+
+def run_code_with_test(code, test_input="", options=None, limits=None):
+    """
+    Runs user code in a pooled sandbox worker with timeout protection.
+    
+    Workers that exceed the timeout are killed and replaced, so runaway code
+    never keeps running in the web process. Each execution also runs under
+    CPU-time and memory limits, with a wall-clock timeout of WALL_TIME_FACTOR
+    times the CPU-time limit.
     
     Args:
-        test_input (str): Comma-separated input values for testing.
+        code (str | bytes): Python source, or code from compile_user_code.
+        test_input (str, tuple, MappedInput or FunctionCall): Comma-separated,
+            pre-split or memory-mapped input values, or the entry function
+            call of a function-call problem.
+        options (dict): Optional execution modes passed to the sandbox.
+        limits (dict): cpu_time and memory_mb limits; defaults to
+            CPU_TIME_LIMIT and MEMORY_LIMIT_MB.
         
     Returns:
-        dict: Environment dictionary with safe functions and input handling.
+        dict: Execution result containing success status, output/error, the
+            execution status and measured resource usage.
     """
-    env = SAFE_FUNCTIONS.copy()
-    
-    if test_input:
-        input_values = [x.strip() for x in test_input.split(',')]
-        input_queue = iter(input_values)
-        
-        def custom_input(prompt=""):
-            try:
-                return next(input_queue)
-            except StopIteration:
-                return ""
-        
-        env["input"] = custom_input
-    
-    return env
+    if limits is None:
+        limits = DEFAULT_LIMITS
+    return get_pool().run(
+        code,
+        test_input,
+        timeout=limits["cpu_time"] * WALL_TIME_FACTOR,
+        limits=limits,
+        options=options
+    )
 
-def run_code_with_test(code, test_input=""):
+def run_code_batch(code, inputs, limits=None, stop_on_failure=False):
     """
-    Runs user code in a safe environment with timeout protection.
+    Runs user code on several inputs in a single sandbox job.
+    
+    Each input runs under the given limits, and the job's wall-clock
+    timeout covers all of them.
     
     Args:
-        code (str): Python code to execute.
-        test_input (str): Comma-separated input values for testing.
-        
+        code (bytes): Code from compile_user_code.
+        inputs (list): Test inputs as accepted by run_code_with_test.
+        limits (dict): cpu_time and memory_mb limits for each input.
+        stop_on_failure (bool): Whether to skip the remaining inputs once
+            one fails to run.
+    
     Returns:
-        dict: Execution result containing success status and output/error.
+        list: Execution result for each input that ran, or a single result
+            if the whole job timed out or crashed.
     """
-    output_buffer = io.StringIO()
-    sys.stdout = output_buffer
-    sys.stderr = output_buffer
+    if limits is None:
+        limits = DEFAULT_LIMITS
+    return get_pool().run(
+        code,
+        InputBatch(tuple(inputs), stop_on_failure),
+        timeout=limits["cpu_time"] * WALL_TIME_FACTOR * len(inputs),
+        limits=limits
+    )
+
+def find_first_mismatch(expected, actual):
+    """
+    Compare outputs line by line, stopping at the first difference.
     
-    result = None
+    Args:
+        expected (str or tuple): Expected output from test case, or its lines
+            already split by iter_output_lines.
+        actual (str): Actual output from code execution.
     
-    def target():
-        nonlocal result
-        try:
-            # Create safe execution environment
-            globals_dict = create_execution_environment(test_input)
-            
-            # Execute the code
-            exec(code, globals_dict)
-            
-            output = output_buffer.getvalue()
-            result = {"success": True, "output": output.strip()}
-        except Exception as e:
-            result = {"success": False, "error": traceback.format_exc()}
-        finally:
-            # Restore system streams
-            sys.stdout = sys.__stdout__
-            sys.stderr = sys.__stderr__
-            if test_input:
-                sys.stdin = sys.__stdin__
-    
-    # Run code in thread with timeout
-    thread = threading.Thread(target=target)
-    thread.daemon = True
-    thread.start()
-    thread.join(timeout=CODE_EXECUTION_TIMEOUT)
-    
-    if thread.is_alive():
+    Returns:
+        dict: line and column (both 1-based) of the first difference, with the
+            expected and actual lines truncated to MISMATCH_CONTEXT_CHARS
+            (None for a missing line), or None if the outputs match.
+    """
+    if isinstance(expected, str):
+        expected = iter_output_lines(expected)
+    expected_lines = iter(expected)
+    actual_lines = iter_output_lines(actual)
+    for line_number, (expected_line, actual_line) in enumerate(
+        zip_longest(expected_lines, actual_lines), start=1
+    ):
+        if expected_line == actual_line:
+            continue
+        column = 1
+        if expected_line is not None and actual_line is not None:
+            column = len(os.path.commonprefix([expected_line, actual_line])) + 1
         return {
-            "success": False,
-            "error": f"Code execution timed out after {CODE_EXECUTION_TIMEOUT} seconds"
+            "line": line_number,
+            "column": column,
+            "expected": None if expected_line is None else expected_line[:MISMATCH_CONTEXT_CHARS],
+            "actual": None if actual_line is None else actual_line[:MISMATCH_CONTEXT_CHARS],
         }
+    return None
+
+def _value_preview(value, limit=MISMATCH_CONTEXT_CHARS):
+    """JSON form of a value, truncated to limit characters."""
+    return json.dumps(value)[:limit]
+
+def find_value_mismatch(expected, actual, path=""):
+    """
+    Compare returned values structurally, stopping at the first difference.
     
-    return result if result is not None else {
-        "success": False,
-        "error": "Unknown error occurred"
-    }
+    Lists and dicts are compared item by item, floats within FLOAT_TOLERANCE
+    and bools only equal bools.
+    
+    Args:
+        expected: Expected return value from the test case.
+        actual: Value returned by the entry function, see plain_value.
+        path (str): Location of the values within the whole return value.
+    
+    Returns:
+        dict: path of the first difference (such as "[2]["key"]", or empty
+            for the whole value) with the expected and actual values there
+            as truncated JSON, or None if the values match.
+    """
+    if isinstance(expected, list) and isinstance(actual, list):
+        for index, (expected_item, actual_item) in enumerate(zip(expected, actual)):
+            mismatch = find_value_mismatch(expected_item, actual_item, f"{path}[{index}]")
+            if mismatch is not None:
+                return mismatch
+        same = len(expected) == len(actual)
+    elif isinstance(expected, dict) and isinstance(actual, dict):
+        if expected.keys() != actual.keys():
+            same = False
+        else:
+            for key in expected:
+                mismatch = find_value_mismatch(expected[key], actual[key], f"{path}[{json.dumps(key)}]")
+                if mismatch is not None:
+                    return mismatch
+            same = True
+    elif isinstance(expected, bool) or isinstance(actual, bool):
+        same = type(expected) is type(actual) and expected == actual
+    elif isinstance(expected, float) or isinstance(actual, float):
+        same = (
+            isinstance(expected, (int, float)) and isinstance(actual, (int, float))
+            and math.isclose(expected, actual, rel_tol=FLOAT_TOLERANCE, abs_tol=FLOAT_TOLERANCE)
+        )
+    else:
+        same = type(expected) is type(actual) and expected == actual
+
+    if same:
+        return None
+    return {"path": path, "expected": _value_preview(expected), "actual": _value_preview(actual)}
 
 def compare_outputs(expected, actual):
     """
@@ -140,9 +230,161 @@ def compare_outputs(expected, actual):
     Returns:
         bool: True if outputs match after normalisation.
     """
-    expected = expected.strip().replace('\r\n', '\n')
-    actual = actual.strip().replace('\r\n', '\n')
-    return expected == actual
+    return find_first_mismatch(expected, actual) is None
+
+def judge_test_case(compiled, case, limits=None):
+    """
+    Run compiled user code against a single test case and build its result.
+    
+    Args:
+        compiled (bytes): User code compiled by compile_user_code.
+        case (TestCase): Prepared test case from the problem's test suite.
+        limits (dict): Optional cpu_time and memory_mb limits.
+    
+    Returns:
+        dict: Result for the test case, including whether it passed, its
+            verdict, the first mismatch for wrong answers and the measured
+            cpu_time, wall_time and peak_memory_kb.
+    
+    Notes:
+        - Output is capped at output_limit(expected), so runaway printing is
+          stopped early with an "output limit exceeded" verdict
+        - For function-call problems the entry function's return value is
+          compared instead, and shown as JSON in actual_output
+        - expected_output and actual_output are truncated to
+          RESULT_VALUE_CHARS; the mismatch locates the first difference
+    """
+    limits = dict(limits or DEFAULT_LIMITS, output_chars=case.output_chars)
+    result = run_code_with_test(compiled, case.input_values, limits=limits)
+    metrics = {
+        "cpu_time": result.get("cpu_time"),
+        "wall_time": result.get("wall_time"),
+        "peak_memory_kb": result.get("peak_memory_kb"),
+    }
+
+    if result["success"]:
+        if isinstance(case.input_values, FunctionCall):
+            actual_output = _value_preview(result["return_value"], RESULT_VALUE_CHARS)
+            mismatch = find_value_mismatch(case.expected_value, result["return_value"])
+        else:
+            actual_output = result["output"][:RESULT_VALUE_CHARS]
+            mismatch = find_first_mismatch(case.expected_lines, result["output"])
+        test_result = {
+            "test_name": case.name,
+            "passed": mismatch is None,
+            "verdict": VERDICT_ACCEPTED if mismatch is None else VERDICT_WRONG_ANSWER,
+            "expected_output": case.expected_output[:RESULT_VALUE_CHARS],
+            "actual_output": actual_output,
+            **metrics
+        }
+        if mismatch is not None:
+            test_result["mismatch"] = mismatch
+        return test_result
+    test_result = {
+        "test_name": case.name,
+        "passed": False,
+        "verdict": result.get("status", STATUS_RUNTIME_ERROR),
+        "error": result["error"],
+        **metrics
+    }
+    # Sandbox failures depend on host load rather than on the code itself
+    test_result.update(host_dependent_flags(result))
+    return test_result
+
+def iter_test_results(compiled, cases, parallel=False, fail_fast=False, limits=None, order=None):
+    """
+    Run compiled user code against test cases, yielding results as they finish.
+    
+    In parallel mode every test case is dispatched to the sandbox pool at once,
+    so tests run concurrently across worker processes and results arrive in
+    completion order. In fail-fast mode judging stops at the first test that
+    fails, and tests that have not started are never run. Tests are started
+    in the given order, so putting likely failures first ends fail-fast
+    judging sooner.
+    
+    Args:
+        compiled (bytes): User code compiled by compile_user_code.
+        cases (tuple): TestCase for each test, from the problem's test suite.
+        parallel (bool): Whether to run the test cases concurrently.
+        fail_fast (bool): Whether to stop at the first failing test.
+        limits (dict): Optional cpu_time and memory_mb limits for each test.
+        order (tuple): Optional indices of cases in the order to run them.
+    
+    Yields:
+        tuple: (index, result) where index is the test's position in cases.
+    """
+    if order is None:
+        order = range(len(cases))
+
+    if not parallel or len(cases) < 2:
+        for index in order:
+            result = judge_test_case(compiled, cases[index], limits)
+            yield index, result
+            if fail_fast and not result["passed"]:
+                return
+        return
+
+    executor = ThreadPoolExecutor(max_workers=min(len(cases), SANDBOX_POOL_SIZE))
+    try:
+        futures = {
+            executor.submit(judge_test_case, compiled, cases[index], limits): index
+            for index in order
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            yield futures[future], result
+            if fail_fast and not result["passed"]:
+                return
+    finally:
+        # Don't wait for tests that are still running once we stop early
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def skipped_test_result(test_name):
+    """
+    Build the result reported for a test case that was not run.
+    
+    Args:
+        test_name (str): Name of the skipped test case.
+    
+    Returns:
+        dict: Result marking the test as skipped.
+    """
+    return {
+        "test_name": test_name,
+        "passed": False,
+        "verdict": VERDICT_SKIPPED,
+        "skipped": True
+    }
+
+def run_test_cases(compiled, cases, parallel=False, fail_fast=False, on_result=None,
+                   limits=None, order=None):
+    """
+    Run compiled user code against every test case of a problem.
+    
+    Args:
+        compiled (bytes): User code compiled by compile_user_code.
+        cases (tuple): TestCase for each test, from the problem's test suite.
+        parallel (bool): Whether to run the test cases concurrently.
+        fail_fast (bool): Whether to stop at the first failing test.
+        on_result (callable): Optional callback called with (index, result) as
+            each test finishes.
+        limits (dict): Optional cpu_time and memory_mb limits for each test.
+        order (tuple): Optional indices of cases in the order to run them;
+            results are still returned in test case order.
+    
+    Returns:
+        tuple: (test_results, all_tests_passed) where test_results is a list of
+            per-test result dictionaries in test case order. Tests that were not
+            run because of fail-fast are reported as skipped.
+    """
+    test_results = [skipped_test_result(case.name) for case in cases]
+    for index, result in iter_test_results(compiled, cases, parallel, fail_fast, limits, order):
+        test_results[index] = result
+        if on_result is not None:
+            on_result(index, result)
+
+    all_tests_passed = all(result["passed"] for result in test_results)
+    return test_results, all_tests_passed
 
 def update_leaderboard(user, problem, was_completed_before):
     """
@@ -162,8 +404,10 @@ def update_leaderboard(user, problem, was_completed_before):
     )
     
     if not created and not was_completed_before:
-        leaderboard_entry.total_solved += 1
+        # Increment in the database so concurrent submissions aren't lost
+        leaderboard_entry.total_solved = F('total_solved') + 1
         leaderboard_entry.save()
+        leaderboard_entry.refresh_from_db()
     
     return leaderboard_entry
 
@@ -178,7 +422,8 @@ def update_user_progress(user, problem, time_spent, all_tests_passed):
         all_tests_passed (bool): Whether all test cases passed.
     
     Returns:
-        UserProgress: Updated or created progress entry.
+        tuple: (user_progress, newly_completed) where newly_completed tells
+            whether this submission is the one that completed the problem.
     """
     user_progress, created = UserProgress.objects.get_or_create(
         user=user,
@@ -190,17 +435,103 @@ def update_user_progress(user, problem, time_spent, all_tests_passed):
         }
     )
 
-    user_progress.attempts += 1
+    # Update only the changed columns in the database, so concurrent
+    # submissions neither lose attempts nor undo each other's solves
+    changes = {'attempts': F('attempts') + 1}
     if time_spent > 0:
-        user_progress.time_spent = time_spent
+        changes['time_spent'] = time_spent
+    newly_completed = False
     if all_tests_passed:
-        user_progress.is_completed = True
-        user_progress.last_submitted = timezone.now()
-    user_progress.save()
+        changes['last_submitted'] = timezone.now()
+        # Only one of several concurrent solves can flip the flag
+        newly_completed = UserProgress.objects.filter(
+            pk=user_progress.pk, is_completed=False
+        ).update(is_completed=True) == 1
+    UserProgress.objects.filter(pk=user_progress.pk).update(**changes)
+    user_progress.refresh_from_db()
+    
+    return user_progress, newly_completed
+
+def build_telemetry(test_results):
+    """
+    Build the compact per-test resource usage stored on a submission.
+    
+    Args:
+        test_results (list): Per-test results in test case order.
+    
+    Returns:
+        dict: Parallel lists of cpu_ms, wall_ms and peak_kb, with None for
+            tests that did not report a measurement.
+    """
+    def to_ms(seconds):
+        return None if seconds is None else round(seconds * 1000, 1)
+
+    return {
+        "cpu_ms": [to_ms(result.get("cpu_time")) for result in test_results],
+        "wall_ms": [to_ms(result.get("wall_time")) for result in test_results],
+        "peak_kb": [result.get("peak_memory_kb") for result in test_results],
+    }
+
+def total_cpu_ms(telemetry):
+    """
+    Total CPU time of a submission across all of its tests.
+    
+    Args:
+        telemetry (dict): Per-test resource usage from build_telemetry.
+    
+    Returns:
+        float: CPU time in milliseconds.
+    """
+    return sum(cpu_ms or 0 for cpu_ms in telemetry["cpu_ms"])
+
+def record_accepted_runtime(problem, runtime_ms):
+    """
+    Add an accepted submission's runtime to the problem's runtime histogram.
+    
+    Args:
+        problem: Problem object that was solved.
+        runtime_ms (float): Total CPU time across all tests in milliseconds.
+    
+    Returns:
+        float: Percentage of previously accepted solutions that were slower,
+            or None if this is the first one.
+    """
+    with transaction.atomic():
+        ProblemStats.objects.get_or_create(problem=problem)
+        stats = ProblemStats.objects.select_for_update().get(problem=problem)
+        faster_than = stats.faster_than(runtime_ms)
+        stats.add_runtime(runtime_ms)
+        stats.save()
+    return faster_than
+
+def record_test_failures(problem, test_results):
+    """
+    Count the failed tests of a judged submission in the problem's stats.
+    
+    Skipped tests, sandbox failures, which depend on host load rather
+    than on the code, and the stress test, which is not one of the
+    problem's tests, are not counted.
     
-    return user_progress
+    Args:
+        problem: Problem object that was attempted.
+        test_results (list): Per-test results of the submission.
+    """
+    failed = [
+        result["test_name"] for result in test_results
+        if not result["passed"]
+        and not result.get("skipped")
+        and not host_dependent(result)
+        and result["test_name"] != STRESS_TEST_NAME
+    ]
+    if not failed:
+        return
+    with transaction.atomic():
+        ProblemStats.objects.get_or_create(problem=problem)
+        stats = ProblemStats.objects.select_for_update().get(problem=problem)
+        stats.add_failures(failed)
+        stats.save(update_fields=['test_failure_counts'])
 
-def create_submission(user, problem, user_code, all_tests_passed):
+def create_submission(user, problem, user_code, all_tests_passed, telemetry=None):
     """
     Create a submission record for a user's code attempt.
     
@@ -209,6 +540,7 @@ def create_submission(user, problem, user_code, all_tests_passed):
         problem: Problem object that was attempted.
         user_code (str): The code submitted by the user.
         all_tests_passed (bool): Whether all test cases passed.
+        telemetry (dict): Per-test resource usage from build_telemetry.
     
     Returns:
         Submission: Created submission record.
@@ -219,9 +551,29 @@ def create_submission(user, problem, user_code, all_tests_passed):
         code_submitted=user_code,
         status='completed' if all_tests_passed else 'attempted',
         language=problem.language,
-        created_at=timezone.now()
+        created_at=timezone.now(),
+        telemetry=telemetry
     )
 
+def find_duplicate_submission(user, problem, user_code, all_tests_passed):
+    """
+    Find the user's latest submission if it is identical to this one.
+    
+    Args:
+        user: User object for the current user.
+        problem: Problem object that was attempted.
+        user_code (str): The code submitted by the user.
+        all_tests_passed (bool): Whether all test cases passed.
+    
+    Returns:
+        Submission: The latest submission if it has the same code and status, else None.
+    """
+    latest = Submission.objects.filter(user=user, problem=problem).order_by('-created_at').first()
+    status = 'completed' if all_tests_passed else 'attempted'
+    if latest and latest.code_submitted == user_code and latest.status == status:
+        return latest
+    return None
+
 def update_streak(user):
     """
     Update the user's problem-solving streak.
@@ -248,19 +600,343 @@ def update_streak(user):
     profile.last_solved_date = today
     profile.save()
 
+def profile_options(data):
+    """
+    Get the profiling modes requested in a request body.
+    
+    Args:
+        data (dict): Decoded request body or queued job options.
+    
+    Returns:
+        dict: Sandbox options for the requested modes, empty if none were requested.
+    """
+    return {option: True for option in PROFILE_OPTIONS if data.get(option)}
+
+def benchmark_runs(data):
+    """
+    Get the number of benchmark runs requested in a request body.
+    
+    Args:
+        data (dict): Decoded request body or queued job options, where
+            "benchmark" is true for BENCHMARK_RUNS runs or a number of runs.
+    
+    Returns:
+        int: Measured runs, at most BENCHMARK_MAX_RUNS, or 0 if no benchmark
+            was requested.
+    """
+    runs = data.get("benchmark")
+    if runs is True:
+        return BENCHMARK_RUNS
+    if isinstance(runs, bool) or not isinstance(runs, int) or runs < 1:
+        return 0
+    return min(runs, BENCHMARK_MAX_RUNS)
+
+def profile_test_cases(compiled, cases, test_results, options, limits=None):
+    """
+    Re-run tests with profiling enabled and attach the profiles to their results.
+    
+    Profiling runs separately from judging, so its overhead never affects
+    verdicts, recorded runtimes or cached results.
+    
+    Args:
+        compiled (bytes): User code compiled by compile_user_code.
+        cases (tuple): TestCase for each test, from the problem's test suite.
+        test_results (list): Per-test results of judging, in test case order.
+        options (dict): Profiling modes, see profile_options.
+        limits (dict): Optional cpu_time and memory_mb limits for each test.
+    
+    Returns:
+        list: Copies of the results, with the profiles of every test that ran.
+    """
+    profiled = []
+    for case, result in zip(cases, test_results):
+        result = dict(result)
+        if not result.get("skipped"):
+            run = run_code_with_test(
+                compiled,
+                case.input_values,
+                options,
+                dict(limits or DEFAULT_LIMITS, output_chars=case.output_chars)
+            )
+            for key in PROFILE_RESULT_KEYS:
+                if key in run:
+                    result[key] = run[key]
+        profiled.append(result)
+    return profiled
+
+def stress_test_result(compiled, suite):
+    """
+    Stress test compiled code against the problem's reference solution.
+    
+    Args:
+        compiled (bytes): User code compiled by compile_user_code.
+        suite (TestSuite): The problem's test suite.
+    
+    Returns:
+        dict: Test result named STRESS_TEST_NAME; a failure reports the
+            smallest failing input found, with its n, and the expected and
+            actual output (truncated to RESULT_VALUE_CHARS) or the error.
+    """
+    limits = stress_limits(suite.limits)
+    entry_function = suite.entry_function
+    find_mismatch = find_value_mismatch if entry_function else find_first_mismatch
+    try:
+        report = stress_test(
+            compiled,
+            suite.problem,
+            lambda code, inputs: run_code_batch(code, inputs, limits, stop_on_failure=True),
+            find_mismatch,
+            limits
+        )
+    except StressTestError as e:
+        return {
+            "test_name": STRESS_TEST_NAME,
+            "passed": False,
+            "verdict": STATUS_RUNTIME_ERROR,
+            "error": f"Stress test could not run: {e}"
+        }
+
+    failure = report["failure"]
+    test_result = {
+        "test_name": STRESS_TEST_NAME,
+        "passed": failure is None,
+        "verdict": VERDICT_ACCEPTED,
+        "stress_runs": report["runs"]
+    }
+    if failure is None:
+        return test_result
+
+    result = failure["result"]
+    expected = failure["expected"]
+    test_result.update({
+        "input": failure["input"],
+        "n": failure["n"],
+        "expected_output": (
+            _value_preview(expected, RESULT_VALUE_CHARS) if entry_function else expected[:RESULT_VALUE_CHARS]
+        ),
+    })
+    if result["success"]:
+        actual = result["return_value"] if entry_function else result["output"]
+        test_result.update({
+            "verdict": VERDICT_WRONG_ANSWER,
+            "actual_output": (
+                _value_preview(actual, RESULT_VALUE_CHARS) if entry_function else actual[:RESULT_VALUE_CHARS]
+            ),
+            "mismatch": failure["mismatch"]
+        })
+    else:
+        test_result.update({
+            "verdict": result.get("status", STATUS_RUNTIME_ERROR),
+            "error": result["error"]
+        })
+        test_result.update(host_dependent_flags(result))
+    return test_result
+
+def has_traceback(test_result):
+    """Whether a test result quotes a traceback, whose line numbers depend on the exact source."""
+    return "Traceback" in (test_result.get("error") or "")
+
+def judge_code(suite, user_code, parallel=False, fail_fast=False, on_result=None, stress=False):
+    """
+    Judge code against a test suite without recording anything.
+    
+    Identical code judged in the same mode reuses the cached verdict of the
+    last judging run. Verdicts quoting tracebacks are only reused for the
+    exact same source, since their line numbers depend on it. In fail-fast mode the tests that fail most often run
+    first.
+    
+    Args:
+        suite (TestSuite): The problem's test suite.
+        user_code (str): The code to judge.
+        parallel (bool): Whether to run the test cases concurrently.
+        fail_fast (bool): Whether to stop at the first failing test.
+        on_result (callable): Optional callback called with (index, result) as
+            each test finishes.
+        stress (bool): Whether code that passes every test is also stress
+            tested against the reference solution, adding a result named
+            STRESS_TEST_NAME after the tests.
+    
+    Returns:
+        tuple: (test_results, all_tests_passed, cached, compiled) where cached
+            tells whether the verdict came from the cache and compiled is the
+            compiled code, or None if it was not compiled.
+    """
+    problem_id = suite.problem.id
+    limits = suite.limits
+    code_hash = normalized_code_hash(user_code)
+    source_hash = source_code_hash(user_code)
+    mode = (bool(fail_fast), limits["cpu_time"], limits["memory_mb"], bool(stress))
+    cached = verdict_cache.get(problem_id, suite.content_hash, code_hash, mode, source_hash)
+    if cached is not None:
+        test_results, all_tests_passed = cached
+        return test_results, all_tests_passed, True, None
+
+    # Compile once; a syntax error fails every test without running any
+    compiled, compile_error = compile_user_code(user_code)
+    if compiled is None:
+        all_tests_passed = False
+        test_results = [{
+            "test_name": test_name,
+            "passed": False,
+            "verdict": VERDICT_COMPILATION_ERROR,
+            "error": compile_error
+        } for test_name in suite.test_names]
+    else:
+        # Run likely failures first so fail-fast judging ends sooner
+        order = suite.failure_order if fail_fast else None
+        test_results, all_tests_passed = run_test_cases(
+            compiled, suite.cases, parallel, fail_fast, on_result, limits, order
+        )
+        if stress and all_tests_passed:
+            stress_result = stress_test_result(compiled, suite)
+            test_results = test_results + [stress_result]
+            all_tests_passed = stress_result["passed"]
+
+    if not any(host_dependent(result) for result in test_results):
+        verdict_cache.set(
+            problem_id, suite.content_hash, code_hash, test_results, all_tests_passed, mode,
+            source_hash if any(has_traceback(result) for result in test_results) else None
+        )
+    return test_results, all_tests_passed, False, compiled
+
+def judge_submission(user, problem, user_code, time_spent=0, parallel=False, fail_fast=None,
+                     on_result=None, analyze=False, profile=None, stress=False, benchmark=0):
+    """
+    Judge a submission against a problem's test cases and record the attempt.
+    
+    Test cases come from the problem's cached test suite, and identical
+    resubmissions reuse the cached verdict of the last judging run. In
+    fail-fast mode the tests that fail most often run first. Updates user
+    progress, leaderboard, streaks and the problem's runtime histogram on
+    successful test completion.
+    
+    Args:
+        user: User object for the submitting user.
+        problem: Problem object being attempted.
+        user_code (str): The code submitted by the user.
+        time_spent (int): Time spent on the problem in seconds.
+        parallel (bool): Whether to run the test cases concurrently.
+        fail_fast (bool): Whether to stop at the first failing test; None uses
+            the problem's own setting.
+        on_result (callable): Optional callback called with (index, result) as
+            each test finishes.
+        analyze (bool): Whether to estimate the complexity of an accepted
+            solution using the problem's input generator.
+        profile (dict): Optional profiling modes, see profile_options; the
+            profiles are attached to each test result that ran.
+        stress (bool): Whether to stress test code that passes every test
+            against the reference solution, if the problem has a reference
+            solution and an input generator.
+        benchmark (int): Number of measured runs to benchmark an accepted
+            solution with, see benchmark_solution; 0 for none. Runs are cut
+            so the benchmark stays within BENCHMARK_MAX_SECONDS of CPU time,
+            based on the solution's total CPU time when judged.
+    
+    Returns:
+        dict: all_tests_passed, test_results, submission_id, cached and
+            runtime_percentile (the share of accepted solutions this one is
+            faster than), plus complexity when analysis was requested and
+            benchmark when a benchmark was requested.
+    """
+    suite = get_test_suite(problem.id)
+    if fail_fast is None:
+        fail_fast = suite.fail_fast
+    stress = bool(stress) and suite.stress_ready
+    limits = suite.limits
+
+    test_results, all_tests_passed, cached, compiled = judge_code(
+        suite, user_code, parallel, fail_fast, on_result, stress
+    )
+    if not cached and compiled is not None:
+        record_test_failures(problem, test_results)
+
+    # Pressing submit again with the same code doesn't record a new attempt
+    submission = None
+    runtime_percentile = None
+    if cached:
+        submission = find_duplicate_submission(user, problem, user_code, all_tests_passed)
+
+    if submission is None:
+        # Create submission and update progress
+        telemetry = build_telemetry(test_results)
+        submission = create_submission(user, problem, user_code, all_tests_passed, telemetry)
+        _, newly_completed = update_user_progress(user, problem, time_spent, all_tests_passed)
+
+        # Update gamification elements and runtime stats if all tests passed
+        if all_tests_passed:
+            update_leaderboard(user, problem, not newly_completed)
+            update_streak(user)
+            runtime_percentile = record_accepted_runtime(problem, total_cpu_ms(telemetry))
+    elif all_tests_passed and submission.telemetry:
+        stats = ProblemStats.objects.filter(problem=problem).first()
+        if stats is not None:
+            runtime_percentile = stats.faster_than(total_cpu_ms(submission.telemetry))
+
+    response = {
+        "all_tests_passed": all_tests_passed,
+        "test_results": test_results,
+        "submission_id": submission.id,
+        "cached": cached,
+        "runtime_percentile": runtime_percentile
+    }
+
+    run_analysis = bool(analyze and all_tests_passed and problem.input_generator)
+    run_benchmark = bool(benchmark and all_tests_passed)
+    if compiled is None and (run_analysis or profile or run_benchmark):
+        compiled, _ = compile_user_code(user_code)
+
+    if profile and compiled is not None:
+        response["test_results"] = profile_test_cases(compiled, suite.cases, test_results, profile, limits)
+
+    if run_analysis:
+        response["complexity"] = analyze_complexity(
+            compiled,
+            problem.input_generator,
+            lambda code, test_input, options=None: run_code_with_test(code, test_input, options, limits),
+            suite.entry_function
+        )
+
+    if run_benchmark:
+        runs = runs_within_budget(benchmark, total_cpu_ms(build_telemetry(test_results)) / 1000)
+        if runs:
+            response["benchmark"] = benchmark_solution(
+                compiled,
+                [case.input_values for case in suite.cases],
+                lambda code, inputs: run_code_batch(code, inputs, limits),
+                runs=runs
+            )
+        else:
+            response["benchmark"] = {
+                "runs": 0,
+                "error": f"Solution is too slow to benchmark within {BENCHMARK_MAX_SECONDS} CPU seconds"
+            }
+
+    return response
+
 @csrf_exempt
+@admission_controlled
 def execute_code(request):
     """
     View function to handle code execution requests.
     
     Handles both simple code execution and test case validation.
-    Updates user progress, leaderboard, and streaks on successful test completion.
+    Test cases run concurrently across sandbox workers when "parallel" is set,
+    and judging stops at the first failure when "fail_fast" is set (defaulting
+    to the problem's own fail_fast setting). Accepted solutions are analysed for
+    their complexity when "analyze_complexity" is set. Solutions that pass every
+    test are stress tested against the problem's reference solution when
+    "stress" is set. Accepted solutions are also benchmarked over repeated runs,
+    as many as fit a CPU-time budget, when "benchmark" is true or a number of
+    runs. "profile_lines" adds a per-line heatmap of hits and time, and "profile_memory" the peak traced
+    memory and top allocation lines, to the output or to each test result.
+    See judge_submission.
     
     Args:
         request: HTTP request object containing code and test parameters.
     
     Returns:
         JsonResponse: Execution results or error message.
+            Requests over the admission limits get HTTP 429 with Retry-After.
     """
     if request.method != "POST":
         return JsonResponse({"error": "Invalid request method"}, status=400)
@@ -270,6 +946,12 @@ def execute_code(request):
         user_code = data.get("code", "").strip()
         problem_id = data.get("problem_id")
         run_tests = data.get("run_tests", False)
+        parallel = data.get("parallel", False)
+        fail_fast = data.get("fail_fast")
+        analyze = data.get("analyze_complexity", False)
+        profile = profile_options(data)
+        stress = data.get("stress", False)
+        benchmark = benchmark_runs(data)
         time_spent = data.get("time_spent", 0)
 
         if not user_code:
@@ -281,74 +963,247 @@ def execute_code(request):
                 return JsonResponse({
                     "error": "input() is not supported when running code directly. Here's how to test your code:\n\n1. DO NOT modify any code above the '# Write your code here' line\n2. To test locally, you can comment out the input() line by adding a # at the start of the line\n   - You can quickly comment/uncomment using Ctrl+/ (Windows/Linux) or Cmd+/ (Mac)\n3. Replace input() with hardcoded values, for example:\n   - Instead of: a = int(input())\n   - Use: a = 3  # Replace 3 with your test value\n\nRemember to remove the comments and restore input() before submitting your final solution!"
                 })
-            result = run_code_with_test(user_code)
+            compiled, compile_error = compile_user_code(user_code)
+            if compiled is None:
+                result = {"success": False, "error": compile_error}
+            else:
+                result = run_code_with_test(compiled, options=profile or None)
+            profiles = {key: result[key] for key in PROFILE_RESULT_KEYS if key in result}
             if result["success"]:
-                return JsonResponse({"output": result["output"]})
+                return JsonResponse({"output": result["output"], **profiles})
             return JsonResponse({
                 "error": result["error"],
                 "test_results": [{
                     "test_name": "Code Execution",
                     "passed": False,
                     "error": result["error"]
-                }]
+                }],
+                **profiles
             })
 
-        # Get problem and test cases
+        # Get problem from its cached test suite
         try:
-            problem = Problem.objects.get(id=problem_id)
-            test_cases = problem.test_cases
+            problem = get_test_suite(problem_id).problem
         except Problem.DoesNotExist:
             return JsonResponse({"error": "Problem not found"}, status=404)
         except Exception as e:
             return JsonResponse({"error": str(e)}, status=500)
 
-        # Run test cases
-        test_results = []
-        all_tests_passed = True
+        return JsonResponse(judge_submission(
+            request.user, problem, user_code, time_spent, parallel, fail_fast,
+            analyze=analyze, profile=profile, stress=stress, benchmark=benchmark
+        ))
 
-        for test_name, test_data in test_cases.items():
-            result = run_code_with_test(user_code, test_data.get("input", ""))
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
 
-            if result["success"]:
-                passed = compare_outputs(test_data.get("output", ""), result["output"])
-                if not passed:
-                    all_tests_passed = False
-                
-                test_results.append({
-                    "test_name": test_name,
-                    "passed": passed,
-                    "expected_output": test_data.get("output", ""),
-                    "actual_output": result["output"]
-                })
-            else:
-                all_tests_passed = False
-                test_results.append({
-                    "test_name": test_name,
-                    "passed": False,
-                    "error": result["error"]
-                })
+def format_sse_event(event, data):
+    """
+    Format a Server-Sent Events message.
+    
+    Args:
+        event (str): Event name.
+        data (dict): JSON-serialisable payload.
+    
+    Returns:
+        str: The encoded event, terminated by a blank line.
+    """
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
-        # Check if problem was previously completed
-        was_completed_before = UserProgress.objects.filter(
-            user=request.user,
-            problem=problem,
-            is_completed=True
-        ).exists()
+def stream_judge_events(user, problem, user_code, time_spent, parallel, fail_fast, stress=False):
+    """
+    Judge a submission in a background thread, yielding SSE events as tests finish.
+    
+    Sends one "test" event per test case and a final "summary" event. Results
+    that never arrive as live events (cached verdicts, skipped tests, the
+    stress test) are sent just before the summary.
+    
+    Args:
+        user: User object for the submitting user.
+        problem: Problem object being attempted.
+        user_code (str): The code submitted by the user.
+        time_spent (int): Time spent on the problem in seconds.
+        parallel (bool): Whether to run the test cases concurrently.
+        fail_fast (bool): Whether to stop at the first failing test.
+        stress (bool): Whether to stress test the solution, see judge_submission.
+    
+    Yields:
+        str: Encoded Server-Sent Events.
+    """
+    events = queue.Queue()
 
-        # Create submission and update progress
-        submission = create_submission(request.user, problem, user_code, all_tests_passed)
-        update_user_progress(request.user, problem, time_spent, all_tests_passed)
+    def on_result(index, result):
+        events.put(("test", index, result))
 
-        # Update gamification elements if all tests passed
-        if all_tests_passed:
-            update_leaderboard(request.user, problem, was_completed_before)
-            update_streak(request.user)
+    def judge():
+        try:
+            events.put(("summary", None, judge_submission(
+                user, problem, user_code, time_spent, parallel, fail_fast, on_result,
+                stress=stress
+            )))
+        except Exception as e:
+            events.put(("error", None, {"error": str(e)}))
+        finally:
+            connection.close()
 
-        return JsonResponse({
-            "all_tests_passed": all_tests_passed,
-            "test_results": test_results,
-            "submission_id": submission.id
-        })
+    threading.Thread(target=judge, daemon=True).start()
+
+    sent = set()
+    while True:
+        event, index, payload = events.get()
+        if event == "test":
+            sent.add(index)
+            yield format_sse_event("test", {"index": index, **payload})
+            continue
+        if event == "summary":
+            for index, result in enumerate(payload["test_results"]):
+                if index not in sent:
+                    yield format_sse_event("test", {"index": index, **result})
+        yield format_sse_event(event, payload)
+        return
+
+@csrf_exempt
+@admission_controlled
+def execute_code_stream(request):
+    """
+    View function to judge a submission and stream per-test results as Server-Sent Events.
+    
+    Takes the same parameters as a test run of execute_code. Each finished test
+    is sent as a "test" event carrying its index and result, followed by a
+    "summary" event with all_tests_passed, test_results, submission_id and cached.
+    
+    Args:
+        request: HTTP request object containing code, problem_id and judging options.
+    
+    Returns:
+        StreamingHttpResponse: text/event-stream response, or a JsonResponse error.
+            Requests over the admission limits get HTTP 429 with Retry-After.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "Invalid request method"}, status=400)
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "User not authenticated"}, status=401)
+
+    try:
+        data = json.loads(request.body)
+        user_code = data.get("code", "").strip()
+        if not user_code:
+            return JsonResponse({"error": "No code provided"}, status=400)
 
+        try:
+            problem = get_test_suite(data.get("problem_id")).problem
+        except Problem.DoesNotExist:
+            return JsonResponse({"error": "Problem not found"}, status=404)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
+
+    response = StreamingHttpResponse(
+        stream_judge_events(
+            request.user,
+            problem,
+            user_code,
+            data.get("time_spent", 0),
+            data.get("parallel", False),
+            data.get("fail_fast"),
+            data.get("stress", False)
+        ),
+        content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+@csrf_exempt
+@admission_controlled
+def submit_code(request):
+    """
+    View function to queue a submission for background judging.
+    
+    Returns as soon as the job is stored; a judge worker picks it up and its
+    progress can be polled with get_job_status.
+    
+    Args:
+        request: HTTP request object containing code, problem_id and judging options.
+    
+    Returns:
+        JsonResponse: The job ID and its initial status, or an error message.
+            Requests over the admission limits get HTTP 429 with Retry-After.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "Invalid request method"}, status=400)
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "User not authenticated"}, status=401)
+
+    try:
+        data = json.loads(request.body)
+        user_code = data.get("code", "").strip()
+        problem_id = data.get("problem_id")
+
+        if not user_code:
+            return JsonResponse({"error": "No code provided"}, status=400)
+
+        try:
+            problem = Problem.objects.get(id=problem_id)
+        except Problem.DoesNotExist:
+            return JsonResponse({"error": "Problem not found"}, status=404)
+
+        try:
+            check_queue_admission(request.user)
+        except AdmissionRejected as rejection:
+            return rejected_response(rejection)
+
+        job = JudgeJob.objects.create(
+            user=request.user,
+            problem=problem,
+            code=user_code,
+            options={
+                "time_spent": data.get("time_spent", 0),
+                "parallel": data.get("parallel", False),
+                "fail_fast": data.get("fail_fast"),
+                "analyze_complexity": data.get("analyze_complexity", False),
+                "stress": data.get("stress", False),
+                "benchmark": benchmark_runs(data),
+                **profile_options(data),
+            }
+        )
+
+        return JsonResponse({"job_id": job.id, "status": job.status}, status=202)
+
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+@require_http_methods(["GET"])
+def get_job_status(request, job_id):
+    """
+    View function to poll the progress of a queued submission.
+    
+    Args:
+        request: HTTP request object for the user who queued the job.
+        job_id (int): ID of the job returned by submit_code.
+    
+    Returns:
+        JsonResponse: A JSON response containing:
+            - job_id (int): Job ID
+            - status (str): 'queued', 'running', 'finished' or 'failed'
+            - test_results (list): Results so far; tests not yet run are marked pending
+            - all_tests_passed, submission_id, cached: Once the job has finished
+            - error (str): If judging failed
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "User not authenticated"}, status=401)
+
+    try:
+        job = JudgeJob.objects.get(id=job_id, user=request.user)
+    except JudgeJob.DoesNotExist:
+        return JsonResponse({"error": "Job not found"}, status=404)
+
+    response = {
+        "job_id": job.id,
+        "status": job.status,
+        "test_results": job.test_results,
+    }
+    if job.result:
+        response.update(job.result)
+    return JsonResponse(response)
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.4 on 2026-10-16 22:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def remove_duplicate_entries(apps, schema_editor):
+    """Keeps the highest of a user's leaderboard entries duplicated by concurrent submissions."""
+    LeaderboardEntry = apps.get_model('gamification', 'LeaderboardEntry')
+    seen = set()
+    for entry in LeaderboardEntry.objects.order_by('user_id', '-total_solved', 'id'):
+        if entry.user_id in seen:
+            entry.delete()
+        else:
+            seen.add(entry.user_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gamification', '0004_remove_leaderboardentry_high_score'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_entries, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='leaderboardentry',
+            constraint=models.UniqueConstraint(fields=('user',), name='unique_user_leaderboard_entry'),
+        ),
+    ]
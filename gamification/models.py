@@ -14,3 +14,6 @@ class LeaderboardEntry(models.Model):
 
     class Meta:
         verbose_name_plural = "Leaderboard entries"
+        constraints = [
+            models.UniqueConstraint(fields=['user'], name='unique_user_leaderboard_entry')
+        ]
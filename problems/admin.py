@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Problem, UserProgress, Submission
+from .models import Problem, UserProgress, Submission, ProblemStats
 
 @admin.register(Problem)
 class ProblemAdmin(admin.ModelAdmin):
@@ -17,7 +17,24 @@ class ProblemAdmin(admin.ModelAdmin):
         }),
         ('Test Cases', {
             'fields': ('test_cases',),
-            'description': 'Enter test cases as JSON. Example: {"test1": {"input": "", "output": "Hello, World!"}}'
+            'description': 'Enter test cases as JSON. Example: {"test1": {"input": "", "output": "Hello, World!"}}. '
+                           'Problems with an entry function take arguments and an expected return value instead, '
+                           'for example {"test1": {"args": [[3, 1, 2]], "expected": [1, 2, 3]}}. '
+                           'Large inputs can be generated with the input generator, as in {"generate": {"n": 1000000, "seed": 1}}, '
+                           'or read from files in the test data directory with "input_file" and "output_file".'
+        }),
+        ('Judging', {
+            'fields': ('entry_function', 'fail_fast', 'time_limit', 'memory_limit'),
+            'description': 'With an entry function, solutions define that function and are judged on what it '
+                           'returns for each test\'s arguments rather than on what they print. '
+                           'Fail fast stops judging at the first failing test and reports the rest as skipped. '
+                           'The time limit is in CPU seconds and the memory limit in MB, both per test.'
+        }),
+        ('Analysis', {
+            'fields': ('input_generator', 'reference_solution'),
+            'classes': ('collapse',),
+            'description': 'Python code defining generate(n, rng), which returns a test input of size n as a comma-separated string, or a list of arguments for problems with an entry function. Used to estimate the complexity of accepted solutions. '
+                           'With a reference solution as well, solutions that pass every test are also compared with it on a few hundred small random inputs.'
         }),
     )
 
@@ -34,3 +51,9 @@ class SubmissionAdmin(admin.ModelAdmin):
     list_filter = ('status', 'language', 'user', 'problem')
     search_fields = ('user__username', 'problem__name')
     ordering = ('-created_at',)
+
+@admin.register(ProblemStats)
+class ProblemStatsAdmin(admin.ModelAdmin):
+    list_display = ('problem', 'accepted_count')
+    search_fields = ('problem__name',)
+    readonly_fields = ('accepted_count', 'runtime_histogram', 'test_failure_counts')
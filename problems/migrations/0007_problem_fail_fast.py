@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-16 22:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0006_alter_submission_created_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='problem',
+            name='fail_fast',
+            field=models.BooleanField(default=False),
+        ),
+    ]
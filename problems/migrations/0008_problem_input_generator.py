@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-16 22:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0007_problem_fail_fast'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='problem',
+            name='input_generator',
+            field=models.TextField(blank=True, default=''),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.4 on 2026-10-16 22:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0008_problem_input_generator'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='submission',
+            name='telemetry',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ProblemStats',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('accepted_count', models.IntegerField(default=0)),
+                ('runtime_histogram', models.JSONField(default=dict)),
+                ('problem', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stats', to='problems.problem')),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-16 22:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0009_submission_telemetry_problemstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='problem',
+            name='memory_limit',
+            field=models.IntegerField(default=256),
+        ),
+        migrations.AddField(
+            model_name='problem',
+            name='time_limit',
+            field=models.FloatField(default=5.0),
+        ),
+    ]
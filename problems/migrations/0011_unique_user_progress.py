@@ -0,0 +1,39 @@
+# Generated by Django 5.1.4 on 2026-10-16 22:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def merge_duplicate_progress(apps, schema_editor):
+    """Merges progress rows duplicated by concurrent first submissions."""
+    UserProgress = apps.get_model('problems', 'UserProgress')
+    seen = {}
+    for progress in UserProgress.objects.order_by('id'):
+        key = (progress.user_id, progress.problem_id)
+        kept = seen.get(key)
+        if kept is None:
+            seen[key] = progress
+            continue
+        kept.attempts = (kept.attempts or 0) + (progress.attempts or 0)
+        kept.time_spent = max(kept.time_spent or 0, progress.time_spent or 0)
+        kept.is_completed = kept.is_completed or progress.is_completed
+        if progress.last_submitted and (not kept.last_submitted or progress.last_submitted > kept.last_submitted):
+            kept.last_submitted = progress.last_submitted
+        kept.save()
+        progress.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0010_problem_limits'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_progress, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='userprogress',
+            constraint=models.UniqueConstraint(fields=('user', 'problem'), name='unique_user_problem_progress'),
+        ),
+    ]
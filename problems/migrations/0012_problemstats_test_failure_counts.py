@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-16 22:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0011_unique_user_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='problemstats',
+            name='test_failure_counts',
+            field=models.JSONField(default=dict),
+        ),
+    ]
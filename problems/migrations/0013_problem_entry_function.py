@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-16 22:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0012_problemstats_test_failure_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='problem',
+            name='entry_function',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-16 22:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0013_problem_entry_function'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='problem',
+            name='reference_solution',
+            field=models.TextField(blank=True, default=''),
+        ),
+    ]
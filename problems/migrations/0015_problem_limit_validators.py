@@ -0,0 +1,24 @@
+# Generated by Django 5.1.4 on 2026-10-16 23:17
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0014_problem_reference_solution'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='problem',
+            name='memory_limit',
+            field=models.IntegerField(default=256, validators=[django.core.validators.MinValueValidator(16)]),
+        ),
+        migrations.AlterField(
+            model_name='problem',
+            name='time_limit',
+            field=models.FloatField(default=5.0, validators=[django.core.validators.MinValueValidator(0.1)]),
+        ),
+    ]
@@ -1,4 +1,6 @@
+import math
 from django.db import models
+from django.core.validators import MinValueValidator
 from django.contrib.auth.models import User
 
 class Problem(models.Model):
@@ -12,6 +14,12 @@ class Problem(models.Model):
     created_at = models.DateField(auto_now_add=True)
     problem_type = models.CharField(max_length=50)
     order = models.IntegerField()
+    fail_fast = models.BooleanField(default=False)
+    time_limit = models.FloatField(default=5.0, validators=[MinValueValidator(0.1)])  # CPU seconds per test
+    memory_limit = models.IntegerField(default=256, validators=[MinValueValidator(16)])  # MB per test
+    input_generator = models.TextField(blank=True, default='')
+    entry_function = models.CharField(max_length=100, blank=True, default='')  # judge return values of this function
+    reference_solution = models.TextField(blank=True, default='')  # correct solution used for stress testing
 
     def __str__(self):
         return self.name
@@ -25,6 +33,11 @@ class UserProgress(models.Model):
     attempts = models.IntegerField(null=True)
     last_submitted = models.DateField(null=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'problem'], name='unique_user_problem_progress')
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.problem.name}"
 
@@ -36,6 +49,53 @@ class Submission(models.Model):
     status = models.CharField(max_length=30)
     language = models.CharField(max_length=50)
     created_at = models.DateTimeField(auto_now_add=True)
+    telemetry = models.JSONField(null=True, blank=True)
 
     def __str__(self):
         return f"{self.user.username} - {self.problem.name} - {self.status}"
+
+class ProblemStats(models.Model):
+    RUNTIME_BUCKETS_PER_OCTAVE = 4
+
+    id = models.AutoField(primary_key=True)
+    problem = models.OneToOneField(Problem, on_delete=models.CASCADE, related_name='stats')
+    accepted_count = models.IntegerField(default=0)
+    runtime_histogram = models.JSONField(default=dict)
+    test_failure_counts = models.JSONField(default=dict)
+
+    def __str__(self):
+        return f"{self.problem.name} - {self.accepted_count} accepted"
+
+    @classmethod
+    def runtime_bucket(cls, runtime_ms):
+        """Log-scale histogram bucket for a runtime in milliseconds."""
+        return int(math.log2(runtime_ms + 1) * cls.RUNTIME_BUCKETS_PER_OCTAVE)
+
+    def add_runtime(self, runtime_ms):
+        """Count an accepted submission's runtime in the histogram."""
+        bucket = str(self.runtime_bucket(runtime_ms))
+        self.runtime_histogram[bucket] = self.runtime_histogram.get(bucket, 0) + 1
+        self.accepted_count += 1
+
+    def faster_than(self, runtime_ms):
+        """
+        Percentage of counted accepted submissions slower than the given runtime.
+
+        Submissions in the same bucket count as half slower. Returns None if
+        nothing has been counted yet.
+        """
+        if not self.accepted_count:
+            return None
+        bucket = self.runtime_bucket(runtime_ms)
+        slower = 0.0
+        for key, count in self.runtime_histogram.items():
+            if int(key) > bucket:
+                slower += count
+            elif int(key) == bucket:
+                slower += count / 2
+        return round(100 * slower / self.accepted_count, 1)
+
+    def add_failures(self, test_names):
+        """Count a failure for each of the named test cases."""
+        for test_name in test_names:
+            self.test_failure_counts[test_name] = self.test_failure_counts.get(test_name, 0) + 1
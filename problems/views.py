@@ -80,6 +80,8 @@ def get_problem_details(request, problem_id):
             - problem_type (str): Type of problem
             - description (str): Problem description in markdown
             - test_cases (list): List of test cases
+            - entry_function (str): Function solutions must define, empty if
+              solutions are judged on printed output
             - is_completed (bool): Whether the user has completed the problem
             - time_spent (int): Time spent on the problem in seconds
             - attempts (int): Number of attempts made
@@ -103,6 +105,7 @@ def get_problem_details(request, problem_id):
         "problem_type": problem.problem_type,
         "description": problem.description,
         "test_cases": problem.test_cases,
+        "entry_function": problem.entry_function,
         "is_completed": user_progress.is_completed,
         "time_spent": user_progress.time_spent,
         "attempts": user_progress.attempts,